@@ -7,6 +7,7 @@ Double-click this file to start the Smart Notes Instance Manager
 import os
 import sys
 import subprocess
+from single_instance import activate_running_manager
 
 def main():
     """Launch the Smart Notes Instance Manager"""
@@ -22,6 +23,10 @@ def main():
             print(f"Error: Instance manager not found at: {manager_path}")
             return
         
+        # Hand off to a manager that is already running
+        if activate_running_manager(sys.argv[1:], wait=0, reply_timeout=1.0):
+            return
+        
         # Launch the standalone instance manager
         # Using pythonw.exe to avoid console window
         pythonw_path = os.path.join(os.path.dirname(sys.executable), 'pythonw.exe')
@@ -4,34 +4,32 @@ Auto-Start Registry Manager for Smart Notes
 Manages instances that should start automatically with the system
 """
 
-import json
 import os
 import sys
 from datetime import datetime
+from note_store import get_store
 
 class AutoStartRegistry:
+    REGISTRY_NAME = 'auto_start'
+    
     def __init__(self):
-        self.registry_file = os.path.join(os.path.expanduser('~'), '.smart_notes_auto_start.json')
+        self.store = get_store()
+        self.registry_file = self.store.db_path
         self.auto_start_instances = {}
         self.load_registry()
     
     def load_registry(self):
-        """Load auto-start registry from file"""
+        """Load auto-start registry from the note store"""
         try:
-            if os.path.exists(self.registry_file):
-                with open(self.registry_file, 'r', encoding='utf-8') as f:
-                    self.auto_start_instances = json.load(f)
-            else:
-                self.auto_start_instances = {}
+            self.auto_start_instances = self.store.get_registry(self.REGISTRY_NAME)
         except Exception as e:
             print(f"Error loading auto-start registry: {e}")
             self.auto_start_instances = {}
     
     def save_registry(self):
-        """Save auto-start registry to file"""
+        """Save auto-start registry to the note store"""
         try:
-            with open(self.registry_file, 'w', encoding='utf-8') as f:
-                json.dump(self.auto_start_instances, f, indent=2, ensure_ascii=False)
+            self.store.replace_registry(self.REGISTRY_NAME, self.auto_start_instances)
             return True
         except Exception as e:
             print(f"Error saving auto-start registry: {e}")
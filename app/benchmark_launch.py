@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Launch benchmark for Smart Notes
+Measures time from launch request to first paint for cold and warm note hosts
+"""
+
+import os
+import sys
+import time
+import uuid
+import tempfile
+import subprocess
+import statistics
+
+WIDGET_SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'other files', 'src')
+if WIDGET_SRC_DIR not in sys.path:
+    sys.path.insert(0, WIDGET_SRC_DIR)
+
+import note_host
+
+
+def private_environment(home_dir):
+    """Point the store and host endpoint at a throwaway home directory"""
+    os.environ['HOME'] = home_dir
+    os.environ['USERPROFILE'] = home_dir
+    os.environ['SMART_NOTES_HOST'] = (r'\\.\pipe\smart_notes_bench_' + uuid.uuid4().hex
+                                      if os.name == 'nt'
+                                      else os.path.join(home_dir, 'host.sock'))
+
+
+def cold_launch():
+    """Start a new host process for one note; seconds until it reports READY"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, note_host.HOST_SCRIPT,
+                                '--instance-id', str(uuid.uuid4()), '--report-ready'],
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        for line in process.stdout:
+            if line.startswith('READY'):
+                return time.perf_counter() - start
+        return None
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def warm_launch():
+    """Open one note in the running standby host; seconds until its first paint"""
+    start = time.perf_counter()
+    reply = note_host.request_open([str(uuid.uuid4())])
+    if not reply or not reply.get('ready'):
+        return None
+    return time.perf_counter() - start
+
+
+def report(label, samples):
+    samples = [s for s in samples if s is not None]
+    if not samples:
+        print(f"{label}: no successful launches")
+        return
+    print(f"{label}: median {statistics.median(samples) * 1000:.1f} ms, "
+          f"min {min(samples) * 1000:.1f} ms, max {max(samples) * 1000:.1f} ms "
+          f"({len(samples)} runs)")
+
+
+def main():
+    """Main entry point"""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print("🚀 Smart Notes Launch Benchmark")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as home_dir:
+        private_environment(home_dir)
+
+        cold = [cold_launch() for _ in range(runs)]
+        report("Cold (new host process)", cold)
+
+        standby = subprocess.Popen([sys.executable, note_host.HOST_SCRIPT, '--standby'],
+                                   stdout=subprocess.DEVNULL)
+        try:
+            if note_host.wait_for_host() is None:
+                print("Standby host did not start")
+                return
+            warm = [warm_launch() for _ in range(runs)]
+            report("Warm (standby host)", warm)
+        finally:
+            standby.terminate()
+            standby.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ Diagnostic script to check auto-start registry and instance manager
 """
 
 from auto_start_registry import AutoStartRegistry
-import json
+from note_store import get_store
 import os
 
 def diagnose_auto_start():
@@ -31,28 +31,23 @@ def diagnose_auto_start():
         print(f"    Created: {metadata.get('created_date', 'Unknown')}")
         print()
     
-    # Check if instance metadata files exist
-    print("📁 CHECKING INSTANCE METADATA FILES:")
-    home_dir = os.path.expanduser('~')
-    instance_files = []
+    # Check instance metadata in the note store
+    print("📁 CHECKING INSTANCE METADATA:")
+    store = get_store()
+    instances = store.list_instances()
     
-    for filename in os.listdir(home_dir):
-        if filename.startswith('.smart_notes_') and filename.endswith('_metadata.json'):
-            instance_files.append(filename)
-            print(f"  Found: {filename}")
+    for instance_id, metadata in instances.items():
+        print(f"  Found: {metadata.get('name', 'Unknown')} ({instance_id})")
     
-    print(f"Total instance files found: {len(instance_files)}")
+    print(f"Total instances found: {len(instances)}")
     
-    # Check if auto-start instances have corresponding metadata files
-    print("\n🔗 CHECKING AUTO-START vs METADATA FILES:")
+    # Check if auto-start instances have corresponding metadata
+    print("\n🔗 CHECKING AUTO-START vs METADATA:")
     for instance_id in auto_start_instances.keys():
-        metadata_file = f'.smart_notes_{instance_id}_metadata.json'
-        metadata_path = os.path.join(home_dir, metadata_file)
-        
-        if os.path.exists(metadata_path):
-            print(f"  ✅ {instance_id} - Metadata file exists")
+        if instance_id in instances:
+            print(f"  ✅ {instance_id} - Metadata exists")
         else:
-            print(f"  ❌ {instance_id} - Metadata file MISSING")
+            print(f"  ❌ {instance_id} - Metadata MISSING")
     
     # Test auto-start registry functions
     print("\n🧪 TESTING AUTO-START REGISTRY FUNCTIONS:")
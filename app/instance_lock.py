@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Instance Lock for Smart Notes
+Per-instance OS file locks so only one process ever runs a given note
+"""
+
+import os
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class InstanceAlreadyRunning(Exception):
+    """Raised when another process already holds an instance's lock"""
+
+
+class InstanceLock:
+    """Exclusive lock on ~/.smart_notes_<instance_id>.lock
+
+    The operating system drops the lock when the holding process exits, so a
+    crashed note never leaves a stale lock behind.
+    """
+
+    def __init__(self, instance_id, home_dir=None):
+        self.instance_id = instance_id
+        self.path = os.path.join(home_dir or os.path.expanduser('~'), f'.smart_notes_{instance_id}.lock')
+        self.fd = None
+
+    def acquire(self):
+        """Take the lock without blocking; returns False if another holder has it"""
+        if self.fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.name == 'nt':
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self.fd = fd
+        return True
+
+    def release(self):
+        """Release the lock"""
+        if self.fd is None:
+            return
+        try:
+            if os.name == 'nt':
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+        except OSError as e:
+            print(f"Could not release lock for {self.instance_id}: {e}")
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+
+def is_instance_locked(instance_id, home_dir=None):
+    """Check whether some process (including this one) currently runs an instance"""
+    lock = InstanceLock(instance_id, home_dir)
+    try:
+        if lock.acquire():
+            lock.release()
+            return False
+        return True
+    except OSError as e:
+        print(f"Could not check lock for {instance_id}: {e}")
+        return False
@@ -6,6 +6,7 @@ Simple launcher for the Smart Notes Instance Manager
 import subprocess
 import os
 import sys
+from single_instance import activate_running_manager
 
 def main():
     """Launch the standalone instance manager"""
@@ -19,6 +20,11 @@ def main():
             print(f"Error: Instance manager not found at: {manager_path}")
             return
         
+        # Hand off to a manager that is already running
+        if activate_running_manager(sys.argv[1:], wait=0, reply_timeout=1.0):
+            print("Smart Notes Instance Manager is already running.")
+            return
+        
         # Launch the standalone instance manager (hidden console)
         print("🚀 Launching Smart Notes Instance Manager...")
         subprocess.Popen([sys.executable, manager_path], 
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Note Search for Smart Notes
+Persistent inverted index over all notes in the note store, ranked with BM25
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+
+from note_store import get_store
+
+TOKEN_PATTERN = re.compile(r'\w+')
+MAX_TERM_LENGTH = 64  # Longer "words" (base64, hashes) are not indexed
+PREFIX_EXPANSION_LIMIT = 50  # Terms a trailing partial word may expand to
+
+
+def tokenize(text):
+    """Split text into lower-case index terms"""
+    return [term for term in TOKEN_PATTERN.findall(text.lower()) if len(term) <= MAX_TERM_LENGTH]
+
+
+class NoteIndex:
+    """BM25 search over the search_* tables of the note store
+
+    Saves only mark a note as changed (search_pending); refresh() re-indexes
+    those notes, so a query costs the postings of its terms plus whatever was
+    edited since the last query.
+    """
+
+    def __init__(self, store=None, k1=1.2, b=0.75, snippet_chars=60):
+        self.store = store or get_store()
+        self.k1 = k1
+        self.b = b
+        self.snippet_chars = snippet_chars  # Context kept on each side of the first match
+        self.stats = {'notes_indexed': 0, 'searches': 0}
+
+    def refresh(self, batch_postings=200000):
+        """Re-index notes that changed (or were never indexed); returns how many"""
+        rows = self.store._query(
+            'SELECT instance_id, version FROM search_pending '
+            'UNION ALL '
+            'SELECT instance_id, 0 FROM notes '
+            'WHERE instance_id NOT IN (SELECT instance_id FROM search_docs) '
+            'AND instance_id NOT IN (SELECT instance_id FROM search_pending)')
+        # Notes are written in batches with postings sorted by term, so the
+        # term-ordered postings table is filled mostly sequentially
+        batch = []
+        batch_size = 0
+        for instance_id, version in rows:
+            # Tokenize outside the transaction so writers in other processes aren't held up
+            terms = Counter(tokenize(self.store.get_notes(instance_id) or ''))
+            batch.append((instance_id, version, terms))
+            batch_size += len(terms)
+            if batch_size >= batch_postings:
+                self.write_batch(batch)
+                batch = []
+                batch_size = 0
+        if batch:
+            self.write_batch(batch)
+        return len(rows)
+
+    def index_note(self, instance_id, version=0):
+        """Replace the postings of one note"""
+        terms = Counter(tokenize(self.store.get_notes(instance_id) or ''))
+        self.write_batch([(instance_id, version, terms)])
+
+    def write_batch(self, batch):
+        """Replace the postings of [(instance_id, pending version, term counts)] in one transaction"""
+        postings = sorted((term, instance_id, tf)
+                          for instance_id, _, terms in batch
+                          for term, tf in terms.items())
+        with self.store.transaction() as conn:
+            conn.executemany('DELETE FROM search_postings WHERE instance_id = ?',
+                             [(instance_id,) for instance_id, _, _ in batch])
+            conn.executemany('INSERT INTO search_postings (term, instance_id, tf) VALUES (?, ?, ?)', postings)
+            conn.executemany('INSERT OR REPLACE INTO search_docs (instance_id, length) VALUES (?, ?)',
+                             [(instance_id, sum(terms.values())) for instance_id, _, terms in batch])
+            # A save that landed while we were tokenizing bumped the version; keep it pending
+            conn.executemany('DELETE FROM search_pending WHERE instance_id = ? AND version = ?',
+                             [(instance_id, version) for instance_id, version, _ in batch])
+        self.stats['notes_indexed'] += len(batch)
+
+    def expand_terms(self, query):
+        """Query terms, with a trailing partial word expanded to the indexed terms it starts"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        expanded = set(terms)
+        if query[-1:].isalnum() or query[-1:] == '_':
+            prefix = terms[-1]
+            rows = self.store._query('SELECT DISTINCT term FROM search_postings WHERE term >= ? AND term < ? LIMIT ?',
+                                     (prefix, prefix + '\U0010ffff', PREFIX_EXPANSION_LIMIT))
+            expanded.update(term for (term,) in rows)
+        return sorted(expanded)
+
+    def search(self, query, limit=20, refresh=True):
+        """Rank notes for a query; returns [{'instance_id', 'score', 'snippet'}] best first"""
+        if refresh:
+            self.refresh()
+        self.stats['searches'] += 1
+        terms = self.expand_terms(query)
+        if not terms:
+            return []
+
+        with self.store._lock:
+            total, average_length = self.store._query('SELECT COUNT(*), AVG(length) FROM search_docs')[0]
+            placeholders = ','.join('?' * len(terms))
+            postings = self.store._query(
+                f'SELECT p.term, p.instance_id, p.tf, d.length FROM search_postings p '
+                f'JOIN search_docs d ON d.instance_id = p.instance_id WHERE p.term IN ({placeholders})',
+                terms)
+        if not total or not postings:
+            return []
+        average_length = average_length or 1
+
+        document_frequency = Counter(term for term, _, _, _ in postings)
+        scores = Counter()
+        for term, instance_id, tf, length in postings:
+            df = document_frequency[term]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * length / average_length)
+            scores[instance_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        results = []
+        for instance_id, score in scores.most_common(limit):
+            results.append({
+                'instance_id': instance_id,
+                'score': score,
+                'snippet': self.make_snippet(instance_id, terms)
+            })
+        return results
+
+    def make_snippet(self, instance_id, terms):
+        """Text around the first occurrence of any query term"""
+        content = self.store.get_notes(instance_id) or ''
+        pattern = re.compile(r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\b', re.IGNORECASE)
+        match = pattern.search(content)
+        if match is None:
+            return content[:self.snippet_chars * 2].strip()
+        start = max(0, match.start() - self.snippet_chars)
+        end = min(len(content), match.end() + self.snippet_chars)
+        snippet = ' '.join(content[start:end].split())
+        return ('...' if start > 0 else '') + snippet + ('...' if end < len(content) else '')
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_note_index():
+    """Get the process-wide note index"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NoteIndex()
+        return _index
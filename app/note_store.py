@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Note Store for Smart Notes
+Single transactional SQLite (WAL) store for notes, settings, positions,
+instance metadata and the instance / auto-start registries
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+STORE_FILE = os.path.join(os.path.expanduser('~'), '.smart_notes.db')
+
+# Legacy per-instance files: .smart_notes_<instance_id><suffix>
+# '_mini_position.json' must be matched before '_position.json'
+LEGACY_SUFFIXES = (
+    ('_metadata.json', 'metadata'),
+    ('_notes.txt', 'notes'),
+    ('_settings.json', 'settings'),
+    ('_mini_position.json', 'mini_position'),
+    ('_position.json', 'position'),
+)
+LEGACY_REGISTRIES = {
+    '.smart_notes_instance_registry.json': 'instance_registry',
+    '.smart_notes_auto_start.json': 'auto_start',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    instance_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notes (
+    instance_id TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    updated TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS note_journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    instance_id TEXT NOT NULL,
+    op TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS note_journal_instance ON note_journal (instance_id, seq);
+CREATE TABLE IF NOT EXISTS documents (
+    instance_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (instance_id, kind)
+);
+CREATE TABLE IF NOT EXISTS registries (
+    registry TEXT NOT NULL,
+    instance_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (registry, instance_id)
+);
+-- Running notes are tracked by their instance locks; the runtime table is gone
+DROP TABLE IF EXISTS runtime;
+CREATE TABLE IF NOT EXISTS search_pending (
+    instance_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_docs (
+    instance_id TEXT PRIMARY KEY,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_postings (
+    term TEXT NOT NULL,
+    instance_id TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, instance_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS search_postings_instance ON search_postings (instance_id);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class NoteStore:
+    """Embedded storage engine shared by widgets, managers and registries"""
+
+    def __init__(self, db_path=None, home_dir=None):
+        self.db_path = db_path or STORE_FILE
+        self.home_dir = home_dir or os.path.dirname(self.db_path)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._index_cache = None  # (generation, {instance_id: metadata})
+        self.conn = sqlite3.connect(self.db_path,
+                                    timeout=5.0,
+                                    isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('index_generation', '0')")
+        self.migrate_legacy()
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of statements atomically (nested blocks join the outer one)"""
+        with self._lock:
+            outermost = self._depth == 0
+            if outermost:
+                self.conn.execute('BEGIN IMMEDIATE')
+            self._depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self._depth -= 1
+                if outermost:
+                    self.conn.execute('ROLLBACK')
+                raise
+            else:
+                self._depth -= 1
+                if outermost:
+                    self.conn.execute('COMMIT')
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # Instance index
+    #
+    # Every write to instance metadata or a registry bumps index_generation in
+    # the same transaction, so readers (including other processes) can tell
+    # whether their cached instance list is still valid with a single-row read.
+
+    def _bump_index_generation(self, conn):
+        conn.execute("UPDATE store_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'index_generation'")
+
+    def index_generation(self):
+        """Get the instance index generation (changes whenever instances or registries change)"""
+        rows = self._query("SELECT value FROM store_meta WHERE key = 'index_generation'")
+        return int(rows[0][0]) if rows else 0
+
+    # Instance metadata
+
+    def get_metadata(self, instance_id):
+        """Get metadata for an instance, or None if it does not exist"""
+        rows = self._query('SELECT data FROM instances WHERE instance_id = ?', (instance_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def put_metadata(self, instance_id, metadata):
+        """Create or replace metadata for an instance"""
+        with self.transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO instances (instance_id, data) VALUES (?, ?)',
+                         (instance_id, json.dumps(metadata)))
+            self._bump_index_generation(conn)
+
+    def list_instances(self):
+        """Get all instances as {instance_id: metadata}, served from the index cache when unchanged"""
+        with self._lock:
+            generation = self.index_generation()
+            if self._index_cache is None or self._index_cache[0] != generation:
+                rows = self._query('SELECT instance_id, data FROM instances')
+                self._index_cache = (generation, {instance_id: json.loads(data) for instance_id, data in rows})
+            # Callers may modify the returned metadata, so hand out copies
+            return {instance_id: dict(metadata) for instance_id, metadata in self._index_cache[1].items()}
+
+    def delete_instance(self, instance_id):
+        """Delete an instance with its notes, settings and positions"""
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM instances WHERE instance_id = ?', (instance_id,))
+            conn.execute('DELETE FROM notes WHERE instance_id = ?', (instance_id,))
+            conn.execute('DELETE FROM note_journal WHERE instance_id = ?', (instance_id,))
+            conn.execute('DELETE FROM documents WHERE instance_id = ?', (instance_id,))
+            conn.execute('DELETE FROM search_pending WHERE instance_id = ?', (instance_id,))
+            conn.execute('DELETE FROM search_docs WHERE instance_id = ?', (instance_id,))
+            conn.execute('DELETE FROM search_postings WHERE instance_id = ?', (instance_id,))
+            self._bump_index_generation(conn)
+
+    # Note content (snapshot + append-only edit journal)
+    #
+    # Every content write marks the note for re-indexing in the same transaction
+    # (see note_search.py); the search index itself is only rebuilt when queried.
+
+    def _mark_search_pending(self, conn, instance_id):
+        conn.execute('INSERT INTO search_pending (instance_id, version) VALUES (?, 1) '
+                     'ON CONFLICT (instance_id) DO UPDATE SET version = version + 1', (instance_id,))
+
+    def get_notes(self, instance_id):
+        """Get note content for an instance (snapshot with journal replayed), or None"""
+        with self._lock:
+            rows = self._query('SELECT content FROM notes WHERE instance_id = ?', (instance_id,))
+            ops = self._query('SELECT op, pos, data FROM note_journal WHERE instance_id = ? ORDER BY seq',
+                              (instance_id,))
+        if not rows and not ops:
+            return None
+        return apply_journal(rows[0][0] if rows else '', ops)
+
+    def save_notes(self, instance_id, content, metadata=None):
+        """Save a full note snapshot, and optionally metadata, in one transaction"""
+        with self.transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO notes (instance_id, content, updated) VALUES (?, ?, ?)',
+                         (instance_id, content, datetime.now().isoformat()))
+            # The snapshot supersedes any journalled edits
+            conn.execute('DELETE FROM note_journal WHERE instance_id = ?', (instance_id,))
+            self._mark_search_pending(conn, instance_id)
+            if metadata is not None:
+                self.put_metadata(instance_id, metadata)
+
+    def append_journal(self, instance_id, ops, metadata=None):
+        """Append edit deltas (op, pos, data) for an instance; returns the journal (ops, bytes)"""
+        with self.transaction() as conn:
+            conn.executemany('INSERT INTO note_journal (instance_id, op, pos, data) VALUES (?, ?, ?, ?)',
+                             [(instance_id, op, pos, data) for op, pos, data in ops])
+            self._mark_search_pending(conn, instance_id)
+            if metadata is not None:
+                self.put_metadata(instance_id, metadata)
+            return self.journal_size(instance_id)
+
+    def journal_size(self, instance_id):
+        """Pending journal for an instance as (op count, approximate size in bytes)"""
+        rows = self._query('SELECT COUNT(*), COALESCE(SUM(LENGTH(data) + 16), 0) FROM note_journal '
+                           'WHERE instance_id = ?', (instance_id,))
+        return rows[0]
+
+    def compact_journal(self, instance_id):
+        """Fold the journal for an instance into a fresh snapshot"""
+        with self.transaction():
+            content = self.get_notes(instance_id)
+            if content is not None:
+                self.save_notes(instance_id, content)
+
+    # Per-instance documents (settings, position, mini_position)
+
+    def get_document(self, instance_id, kind, default=None):
+        """Get a per-instance JSON document"""
+        rows = self._query('SELECT data FROM documents WHERE instance_id = ? AND kind = ?',
+                           (instance_id, kind))
+        return json.loads(rows[0][0]) if rows else default
+
+    def get_documents(self, instance_id):
+        """Get all per-instance documents as {kind: data} in one query"""
+        rows = self._query('SELECT kind, data FROM documents WHERE instance_id = ?', (instance_id,))
+        return {kind: json.loads(data) for kind, data in rows}
+
+    def put_document(self, instance_id, kind, data):
+        """Create or replace a per-instance JSON document"""
+        with self.transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO documents (instance_id, kind, data) VALUES (?, ?, ?)',
+                         (instance_id, kind, json.dumps(data)))
+
+    def update_document(self, instance_id, kind, changes):
+        """Merge changes into a per-instance JSON document"""
+        with self.transaction():
+            data = self.get_document(instance_id, kind, {})
+            data.update(changes)
+            self.put_document(instance_id, kind, data)
+            return data
+
+    # Registries (instance_registry, auto_start)
+
+    def get_registry(self, registry):
+        """Get a registry as {instance_id: data}"""
+        rows = self._query('SELECT instance_id, data FROM registries WHERE registry = ?', (registry,))
+        return {instance_id: json.loads(data) for instance_id, data in rows}
+
+    def put_registry_entry(self, registry, instance_id, data):
+        """Create or replace one registry entry"""
+        with self.transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO registries (registry, instance_id, data) VALUES (?, ?, ?)',
+                         (registry, instance_id, json.dumps(data, ensure_ascii=False)))
+            self._bump_index_generation(conn)
+
+    def remove_registry_entry(self, registry, instance_id):
+        """Remove one registry entry"""
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM registries WHERE registry = ? AND instance_id = ?',
+                         (registry, instance_id))
+            self._bump_index_generation(conn)
+
+    def replace_registry(self, registry, entries):
+        """Replace a whole registry with {instance_id: data}"""
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM registries WHERE registry = ?', (registry,))
+            self._bump_index_generation(conn)
+            for instance_id, data in entries.items():
+                self.put_registry_entry(registry, instance_id, data)
+
+    # Legacy migration
+
+    def migrate_legacy(self):
+        """Import the legacy per-instance JSON/TXT files once; the old files are left in place"""
+        if self._query("SELECT value FROM store_meta WHERE key = 'legacy_migrated'"):
+            return
+        try:
+            filenames = os.listdir(self.home_dir)
+        except OSError as e:
+            print(f"Could not scan for legacy Smart Notes files: {e}")
+            filenames = []
+
+        with self.transaction() as conn:
+            for filename in filenames:
+                try:
+                    self._migrate_legacy_file(filename)
+                except Exception as e:
+                    print(f"Could not migrate legacy file {filename}: {e}")
+            conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('legacy_migrated', ?)",
+                         (datetime.now().isoformat(),))
+
+    def _migrate_legacy_file(self, filename):
+        path = os.path.join(self.home_dir, filename)
+        if filename in LEGACY_REGISTRIES:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            for instance_id, data in entries.items():
+                self.put_registry_entry(LEGACY_REGISTRIES[filename], instance_id, data)
+            return
+
+        if not filename.startswith('.smart_notes_'):
+            return
+        for suffix, kind in LEGACY_SUFFIXES:
+            if filename.endswith(suffix):
+                instance_id = filename[len('.smart_notes_'):-len(suffix)]
+                break
+        else:
+            return
+        if not instance_id:
+            return
+
+        if kind == 'notes':
+            with open(path, 'r', encoding='utf-8') as f:
+                self.save_notes(instance_id, f.read())
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if kind == 'metadata':
+            data.pop('files', None)
+            self.put_metadata(data.get('instance_id', instance_id), data)
+        else:
+            self.put_document(instance_id, kind, data)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self.conn.close()
+
+
+def apply_journal(content, ops, chunk_chars=64 * 1024):
+    """Replay journal deltas on top of a snapshot
+
+    The text is held as a list of chunks, so each delta copies only the chunk
+    it lands in rather than the whole note. Deltas are usually close to each
+    other, so the chunk lookup starts from where the previous one ended.
+    """
+    if not ops:
+        return content
+    chunks = [content[i:i + chunk_chars] for i in range(0, len(content), chunk_chars)] or ['']
+    index = 0
+    start = 0  # Offset of chunks[index]
+    for op, pos, data in ops:
+        # Move to the chunk holding pos (for a delete, the chunk holding the character at pos)
+        while index > 0 and pos < start:
+            index -= 1
+            start -= len(chunks[index])
+        while index < len(chunks) - 1 and pos - start > len(chunks[index]) - (op == 'd'):
+            start += len(chunks[index])
+            index += 1
+        offset = pos - start
+        if op == 'i':
+            chunk = chunks[index]
+            chunk = chunk[:offset] + data + chunk[offset:]
+            if len(chunk) > 2 * chunk_chars:
+                chunks[index:index + 1] = [chunk[i:i + chunk_chars] for i in range(0, len(chunk), chunk_chars)]
+            else:
+                chunks[index] = chunk
+        elif op == 'd':
+            count = int(data)
+            i = index
+            while count > 0 and i < len(chunks):
+                chunk = chunks[i]
+                taken = min(count, len(chunk) - offset)
+                chunks[i] = chunk[:offset] + chunk[offset + taken:]
+                count -= max(taken, 0)
+                offset = 0
+                i += 1
+    return ''.join(chunks)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Get the process-wide note store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NoteStore()
+        return _store
@@ -0,0 +1,65 @@
+"""
+Asset cache for Smart Notes
+Icons are scaled once, kept as PNGs on disk (keyed by size and source mtime)
+and shared as PhotoImages by every note in the process
+"""
+
+import os
+import glob
+import tkinter as tk
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.smart_notes_cache')
+
+_photos = {}  # (name, size) -> PhotoImage
+
+
+def get_icon(name, size, master=None):
+    """Get assets/<name> scaled to size x size as a PhotoImage, or None if unavailable"""
+    key = (name, size)
+    if key in _photos:
+        return _photos[key]
+
+    source = os.path.join(ASSETS_DIR, name)
+    try:
+        mtime = os.stat(source).st_mtime_ns
+    except OSError:
+        return None
+
+    # Tk reads PNG itself, so PIL is only needed when the scaled copy is missing
+    base = os.path.splitext(name)[0]
+    scaled = os.path.join(CACHE_DIR, f'{base}_{size}x{size}_{mtime}.png')
+    if not os.path.exists(scaled) and not scale_icon(source, scaled, size):
+        return None
+    try:
+        photo = tk.PhotoImage(master=master, file=scaled)
+    except tk.TclError as e:
+        print(f"Could not load cached icon {scaled}: {e}")
+        return None
+    _photos[key] = photo
+    return photo
+
+
+def scale_icon(source, target, size):
+    """Write a size x size PNG of source to target; returns False if it can't"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with Image.open(source) as image:
+            scaled = image.resize((size, size), Image.Resampling.LANCZOS)
+            temp_path = target + '.tmp'
+            scaled.save(temp_path, 'PNG')
+        os.replace(temp_path, target)
+
+        # Drop copies made from older versions of the source
+        prefix = target[:target.rindex('_') + 1]
+        for old_path in glob.glob(glob.escape(prefix) + '*.png'):
+            if old_path != target:
+                os.remove(old_path)
+        return True
+    except Exception as e:
+        print(f"Could not scale icon {source}: {e}")
+        return False
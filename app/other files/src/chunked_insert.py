@@ -0,0 +1,104 @@
+"""
+Chunked insertion for Smart Notes
+Inserts a long string into a tk.Text in bounded chunks scheduled with after,
+so the first screen appears at once and the mainloop keeps handling events
+while Tk lays out the rest
+"""
+
+import time
+
+
+class ChunkedInsert:
+    """Insert content at an index, one chunk now and the rest in ~slice_ms slices
+
+    A right-gravity mark tracks where the next chunk goes, so edits made
+    elsewhere in the Text while the insert is running don't disturb it.
+    """
+
+    def __init__(self, text, content, index='insert', recorder=None, chunk_chars=64 * 1024,
+                 slice_ms=8, on_done=None):
+        self.text = text
+        self.content = content
+        self.recorder = recorder  # Disabled around each chunk when given (loaded text is not an edit)
+        self.chunk_chars = chunk_chars
+        self.slice_ms = slice_ms
+        self.on_done = on_done
+        self.pos = 0
+        self.job = None
+        self.mark = f'chunked_insert_{id(self)}'
+        self.text.mark_set(self.mark, index)
+        self.text.mark_gravity(self.mark, 'right')
+        self.stats = {'chars': len(content), 'chunks': 0, 'first_chunk_ms': 0.0, 'total_ms': 0.0}
+        self.started = None
+
+    def start(self):
+        """Insert the first chunk synchronously and schedule the rest"""
+        self.started = time.perf_counter()
+        self.insert_next()
+        self.stats['first_chunk_ms'] = round((time.perf_counter() - self.started) * 1000, 1)
+        self.schedule()
+
+    def is_running(self):
+        return self.content is not None
+
+    def schedule(self):
+        if self.pos < len(self.content):
+            self.job = self.text.after(1, self.step)
+        else:
+            self.finish()
+
+    def step(self):
+        self.job = None
+        deadline = time.perf_counter() + self.slice_ms / 1000
+        while self.pos < len(self.content) and time.perf_counter() < deadline:
+            self.insert_next()
+        self.schedule()
+
+    def insert_next(self):
+        """Insert up to chunk_chars, ending after a newline when there is one in the second half"""
+        end = min(len(self.content), self.pos + self.chunk_chars)
+        if end < len(self.content):
+            newline = self.content.rfind('\n', self.pos + self.chunk_chars // 2, end)
+            if newline != -1:
+                end = newline + 1
+        chunk = self.content[self.pos:end]
+        if self.recorder is None:
+            self.text.insert(self.mark, chunk)
+        else:
+            # Loading is not an edit: don't record it and keep the modified flag as it was
+            modified = self.text.edit_modified()
+            self.recorder.enabled = False
+            try:
+                self.text.insert(self.mark, chunk)
+            finally:
+                self.recorder.enabled = True
+            self.text.edit_modified(modified)
+        self.pos = end
+        self.stats['chunks'] += 1
+
+    def complete(self):
+        """Insert everything that is left now"""
+        if self.content is None:
+            return
+        if self.job is not None:
+            self.text.after_cancel(self.job)
+            self.job = None
+        while self.pos < len(self.content):
+            self.insert_next()
+        self.finish()
+
+    def cancel(self):
+        """Stop inserting; what was inserted so far stays"""
+        if self.job is not None:
+            self.text.after_cancel(self.job)
+            self.job = None
+        if self.content is not None:
+            self.content = None
+            self.text.mark_unset(self.mark)
+
+    def finish(self):
+        self.content = None
+        self.text.mark_unset(self.mark)
+        self.stats['total_ms'] = round((time.perf_counter() - self.started) * 1000, 1)
+        if self.on_done is not None:
+            self.on_done()
@@ -0,0 +1,142 @@
+"""
+Edit recorder for Smart Notes
+Captures insert/delete operations on a tk.Text as compact deltas for the note journal
+"""
+
+import re
+
+# Characters outside the BMP; Tcl 8.6 counts each of them as two characters
+ASTRAL_PATTERN = re.compile('[\U00010000-\U0010ffff]')
+
+
+class TextEditRecorder:
+    """Wraps a tk.Text widget command and records edits as (op, offset, data) tuples
+
+    Offsets are absolute code-point offsets from '1.0' (Python string
+    positions). Inserts are recorded as ('i', offset, text) and deletions as
+    ('d', offset, str(length)), matching the note store journal format.
+    Consecutive typing and deleting are merged into one op.
+
+    The offset of the start of the last edited line is cached, so an edit
+    only counts the characters between that line and its own. A recorded
+    edit never moves the start of its own line; unrecorded ones drop the cache.
+    """
+
+    def __init__(self, text_widget):
+        self.widget = text_widget
+        self.ops = []
+        self.needs_snapshot = False  # Set when an edit could not be expressed as deltas
+        self.enabled = True
+        self.astral = False  # The Text may hold characters Tk counts differently from Python
+        self.line_start = None  # (line, offset of its first character), or None when unknown
+        self._orig = text_widget._w + '_orig'
+        text_widget.tk.call('rename', text_widget._w, self._orig)
+        text_widget.tk.createcommand(text_widget._w, self._proxy)
+
+    def _call(self, *args):
+        return self.widget.tk.call((self._orig,) + args)
+
+    def _chars(self, first, last):
+        """Code points between two Text indices"""
+        if self.astral:
+            # Tk's character count would include surrogate halves; count in Python instead
+            return len(self._call('get', first, last))
+        return int(self._call('count', '-chars', first, last) or 0)
+
+    def _line_offset(self, line):
+        """Offset of the start of a line, counted from the cached line start"""
+        if self.line_start is None:
+            offset = self._chars('1.0', f'{line}.0')
+        else:
+            cached_line, cached_offset = self.line_start
+            if line >= cached_line:
+                offset = cached_offset + self._chars(f'{cached_line}.0', f'{line}.0')
+            else:
+                offset = cached_offset - self._chars(f'{line}.0', f'{cached_line}.0')
+        self.line_start = (line, offset)
+        return offset
+
+    def _offset(self, index):
+        """Absolute code-point offset of a Text index, clamped before the final newline"""
+        if self.widget.tk.getboolean(self._call('compare', index, '>', 'end-1c')):
+            index = 'end-1c'
+        line, column = str(self._call('index', index)).split('.')
+        offset = self._line_offset(int(line))
+        if self.astral:
+            return offset + self._chars(f'{line}.0', f'{line}.{column}')
+        return offset + int(column)
+
+    def _append(self, op):
+        """Record an op, merging it into the previous one when they are adjacent"""
+        if self.ops:
+            last_op, last_pos, last_data = self.ops[-1]
+            kind, pos, data = op
+            if last_op == 'i' and kind == 'i' and pos == last_pos + len(last_data):
+                # Typing: extend the insert
+                self.ops[-1] = ('i', last_pos, last_data + data)
+                return
+            if last_op == 'd' and kind == 'd' and pos in (last_pos, last_pos - int(data)):
+                # Forward delete or backspace: the deleted range grows
+                self.ops[-1] = ('d', pos, str(int(data) + int(last_data)))
+                return
+            if last_op == 'i' and kind == 'd' and last_pos <= pos and pos + int(data) <= last_pos + len(last_data):
+                # Deleting text that was just typed
+                start = pos - last_pos
+                remaining = last_data[:start] + last_data[start + int(data):]
+                if remaining:
+                    self.ops[-1] = ('i', last_pos, remaining)
+                else:
+                    self.ops.pop()
+                return
+        self.ops.append(op)
+
+    def _proxy(self, *args):
+        if not self.astral and args and args[0] in ('insert', 'replace'):
+            # Also watched while disabled, since loaded text goes in that way
+            first = 2 if args[0] == 'insert' else 3
+            self.astral = any(ASTRAL_PATTERN.search(str(chars)) for chars in args[first::2])
+        if not args or args[0] not in ('insert', 'delete', 'replace'):
+            return self._call(*args)
+        if not self.enabled:
+            # Line starts may move without being recorded
+            self.line_start = None
+            return self._call(*args)
+
+        command = args[0]
+        ops = []
+        if command == 'insert' and len(args) >= 3:
+            # insert index chars ?tagList chars tagList ...?
+            ops.append(('i', self._offset(args[1]), ''.join(args[2::2])))
+        elif command == 'delete' and len(args) in (2, 3):
+            # The start last, so the cached line start is the one the edit keeps
+            end = self._offset(args[2] if len(args) == 3 else f'{args[1]}+1c')
+            start = self._offset(args[1])
+            if end > start:
+                ops.append(('d', start, str(end - start)))
+        elif command == 'replace' and len(args) >= 4:
+            end = self._offset(args[2])
+            start = self._offset(args[1])
+            if end > start:
+                ops.append(('d', start, str(end - start)))
+            ops.append(('i', start, ''.join(args[3::2])))
+        else:
+            # Multi-range deletes and other unusual forms fall back to a full snapshot
+            self.needs_snapshot = True
+            self.line_start = None
+
+        result = self._call(*args)
+        for op in ops:
+            if op[0] == 'd' or op[2]:
+                self._append(op)
+        return result
+
+    def take(self):
+        """Return and clear recorded deltas, or None if a full snapshot is required"""
+        ops, needs_snapshot = self.ops, self.needs_snapshot
+        self.clear()
+        return None if needs_snapshot else ops
+
+    def clear(self):
+        """Forget recorded edits (the widget content is known to be saved)"""
+        self.ops = []
+        self.needs_snapshot = False
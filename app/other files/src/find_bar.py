@@ -0,0 +1,480 @@
+"""
+Find bar for Smart Notes
+Find/replace for a note's tk.Text that stays responsive on multi-MB notes:
+matching runs on a Python copy of the buffer, and highlights are applied in
+small time-sliced chunks (visible lines first) that the next keystroke cancels.
+In windowed mode the buffer is the whole document of the LargeNoteView, and
+only matches in the lines currently in the Text are highlighted
+"""
+
+import bisect
+import re
+import time
+import tkinter as tk
+
+from style_registry import get_font
+
+MATCH_TAG = 'find_match'
+CURRENT_TAG = 'find_current'
+ASTRAL_PATTERN = re.compile('[\U00010000-\U0010ffff]')  # Characters outside the BMP (emoji)
+
+
+class FindBar:
+    """Find/replace bar packed above a note's text area"""
+
+    def __init__(self, text, styles, slice_ms=8, ranges_per_call=100,
+                 scan_window=64 * 1024, scan_overlap=4096, get_view=None):
+        self.text = text
+        self.styles = styles
+        self.get_view = get_view or (lambda: None)  # The note's LargeNoteView, if it is windowed
+        self.slice_ms = slice_ms  # Longest a highlight chunk may hold the Tk thread
+        self.ranges_per_call = ranges_per_call  # Match ranges per tag_add call
+        self.scan_window = scan_window  # Characters matched per step of a highlight chunk
+        self.scan_overlap = scan_overlap  # Longest match guaranteed to be found across steps
+        self.restart_delay_ms = 300  # Re-search this long after the note stops changing
+        self.restart_job = None
+        self.frame = None
+        self.buffer = None  # Copy of the text (None when stale)
+        self.view = None  # LargeNoteView the buffer was copied from (offsets are document offsets)
+        self.line_starts = []  # Buffer offset of the start of each line
+        self.wide_columns = False  # Tk counts some buffer characters as two columns
+        self.pattern = None
+        self.matches = []  # (start, end) offsets found so far, in buffer order
+        self.scan_complete = False
+        self.scan_job = None
+        self.scan_position = 0
+        self.current = None  # (start, end) of the selected match
+
+    def build(self):
+        """Create the bar (hidden)"""
+        parent = self.text.master
+        self.colors = self.styles.colors
+        self.frame = tk.Frame(parent, bg=self.colors['bg_medium'])
+        self.styles.register(self.frame, bg='bg_medium')
+
+        self.find_var = tk.StringVar()
+        self.replace_var = tk.StringVar()
+        self.case_var = tk.BooleanVar(value=False)
+        self.regex_var = tk.BooleanVar(value=False)
+
+        entry_style = {
+            'bg': self.colors['bg_light'],
+            'fg': self.colors['text_primary'],
+            'insertbackground': self.colors['accent'],
+            'bd': 0,
+            'font': get_font('small', parent)
+        }
+        self.find_entry = tk.Entry(self.frame, textvariable=self.find_var, width=14, **entry_style)
+        self.find_entry.grid(row=0, column=0, sticky='ew', padx=(5, 2), pady=(4, 2))
+        self.replace_entry = tk.Entry(self.frame, textvariable=self.replace_var, width=14, **entry_style)
+        self.replace_entry.grid(row=1, column=0, sticky='ew', padx=(5, 2), pady=(2, 4))
+        for entry in (self.find_entry, self.replace_entry):
+            self.styles.register(entry, bg='bg_light', fg='text_primary', insertbackground='accent')
+
+        button_style = {
+            'bg': self.colors['bg_medium'],
+            'fg': self.colors['text_primary'],
+            'activebackground': self.colors['bg_light'],
+            'bd': 0,
+            'padx': 4,
+            'font': get_font('small', parent)
+        }
+        buttons = [
+            (0, 1, "▲", self.find_previous),
+            (0, 2, "▼", self.find_next),
+            (0, 4, "×", self.hide),
+            (1, 1, "Replace", self.replace_current),
+            (1, 3, "All", self.replace_all)
+        ]
+        for row, column, label, command in buttons:
+            button = tk.Button(self.frame, text=label, command=command, **button_style)
+            button.grid(row=row, column=column, columnspan=2 if label == "Replace" else 1, sticky='ew')
+            self.styles.register(button, bg='bg_medium', fg='text_primary', activebackground='bg_light')
+
+        for row, column, label, variable in ((0, 3, "Aa", self.case_var), (1, 4, ".*", self.regex_var)):
+            check = tk.Checkbutton(self.frame, text=label, variable=variable,
+                                   command=self.start_search,
+                                   bg=self.colors['bg_medium'],
+                                   fg=self.colors['text_primary'],
+                                   selectcolor=self.colors['bg_light'],
+                                   activebackground=self.colors['bg_medium'],
+                                   font=get_font('small', parent))
+            check.grid(row=row, column=column)
+            self.styles.register(check, bg='bg_medium', fg='text_primary', selectcolor='bg_light',
+                                 activebackground='bg_medium')
+
+        self.count_label = tk.Label(self.frame, text="", bg=self.colors['bg_medium'],
+                                    fg=self.colors['text_secondary'], font=get_font('small', parent))
+        self.count_label.grid(row=2, column=0, columnspan=5, sticky='w', padx=5)
+        self.styles.register(self.count_label, bg='bg_medium', fg='text_secondary')
+        self.frame.columnconfigure(0, weight=1)
+
+        self.text.tag_configure(MATCH_TAG, background='#f6d32d', foreground='#000000')
+        self.text.tag_configure(CURRENT_TAG, background='#ff8c00', foreground='#000000')
+        self.text.tag_raise(CURRENT_TAG, MATCH_TAG)
+
+        self.find_var.trace_add('write', lambda *args: self.start_search())
+        self.find_entry.bind('<Return>', lambda e: self.find_next())
+        self.find_entry.bind('<Shift-Return>', lambda e: self.find_previous())
+        for entry in (self.find_entry, self.replace_entry):
+            entry.bind('<Escape>', lambda e: self.hide())
+
+    def show(self):
+        """Show the bar and focus the find box"""
+        if self.frame is None:
+            self.build()
+        if not self.frame.winfo_ismapped():
+            self.frame.pack(fill='x', padx=10, pady=(5, 0), before=self.text)
+        # Start from the selection, like most editors
+        try:
+            selected = self.text.get('sel.first', 'sel.last')
+            if selected and '\n' not in selected:
+                self.find_var.set(selected)
+        except tk.TclError:
+            pass
+        self.find_entry.focus_set()
+        self.find_entry.select_range(0, 'end')
+        self.start_search()
+
+    def hide(self):
+        """Hide the bar and clear highlights"""
+        if self.restart_job is not None:
+            self.text.after_cancel(self.restart_job)
+            self.restart_job = None
+        self.cancel_scan()
+        self.clear_highlights()
+        if self.frame is not None:
+            self.frame.pack_forget()
+        self.text.focus_set()
+
+    def is_visible(self):
+        """Check whether the bar is shown"""
+        return self.frame is not None and self.frame.winfo_ismapped()
+
+    def on_text_changed(self):
+        """Called on every edit: the buffer copy is stale and offsets moved"""
+        # Tags move with the text, but recorded offsets don't; re-search once editing pauses
+        self.cancel_scan()
+        self.buffer = None
+        self.matches = []
+        self.scan_complete = False
+        self.current = None  # Recovered from CURRENT_TAG, which moves with the text
+        if self.is_visible() and self.find_var.get():
+            if self.restart_job is not None:
+                self.text.after_cancel(self.restart_job)
+            self.restart_job = self.text.after(self.restart_delay_ms, self.start_search)
+
+    def on_view_paged(self):
+        """Called when the windowed view reloads the Text: highlight the matches now in it"""
+        if self.view is not self.get_view():
+            # A different document (the note was reloaded)
+            self.on_text_changed()
+            return
+        if self.buffer is None or self.pattern is None:
+            return
+        low, high = self.window_span()
+        first = max(0, bisect.bisect_left(self.matches, (low, -1)) - 1)
+        last = bisect.bisect_left(self.matches, (high, -1))
+        self.tag_ranges(self.matches[first:last])
+        if self.current is not None:
+            self.tag_ranges([self.current], CURRENT_TAG)
+
+    # Buffer copy and offset <-> index conversion
+
+    def refresh_buffer(self):
+        if self.buffer is None:
+            self.view = self.get_view()
+            if self.view is not None:
+                # The whole document, not just the lines in the Text
+                self.buffer = self.view.get_text()
+            else:
+                self.buffer = self.text.get('1.0', 'end-1c')
+            self.line_starts = [0]
+            self.line_starts.extend(m.end() for m in re.finditer('\n', self.buffer))
+            # Tcl 8.6 counts a character outside the BMP as two, so its columns differ from Python's
+            self.wide_columns = (ASTRAL_PATTERN.search(self.buffer) is not None and
+                                 self.text.tk.call('string', 'length', '\U0001F600') == 2)
+
+    def first_line(self):
+        """Buffer line shown on the Text's first line"""
+        return self.view.start if self.view is not None else 0
+
+    def window_span(self):
+        """Buffer offsets of the text that is in the Text"""
+        if self.view is None:
+            return 0, len(self.buffer)
+        end = self.line_starts[self.view.end] - 1 if self.view.end < len(self.line_starts) else len(self.buffer)
+        return self.line_starts[self.view.start], end
+
+    def line_of(self, offset):
+        return bisect.bisect_right(self.line_starts, offset) - 1
+
+    def to_index(self, offset):
+        """Tk index of a buffer offset (which must be in the Text)"""
+        line = self.line_of(offset)
+        column = offset - self.line_starts[line]
+        if self.wide_columns:
+            column += len(ASTRAL_PATTERN.findall(self.buffer, self.line_starts[line], offset))
+        return f"{line - self.first_line() + 1}.{column}"
+
+    def to_offset(self, index):
+        """Buffer offset of a Tk index"""
+        line, column = map(int, self.text.index(index).split('.'))
+        line += self.first_line()
+        if line - 1 >= len(self.line_starts):
+            return len(self.buffer)
+        offset = self.line_starts[line - 1]
+        if self.wide_columns:
+            # Walk the line, counting two columns for each wide character
+            end = self.line_starts[line] if line < len(self.line_starts) else len(self.buffer)
+            while column > 0 and offset < end:
+                column -= 2 if ord(self.buffer[offset]) > 0xFFFF else 1
+                offset += 1
+            return offset
+        return min(offset + column, len(self.buffer))
+
+    # Searching
+
+    def compile_pattern(self):
+        """Compile the find box contents; returns None (with a message) if unusable"""
+        query = self.find_var.get()
+        if not query:
+            return None
+        flags = 0 if self.case_var.get() else re.IGNORECASE
+        try:
+            return re.compile(query if self.regex_var.get() else re.escape(query), flags)
+        except re.error as e:
+            self.count_label.configure(text=f"Bad pattern: {e}")
+            return None
+
+    def cancel_scan(self):
+        if self.scan_job is not None:
+            self.text.after_cancel(self.scan_job)
+            self.scan_job = None
+
+    def clear_highlights(self):
+        self.text.tag_remove(MATCH_TAG, '1.0', 'end')
+        self.text.tag_remove(CURRENT_TAG, '1.0', 'end')
+        self.matches = []
+        self.current = None
+
+    def start_search(self):
+        """Restart matching for the current query, cancelling any search in progress"""
+        if self.restart_job is not None:
+            self.text.after_cancel(self.restart_job)
+            self.restart_job = None
+        self.cancel_scan()
+        self.clear_highlights()
+        self.scan_complete = False
+        self.pattern = self.compile_pattern()
+        if self.pattern is None:
+            if not self.find_var.get():
+                self.count_label.configure(text="")
+            return
+        self.refresh_buffer()
+
+        # Visible lines first, synchronously, so the user sees hits immediately
+        first = self.to_offset('@0,0 linestart')
+        last = self.to_offset(f'@0,{self.text.winfo_height()} lineend')
+        visible = [m.span() for m in self.pattern.finditer(self.buffer, first, last) if m.end() > m.start()]
+        self.tag_ranges(visible)
+
+        # Then the whole buffer in time slices
+        self.scan_position = 0
+        self.count_label.configure(text="Searching...")
+        self.scan_job = self.text.after_idle(self.scan_chunk)
+
+    def scan_chunk(self):
+        """Find and tag matches for about slice_ms, then yield to the event loop"""
+        self.scan_job = None
+        deadline = time.perf_counter() + self.slice_ms / 1000
+        found = []
+        tagged = 0
+        position = self.scan_position
+        length = len(self.buffer)
+        # Scan in windows so a rare (or slow) pattern can't hold the Tk thread for
+        # a whole pass; matches may run up to scan_overlap past a window's end
+        out_of_time = False
+        while position <= length and not out_of_time:
+            window_end = min(length, position + self.scan_window)
+            next_position = window_end + 1 if window_end == length else window_end
+            for match in self.pattern.finditer(self.buffer, position, min(length, window_end + self.scan_overlap)):
+                start, end = match.span()
+                if start >= window_end and window_end < length:
+                    break
+                if end > start:
+                    found.append((start, end))
+                    next_position = max(next_position, end)
+                    # Dense matches: tag as we go and stop mid-window once the slice is used up
+                    if len(found) - tagged >= self.ranges_per_call:
+                        self.tag_ranges(found[tagged:])
+                        tagged = len(found)
+                        if time.perf_counter() >= deadline:
+                            next_position = end
+                            out_of_time = True
+                            break
+            position = next_position
+            out_of_time = out_of_time or time.perf_counter() >= deadline
+        self.tag_ranges(found[tagged:])
+        self.matches.extend(found)
+        self.scan_position = position
+
+        if position > length:
+            self.scan_complete = True
+            self.update_count()
+        else:
+            self.count_label.configure(text=f"{len(self.matches)} matches...")
+            self.scan_job = self.text.after_idle(self.scan_chunk)
+
+    def tag_ranges(self, spans, tag=MATCH_TAG):
+        """Tag match spans (clipped to the text in the Text), many ranges per Tk call"""
+        low, high = self.window_span()
+        spans = [(max(start, low), min(end, high)) for start, end in spans if end > low and start < high]
+        for i in range(0, len(spans), self.ranges_per_call):
+            indices = []
+            for start, end in spans[i:i + self.ranges_per_call]:
+                indices.append(self.to_index(start))
+                indices.append(self.to_index(end))
+            self.text.tag_add(tag, *indices)
+
+    def update_count(self):
+        if not self.matches:
+            self.count_label.configure(text="No matches")
+        elif self.current in self.matches:
+            self.count_label.configure(text=f"{self.matches.index(self.current) + 1} of {len(self.matches)}")
+        else:
+            self.count_label.configure(text=f"{len(self.matches)} matches")
+
+    # Navigation and replace
+
+    def get_current(self):
+        """The selected match; after an edit it is recovered from its highlight"""
+        if self.current is None:
+            ranges = self.text.tag_ranges(CURRENT_TAG)
+            if ranges:
+                self.refresh_buffer()
+                self.current = (self.to_offset(ranges[0]), self.to_offset(ranges[1]))
+        return self.current
+
+    def show_span(self, span):
+        """Page a match into the Text if the windowed view doesn't hold it"""
+        if self.view is None:
+            return
+        low, high = self.window_span()
+        if not (low <= span[0] and span[1] <= high):
+            # on_view_paged highlights the matches in the new window
+            self.view.page_to(self.line_of(span[0]))
+
+    def select_match(self, span):
+        self.current = span
+        self.show_span(span)
+        start, end = self.to_index(span[0]), self.to_index(span[1])
+        self.text.tag_remove(CURRENT_TAG, '1.0', 'end')
+        self.text.tag_add(CURRENT_TAG, start, end)
+        self.text.mark_set('insert', end)
+        self.text.see(start)
+        if self.scan_complete:
+            self.update_count()
+
+    def find_next(self):
+        """Select the next match after the cursor (wrapping)"""
+        if self.pattern is None:
+            return
+        self.refresh_buffer()
+        current = self.get_current()
+        position = current[1] if current else self.to_offset('insert')
+        match = self.pattern.search(self.buffer, position) or self.pattern.search(self.buffer, 0)
+        if match is not None and match.end() > match.start():
+            self.select_match(match.span())
+
+    def find_previous(self):
+        """Select the match before the cursor (wrapping)"""
+        if self.pattern is None:
+            return
+        self.refresh_buffer()
+        current = self.get_current()
+        position = current[0] if current else self.to_offset('insert')
+        if self.scan_complete:
+            spans = self.matches
+            i = bisect.bisect_left(spans, (position, -1)) - 1
+            span = spans[i] if spans else None
+        else:
+            span = None
+            for match in self.pattern.finditer(self.buffer, 0, position):
+                if match.end() > match.start():
+                    span = match.span()
+            if span is None:
+                for match in self.pattern.finditer(self.buffer, position):
+                    if match.end() > match.start():
+                        span = match.span()
+        if span is not None:
+            self.select_match(span)
+
+    def expand_replacement(self, match):
+        replacement = self.replace_var.get()
+        return match.expand(replacement) if self.regex_var.get() else replacement
+
+    def replace_current(self):
+        """Replace the selected match and move to the next one"""
+        if self.pattern is None:
+            return
+        current = self.get_current()
+        if current is None:
+            self.find_next()
+            return
+        self.refresh_buffer()
+        match = self.pattern.match(self.buffer, current[0])
+        if match is None or match.span() != current:
+            self.find_next()
+            return
+        # In windowed mode the edit goes into the Text, which the view folds
+        # back into the document (and its journal)
+        self.show_span(current)
+        start, end = self.to_index(match.start()), self.to_index(match.end())
+        self.text.delete(start, end)
+        self.text.insert(start, self.expand_replacement(match))
+        self.current = None
+        self.buffer = None
+        self.find_next()
+
+    def replace_all(self):
+        """Replace every match"""
+        pattern = self.compile_pattern()
+        if pattern is None:
+            return
+        self.cancel_scan()
+        self.refresh_buffer()
+        if self.view is not None:
+            self.replace_all_in_view(pattern)
+            return
+        # Indices are computed before the first edit invalidates the buffer copy
+        spans = [(self.to_index(m.start()), self.to_index(m.end()), self.expand_replacement(m))
+                 for m in pattern.finditer(self.buffer) if m.end() > m.start()]
+        # Back to front so earlier indices stay valid; one undo step for the lot
+        self.text.edit_separator()
+        for start_index, end_index, replacement in reversed(spans):
+            self.text.delete(start_index, end_index)
+            self.text.insert(start_index, replacement)
+        self.text.edit_separator()
+        self.buffer = None
+        self.clear_highlights()
+        self.count_label.configure(text=f"Replaced {len(spans)}")
+
+    def replace_all_in_view(self, pattern):
+        """Replace every match in the whole document of the windowed view"""
+        count = 0
+
+        def replace(match):
+            nonlocal count
+            if match.end() == match.start():
+                return ''
+            count += 1
+            return self.expand_replacement(match)
+
+        content = pattern.sub(replace, self.buffer)
+        view = self.view
+        self.buffer = None
+        self.clear_highlights()
+        if count:
+            view.replace_document(content.split('\n'))
+        self.count_label.configure(text=f"Replaced {count}")
@@ -1,21 +1,34 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
-import json
 import uuid
 from datetime import datetime
-import subprocess
 import sys
-import threading
 import winreg
 
+# Shared modules (note store, registries) live in the app directory
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from note_store import get_store
+from process_supervisor import get_process_supervisor
+from instance_lock import is_instance_locked
+from note_host import launch_notes
+
 class InstanceController:
+    ROW_HEIGHT = 76  # Fixed row height used by the virtualized instance list
+    
     def __init__(self):
         self.instances = {}
         self.controller_window = None
         self.item_to_instance_map = {}  # Map treeview items to instance IDs
         self.max_instances = 10  # Maximum number of instances allowed
         self.running_instances = set()  # Track running instances
+        self.store = get_store()  # Shared note store
+        self.instances_generation = None  # Note store index generation of self.instances
+        self.instance_order = []  # Instance IDs in list order
+        self.row_pool = []  # Recycled row widgets; only the visible rows are materialized
         self.colors = {
             'bg_dark': '#1e1e1e',
             'bg_medium': '#2d2d2d',
@@ -31,24 +44,18 @@ class InstanceController:
         self.load_instances()
         
     def load_instances(self):
-        """Load all existing instances from metadata files"""
+        """Load all existing instances from the note store"""
+        # The instance index only changes when its generation does
+        generation = self.store.index_generation()
+        if generation == self.instances_generation:
+            return
+        self.instances_generation = generation
         self.instances = {}
-        home_dir = os.path.expanduser('~')
         
         try:
-            # Scan for all metadata files
-            for filename in os.listdir(home_dir):
-                if filename.startswith('.smart_notes_') and filename.endswith('_metadata.json'):
-                    try:
-                        with open(os.path.join(home_dir, filename), 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-                            instance_id = metadata.get('instance_id')
-                            if instance_id:
-                                self.instances[instance_id] = metadata
-                    except Exception as e:
-                        print(f"Error loading instance metadata {filename}: {e}")
+            self.instances = self.store.list_instances()
         except Exception as e:
-            print(f"Error scanning for instances: {e}")
+            print(f"Error loading instances: {e}")
     
     def create_instance(self):
         """Create a new instance"""
@@ -71,19 +78,11 @@ class InstanceController:
                 'name': f"New Instance {len(self.instances) + 1}",
                 'created_date': datetime.now().isoformat(),
                 'last_modified': datetime.now().isoformat(),
-                'theme': 'dark',
-                'files': {
-                    'settings': f'~/.smart_notes_{instance_id}_settings.json',
-                    'notes': f'~/.smart_notes_{instance_id}_notes.txt',
-                    'position': f'~/.smart_notes_{instance_id}_position.json',
-                    'mini_position': f'~/.smart_notes_{instance_id}_mini_position.json'
-                }
+                'theme': 'dark'
             }
             
             # Save metadata
-            metadata_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{instance_id}_metadata.json')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(instance_metadata, f, indent=2)
+            self.store.put_metadata(instance_id, instance_metadata)
             
             # Add to instances dict
             self.instances[instance_id] = instance_metadata
@@ -110,8 +109,8 @@ class InstanceController:
     def launch_instance(self, instance_id):
         """Launch an existing instance"""
         try:
-            # Check if instance is already running
-            if instance_id in self.running_instances:
+            # Check if instance is already running (here or in another process)
+            if instance_id in self.running_instances or is_instance_locked(instance_id):
                 # Create popup above the controller window
                 popup = tk.Toplevel(self.controller_window)
                 popup.title("Instance Already Open")
@@ -172,28 +171,17 @@ class InstanceController:
             # Add to running instances
             self.running_instances.add(instance_id)
             
-            # Get the current script path
-            script_path = os.path.join(os.path.dirname(__file__), 'sticky_notes_widget.py')
-            
-            # Launch the instance with the instance ID as argument
-            process = subprocess.Popen([sys.executable, script_path, '--instance-id', instance_id])
-            
-            # Monitor process to remove from running instances when it closes
-            def monitor_process():
-                process.wait()
-                if instance_id in self.running_instances:
-                    self.running_instances.remove(instance_id)
-                    # Check if controller window still exists before refreshing
-                    if self.controller_window and self.controller_window.winfo_exists():
-                        try:
-                            self.refresh_instance_list()
-                            self.update_status_labels()
-                        except Exception as e:
-                            print(f"Error refreshing UI after process close: {e}")
-            
-            # Start monitoring in background thread
-            monitor_thread = threading.Thread(target=monitor_process, daemon=True)
-            monitor_thread.start()
+            # Open the note in the shared note host (starting one if needed)
+            process = launch_notes([instance_id])
+            if process is None:
+                # Handed to a running host; there is no process of its own to monitor
+                return
+            
+            # The supervisor reports the exit on the Tk thread
+            supervisor = get_process_supervisor()
+            supervisor.attach(self.controller_window)
+            supervisor.watch(instance_id, process,
+                             on_exit=lambda key, returncode: self.on_host_exited())
             
         except Exception as e:
             messagebox.showerror("Error", f"Could not launch instance: {e}")
@@ -217,33 +205,14 @@ class InstanceController:
                 'name': f"{source_instance['name']} (Copy)",
                 'created_date': datetime.now().isoformat(),
                 'last_modified': datetime.now().isoformat(),
-                'theme': source_instance.get('theme', 'dark'),
-                'files': {
-                    'settings': f'~/.smart_notes_{new_instance_id}_settings.json',
-                    'notes': f'~/.smart_notes_{new_instance_id}_notes.txt',
-                    'position': f'~/.smart_notes_{new_instance_id}_position.json',
-                    'mini_position': f'~/.smart_notes_{new_instance_id}_mini_position.json'
-                }
+                'theme': source_instance.get('theme', 'dark')
             }
             
-            # Copy notes content if source exists
-            source_notes_file = os.path.expanduser(source_instance['files']['notes'])
-            if os.path.exists(source_notes_file):
-                try:
-                    with open(source_notes_file, 'r', encoding='utf-8') as f:
-                        notes_content = f.read()
-                    
-                    # Save to new instance
-                    new_notes_file = os.path.expanduser(cloned_metadata['files']['notes'])
-                    with open(new_notes_file, 'w', encoding='utf-8') as f:
-                        f.write(notes_content)
-                except Exception as e:
-                    print(f"Could not copy notes content: {e}")
-            
-            # Save cloned metadata
-            metadata_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{new_instance_id}_metadata.json')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(cloned_metadata, f, indent=2)
+            # Copy notes content (if any) and save cloned metadata in one transaction
+            notes_content = self.store.get_notes(instance_id)
+            if notes_content is None:
+                notes_content = ''
+            self.store.save_notes(new_instance_id, notes_content, cloned_metadata)
             
             # Add to instances dict
             self.instances[new_instance_id] = cloned_metadata
@@ -386,9 +355,7 @@ class InstanceController:
             instance['last_modified'] = datetime.now().isoformat()
             
             # Save updated metadata
-            metadata_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{instance_id}_metadata.json')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(instance, f, indent=2)
+            self.store.put_metadata(instance_id, instance)
             
             # Refresh the controller UI
             if self.controller_window:
@@ -419,9 +386,7 @@ class InstanceController:
             instance['last_modified'] = datetime.now().isoformat()
             
             # Save updated metadata
-            metadata_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{instance_id}_metadata.json')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(instance, f, indent=2)
+            self.store.put_metadata(instance_id, instance)
             
             # Refresh the controller UI
             if self.controller_window:
@@ -434,6 +399,23 @@ class InstanceController:
             messagebox.showerror("Error", f"Could not rename instance: {e}")
             return False
     
+    def on_host_exited(self):
+        """Handle a note host process exiting (called on the Tk thread)
+
+        Notes handed to the host later share its process, so every running
+        note whose lock went with it has stopped.
+        """
+        stopped = {instance_id for instance_id in self.running_instances if not is_instance_locked(instance_id)}
+        if stopped:
+            self.running_instances -= stopped
+            # Check if controller window still exists before refreshing
+            if self.controller_window and self.controller_window.winfo_exists():
+                try:
+                    self.refresh_instance_list()
+                    self.update_status_labels()
+                except Exception as e:
+                    print(f"Error refreshing UI after process close: {e}")
+    
     def show_controller(self):
         """Show the instance controller window"""
         if self.controller_window and self.controller_window.winfo_exists():
@@ -498,25 +480,22 @@ class InstanceController:
                                  fg=self.colors['text_primary'])
         list_frame.pack(fill='both', expand=True)
         
-        # Create scrollable frame for instances
-        self.canvas = tk.Canvas(list_frame, bg=self.colors['bg_light'], highlightthickness=0)
-        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg=self.colors['bg_light'])
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        # Create virtualized list for instances: the canvas scrolls over
+        # len(instances) * ROW_HEIGHT pixels but only holds the visible rows
+        self.canvas = tk.Canvas(list_frame,
+                                bg=self.colors['bg_light'],
+                                highlightthickness=0,
+                                yscrollincrement=self.ROW_HEIGHT // 4)
+        self.list_scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_list_scrolled)
         
-        # Configure canvas to expand with content
-        self.canvas.bind('<Configure>', lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+        # Re-render when the viewport changes size
+        self.canvas.bind('<Configure>', lambda e: self.render_visible_rows())
+        self.canvas.bind('<MouseWheel>', self.on_list_mousewheel)
         
         # Pack canvas and scrollbar
         self.canvas.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
+        self.list_scrollbar.pack(side='right', fill='y')
         
         # Status bar
         status_frame = tk.Frame(main_frame, bg=self.colors['bg_medium'])
@@ -549,84 +528,113 @@ class InstanceController:
 
     def refresh_instance_list(self):
         """Refresh the instances list in the UI"""
-        # Clear existing widgets
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        self.instance_order = list(self.instances)
         
-        # Add instances to the scrollable frame
-        for instance_id, instance in self.instances.items():
-            self.create_instance_row(instance_id, instance)
+        # Size the scroll region for all rows; only visible rows get widgets
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.instance_order) * self.ROW_HEIGHT))
+        self.render_visible_rows(force=True)
         
         # Update status labels
         self.update_status_labels()
     
-    def create_instance_row(self, instance_id, instance):
-        """Create a row for an instance with action buttons"""
+    def on_list_scrolled(self, first, last):
+        """Keep the scrollbar in sync and materialize newly visible rows"""
+        self.list_scrollbar.set(first, last)
+        self.render_visible_rows()
+    
+    def on_list_mousewheel(self, event):
+        """Scroll the instance list with the mouse wheel"""
+        self.canvas.yview_scroll(int(-event.delta / 120) * 4, 'units')
+    
+    def render_visible_rows(self, force=False):
+        """Bind pooled row widgets to the instances inside the viewport"""
+        if not self.canvas.winfo_exists():
+            return
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        total = len(self.instance_order)
+        
+        first = max(0, int(self.canvas.canvasy(0)) // self.ROW_HEIGHT)
+        visible = max(0, min(total - first, height // self.ROW_HEIGHT + 2))
+        
+        # Grow the pool up to the number of visible rows, never beyond
+        while len(self.row_pool) < visible:
+            self.row_pool.append(self.create_instance_row())
+        
+        for slot, row in enumerate(self.row_pool):
+            if slot >= visible:
+                self.canvas.itemconfigure(row['window'], state='hidden')
+                row['instance_id'] = None
+                continue
+            index = first + slot
+            instance_id = self.instance_order[index]
+            self.canvas.coords(row['window'], 0, index * self.ROW_HEIGHT)
+            self.canvas.itemconfigure(row['window'], state='normal', width=width)
+            if force or row['instance_id'] != instance_id:
+                self.bind_instance_row(row, instance_id)
+    
+    def create_instance_row(self):
+        """Create a reusable row with action buttons for the virtualized list"""
+        row = {'instance_id': None, 'values': None}
+        
         # Create row frame
-        row_frame = tk.Frame(self.scrollable_frame, bg=self.colors['bg_light'], relief='flat', bd=1)
-        row_frame.pack(fill='x', padx=5, pady=2)
+        row_frame = tk.Frame(self.canvas, bg=self.colors['bg_light'], relief='flat', bd=1)
+        row['frame'] = row_frame
+        row['window'] = self.canvas.create_window(0, 0,
+                                                  window=row_frame,
+                                                  anchor='nw',
+                                                  height=self.ROW_HEIGHT,
+                                                  state='hidden')
+        row_frame.bind('<MouseWheel>', self.on_list_mousewheel)
         
         # Instance name (left side)
         name_frame = tk.Frame(row_frame, bg=self.colors['bg_light'])
         name_frame.pack(side='left', fill='y', padx=(10, 0))
         
-        name_label = tk.Label(name_frame,
-                             text=instance.get('name', 'Unnamed'),
-                             bg=self.colors['bg_light'],
-                             fg=self.colors['text_primary'],
-                             font=('Segoe UI', 11, 'bold'),
-                             anchor='w')
-        name_label.pack(anchor='w')
+        row['name_label'] = tk.Label(name_frame,
+                                     bg=self.colors['bg_light'],
+                                     fg=self.colors['text_primary'],
+                                     font=('Segoe UI', 11, 'bold'),
+                                     anchor='w')
+        row['name_label'].pack(anchor='w')
         
         # Instance ID (small text below name)
-        id_label = tk.Label(name_frame,
-                           text=f"ID: {instance_id[:8]}...",
-                           bg=self.colors['bg_light'],
-                           fg=self.colors['text_secondary'],
-                           font=('Segoe UI', 8),
-                           anchor='w')
-        id_label.pack(anchor='w')
+        row['id_label'] = tk.Label(name_frame,
+                                   bg=self.colors['bg_light'],
+                                   fg=self.colors['text_secondary'],
+                                   font=('Segoe UI', 8),
+                                   anchor='w')
+        row['id_label'].pack(anchor='w')
         
         # Dates frame (center)
         dates_frame = tk.Frame(row_frame, bg=self.colors['bg_light'])
         dates_frame.pack(side='left', fill='y', padx=(20, 0))
         
         # Created date
-        created_date = instance.get('created_date', '')[:10] if instance.get('created_date') else 'Unknown'
-        created_label = tk.Label(dates_frame,
-                               text=f"Created: {created_date}",
-                               bg=self.colors['bg_light'],
-                               fg=self.colors['text_secondary'],
-                               font=('Segoe UI', 9),
-                               anchor='w')
-        created_label.pack(anchor='w')
+        row['created_label'] = tk.Label(dates_frame,
+                                        bg=self.colors['bg_light'],
+                                        fg=self.colors['text_secondary'],
+                                        font=('Segoe UI', 9),
+                                        anchor='w')
+        row['created_label'].pack(anchor='w')
         
         # Last modified date
-        last_modified = instance.get('last_modified', '')[:10] if instance.get('last_modified') else 'Unknown'
-        modified_label = tk.Label(dates_frame,
-                                 text=f"Modified: {last_modified}",
-                                 bg=self.colors['bg_light'],
-                                 fg=self.colors['text_secondary'],
-                                 font=('Segoe UI', 9),
-                                 anchor='w')
-        modified_label.pack(anchor='w')
+        row['modified_label'] = tk.Label(dates_frame,
+                                         bg=self.colors['bg_light'],
+                                         fg=self.colors['text_secondary'],
+                                         font=('Segoe UI', 9),
+                                         anchor='w')
+        row['modified_label'].pack(anchor='w')
         
         # Status frame (center-right)
         status_frame = tk.Frame(row_frame, bg=self.colors['bg_light'])
         status_frame.pack(side='left', fill='y', padx=(20, 0))
         
-        # Check if instance is running
-        is_running = instance_id in self.running_instances
-        status_text = "🟢 Running" if is_running else "⚪ Stopped"
-        status_color = self.colors['success'] if is_running else self.colors['text_secondary']
-        
-        status_label = tk.Label(status_frame,
-                               text=status_text,
-                               bg=self.colors['bg_light'],
-                               fg=status_color,
-                               font=('Segoe UI', 10, 'bold'),
-                               anchor='w')
-        status_label.pack(anchor='w')
+        row['status_label'] = tk.Label(status_frame,
+                                       bg=self.colors['bg_light'],
+                                       font=('Segoe UI', 10, 'bold'),
+                                       anchor='w')
+        row['status_label'].pack(anchor='w')
         
         # Actions frame (right side)
         actions_frame = tk.Frame(row_frame, bg=self.colors['bg_light'])
@@ -642,10 +650,11 @@ class InstanceController:
             'cursor': 'hand2'  # Add hand cursor
         }
         
+        # Buttons act on whichever instance the row is currently bound to
         # Open button
         open_btn = tk.Button(actions_frame,
                            text="📖 Open",
-                           command=lambda: self.launch_instance(instance_id),
+                           command=lambda: self.launch_instance(row['instance_id']),
                            bg=self.colors['accent'],
                            fg=self.colors['text_primary'],
                            **button_style)
@@ -654,7 +663,7 @@ class InstanceController:
         # Rename button
         rename_btn = tk.Button(actions_frame,
                              text="✏️ Rename",
-                             command=lambda: self.show_rename_dialog(instance_id),
+                             command=lambda: self.show_rename_dialog(row['instance_id']),
                              bg=self.colors['success'],
                              fg=self.colors['text_primary'],
                              **button_style)
@@ -663,7 +672,7 @@ class InstanceController:
         # Clone button
         clone_btn = tk.Button(actions_frame,
                             text="📋 Clone",
-                            command=lambda: self.clone_instance(instance_id),
+                            command=lambda: self.clone_instance(row['instance_id']),
                             bg=self.colors['accent'],
                             fg=self.colors['text_primary'],
                             **button_style)
@@ -672,7 +681,7 @@ class InstanceController:
         # Delete button
         delete_btn = tk.Button(actions_frame,
                              text="🗑️ Delete",
-                             command=lambda: self.delete_instance(instance_id),
+                             command=lambda: self.delete_instance(row['instance_id']),
                              bg=self.colors['danger'],
                              fg=self.colors['text_primary'],
                              **button_style)
@@ -681,6 +690,35 @@ class InstanceController:
         # Add separator line
         separator = tk.Frame(row_frame, height=1, bg=self.colors['bg_medium'])
         separator.pack(fill='x', pady=(5, 0))
+        
+        return row
+    
+    def bind_instance_row(self, row, instance_id):
+        """Show an instance in a pooled row, reconfiguring only what changed"""
+        instance = self.instances[instance_id]
+        created_date = instance.get('created_date', '')[:10] if instance.get('created_date') else 'Unknown'
+        last_modified = instance.get('last_modified', '')[:10] if instance.get('last_modified') else 'Unknown'
+        
+        # Check if instance is running
+        is_running = instance_id in self.running_instances
+        status_text = "🟢 Running" if is_running else "⚪ Stopped"
+        status_color = self.colors['success'] if is_running else self.colors['text_secondary']
+        
+        values = (instance.get('name', 'Unnamed'),
+                  f"ID: {instance_id[:8]}...",
+                  f"Created: {created_date}",
+                  f"Modified: {last_modified}",
+                  status_text,
+                  status_color)
+        row['instance_id'] = instance_id
+        if values == row['values']:
+            return
+        row['values'] = values
+        row['name_label'].config(text=values[0])
+        row['id_label'].config(text=values[1])
+        row['created_label'].config(text=values[2])
+        row['modified_label'].config(text=values[3])
+        row['status_label'].config(text=values[4], fg=values[5])
     
     def refresh_instances(self):
         """Refresh instances from disk"""
@@ -873,23 +911,8 @@ class InstanceController:
             except Exception as e:
                 print(f"Could not remove auto-start entry: {e}")
             
-            # Delete all instance files
-            home_dir = os.path.expanduser('~')
-            files_to_delete = [
-                f'.smart_notes_{instance_id}_metadata.json',
-                f'.smart_notes_{instance_id}_settings.json',
-                f'.smart_notes_{instance_id}_notes.txt',
-                f'.smart_notes_{instance_id}_position.json',
-                f'.smart_notes_{instance_id}_mini_position.json'
-            ]
-            
-            for filename in files_to_delete:
-                file_path = os.path.join(home_dir, filename)
-                if os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                    except Exception as e:
-                        print(f"Could not delete {filename}: {e}")
+            # Delete all instance data
+            self.store.delete_instance(instance_id)
             
             # Remove from instances dict
             del self.instances[instance_id]
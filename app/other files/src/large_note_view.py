@@ -0,0 +1,168 @@
+"""
+Large note view for Smart Notes
+Keeps a very large note in a Python line array and shows only a window of
+lines around the viewport in the tk.Text, paging lines in and out as the view
+moves, so Tk's memory and layout cost follow the viewport, not the note
+"""
+
+from itertools import islice
+
+
+def save_lines(store, instance_id, lines, metadata=None):
+    """Save a snapshot given as a list of lines (joined on the writer thread)"""
+    return store.save_notes(instance_id, '\n'.join(lines), metadata)
+
+
+class LargeNoteView:
+    """A window of a line-array document shown in a tk.Text
+
+    Document lines [start, end) are in the Text. Edits made in the Text are
+    recorded by the TextEditRecorder in window-local offsets; they are folded
+    back into the document (and shifted to document offsets for the journal)
+    whenever the window moves or the note is saved.
+    """
+
+    def __init__(self, text, recorder, content, window_lines=600, margin=0.2, lines=None, on_page=None):
+        self.text = text
+        self.recorder = recorder
+        self.lines = lines if lines is not None else content.split('\n')
+        self.window_lines = window_lines  # Document lines kept in the Text
+        self.margin = margin  # Page when the view comes this close (fraction of the window) to an edge
+        self.start = 0
+        self.end = 0
+        self.base = 0  # Document offset of line start
+        self.pending_ops = []  # Journal deltas in document offsets, not yet saved
+        self.needs_snapshot = False
+        self.page_job = None
+        self.loaded = False  # The Text holds a window of this document
+        self.paused = False  # No paging while a chunked paste is going into the window
+        self.on_page = on_page  # Called after the window changes (paging is not an edit, so <<Modified>> won't say)
+        self.stats = {'pages': 0}
+
+    def line_count(self):
+        """Lines in the whole document"""
+        return len(self.lines)
+
+    def sync(self):
+        """Fold the Text window (and its recorded edits) back into the document"""
+        if not self.loaded:
+            return
+        window = self.text.get('1.0', 'end-1c').split('\n')
+        self.lines[self.start:self.end] = window
+        self.end = self.start + len(window)
+        ops = self.recorder.take()
+        if ops is None:
+            self.needs_snapshot = True
+        else:
+            self.pending_ops.extend((op, pos + self.base, data) for op, pos, data in ops)
+
+    def take_ops(self):
+        """Journal deltas since the last save, or None if a full snapshot is required"""
+        self.sync()
+        ops, needs_snapshot = self.pending_ops, self.needs_snapshot
+        self.pending_ops = []
+        self.needs_snapshot = False
+        return None if needs_snapshot else ops
+
+    def snapshot_lines(self):
+        """Copy of the document lines, for a snapshot save"""
+        self.sync()
+        return list(self.lines)
+
+    def get_text(self):
+        """The whole document as one string"""
+        self.sync()
+        return '\n'.join(self.lines)
+
+    def _chars(self, first, last):
+        return sum(len(line) + 1 for line in islice(self.lines, first, last))
+
+    def page_to(self, top_line):
+        """Reload the window so that document line top_line is near its top third"""
+        self.sync()
+        count = len(self.lines)
+        start = max(0, min(top_line - self.window_lines // 3, count - self.window_lines))
+        end = min(count, start + self.window_lines)
+
+        # Keep the cursor where it was in the document if it stays in the window
+        insert_line, insert_column = map(int, self.text.index('insert').split('.'))
+        insert_line += self.start - 1
+
+        # The base moves by the lines between the old and new window start
+        if start >= self.start:
+            self.base += self._chars(self.start, start)
+        else:
+            self.base -= self._chars(start, self.start)
+
+        # Paging is not an edit: don't record it and keep the modified flag as it was
+        modified = self.text.edit_modified()
+        self.recorder.enabled = False
+        try:
+            self.text.delete('1.0', 'end')
+            self.text.insert('1.0', '\n'.join(self.lines[start:end]))
+        finally:
+            self.recorder.enabled = True
+        self.text.edit_modified(modified)
+        self.start, self.end = start, end
+        self.loaded = True
+        self.stats['pages'] += 1
+
+        if start <= insert_line < end:
+            self.text.mark_set('insert', f"{insert_line - start + 1}.{insert_column}")
+        else:
+            self.text.mark_set('insert', f"{top_line - start + 1}.0")
+        self.text.yview(f"{top_line - start + 1}.0")
+        if self.on_page is not None:
+            self.on_page()
+
+    def replace_document(self, lines):
+        """Replace the whole document (replace all); the next save writes a snapshot"""
+        top_line = self.start + int(self.text.index('@0,0').split('.')[0]) - 1
+        self.sync()
+        self.lines = lines
+        self.pending_ops = []
+        self.needs_snapshot = True
+        self.show(max(0, min(top_line, len(lines) - 1)))
+        # Unlike paging this is an edit: <<Modified>> marks the note dirty
+        self.text.edit_modified(True)
+
+    def show(self, top_line=0):
+        """Load the first window"""
+        self.loaded = False
+        self.start = self.end = 0
+        self.base = 0
+        self.recorder.clear()
+        self.page_to(top_line)
+
+    def on_view_changed(self):
+        """Called from yscrollcommand: page once the view settles near a window edge"""
+        if self.page_job is None:
+            self.page_job = self.text.after_idle(self.check_window)
+
+    def check_window(self):
+        self.page_job = None
+        if self.paused:
+            return
+        first, last = self.text.yview()
+        near_top = first < self.margin and self.start > 0
+        near_bottom = last > 1 - self.margin and self.end < len(self.lines)
+        if near_top or near_bottom:
+            top_line = self.start + int(self.text.index('@0,0').split('.')[0]) - 1
+            self.page_to(top_line)
+
+    def yview(self):
+        """View position as fractions of the whole document (for the scrollbar)"""
+        first, last = self.text.yview()
+        count = max(1, len(self.lines))
+        window = self.end - self.start
+        return (self.start + first * window) / count, (self.start + last * window) / count
+
+    def moveto(self, fraction):
+        """Scroll so that the given fraction of the document is at the top"""
+        top_line = int(max(0.0, min(1.0, fraction)) * len(self.lines))
+        visible = int(self.text.index(f'@0,{self.text.winfo_height()}').split('.')[0]) - \
+            int(self.text.index('@0,0').split('.')[0]) + 1
+        if self.start <= top_line and (top_line + visible < self.end or self.end == len(self.lines)):
+            self.text.yview(f"{top_line - self.start + 1}.0")
+        else:
+            self.page_to(top_line)
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Note Host for Smart Notes
+Runs many notes in one process: a single hidden Tk root with each note as a Toplevel
+
+The host and any note running in a process of its own answer requests on a local
+endpoint. Note requests look like {'command': 'note', 'instance_id': ..., 'action': ...}
+with action one of ping, save-now, show, hide, get-stats, reload-settings.
+"""
+
+import os
+import sys
+import time
+import zlib
+import queue
+import socket
+import threading
+import subprocess
+import tkinter as tk
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client, answer_challenge, deliver_challenge
+
+# Shared modules (instance locks) live in the app directory
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from instance_lock import InstanceLock
+from single_instance import get_authkey
+
+HOST_SCRIPT = os.path.abspath(__file__)
+HOST_HANDOVER_TIMEOUT = 30.0  # How long a host that lost the endpoint waits for the winner
+STANDBY_IDLE_EXIT_MS = 10 * 60 * 1000  # A standby host with no notes exits after this long
+NOT_OPEN = 'not open'  # Error reply for a note the host does not have open
+
+
+def get_host_address():
+    """Address of the note host's local endpoint (Unix socket, or named pipe on Windows)"""
+    # Overridable so benchmarks and tests can run a private host
+    address = os.environ.get('SMART_NOTES_HOST')
+    if address:
+        return address
+    if os.name == 'nt':
+        return r'\\.\pipe\smart_notes_host_' + os.environ.get('USERNAME', 'user')
+    return os.path.join(os.path.expanduser('~'), '.smart_notes_host.sock')
+
+
+def get_host_lock_name():
+    """Lock guarding the note host endpoint (see instance_lock.py)"""
+    address = os.environ.get('SMART_NOTES_HOST')
+    if address:
+        return f'note_host_{zlib.crc32(address.encode()):08x}'
+    return 'note_host'
+
+
+def endpoint_alive(address):
+    """Check whether something is listening on a Unix socket endpoint"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def get_note_address(instance_id):
+    """Endpoint of a note running in a process of its own (sticky_notes_widget.py --instance-id)"""
+    if os.name == 'nt':
+        return r'\\.\pipe\smart_notes_note_' + instance_id
+    return os.path.join(os.path.expanduser('~'), f'.smart_notes_{instance_id}.sock')
+
+
+def send_request(message, timeout=None, address=None):
+    """Send one request to the note host (or another endpoint); returns the reply, or None if nobody answered"""
+    try:
+        conn = Client(address or get_host_address(), authkey=get_authkey())
+    except (OSError, AuthenticationError):
+        return None
+    try:
+        conn.send(message)
+        if timeout is not None and not conn.poll(timeout):
+            print(f"Note host did not answer within {timeout}s")
+            return None
+        return conn.recv()
+    except (OSError, EOFError) as e:
+        print(f"Note host did not answer: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def ping_host(timeout=None):
+    """Get the running note host's status, or None if no host is running"""
+    return send_request({'command': 'ping'}, timeout)
+
+
+def wait_for_host(timeout=30.0, interval=0.05):
+    """Wait until a note host answers ping; returns its status or None on timeout"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        status = ping_host(timeout)
+        if status is not None or time.perf_counter() >= deadline:
+            return status
+        time.sleep(interval)
+
+
+def request_open(instance_ids, timeout=None):
+    """Ask a running note host to open notes
+
+    Returns {'ready': {instance_id: seconds}} once the notes have painted,
+    or None if no host is running.
+    """
+    return send_request({'command': 'open', 'instance_ids': list(instance_ids)}, timeout)
+
+
+def send_note_command(instance_id, action, timeout=2.0):
+    """Send a control action to a running note, wherever it is hosted
+
+    Returns the note's reply dict, or None if the note is not running.
+    """
+    message = {'command': 'note', 'instance_id': instance_id, 'action': action}
+    reply = send_request(message, timeout)
+    if reply is not None and reply.get('error') != NOT_OPEN:
+        return reply
+    return send_request(message, timeout, address=get_note_address(instance_id))
+
+
+def launch_notes(instance_ids, cwd=None, timeout=None):
+    """Open notes in the running host, or start a host process for them
+
+    timeout bounds the wait for a running host's reply. Returns the new host
+    process, or None when a running host took the request.
+    """
+    instance_ids = list(instance_ids)
+    if request_open(instance_ids, timeout) is not None:
+        return None
+    args = [sys.executable, HOST_SCRIPT]
+    for instance_id in instance_ids:
+        args += ['--instance-id', instance_id]
+    return subprocess.Popen(args, cwd=cwd)
+
+
+def start_standby_host(cwd=None):
+    """Start a warm note host with no notes open, unless one is already running
+
+    The standby host has Tk and the widget modules loaded, so the next launch
+    only costs building the note window. Returns the new process or None.
+    """
+    if ping_host() is not None:
+        return None
+    try:
+        return subprocess.Popen([sys.executable, HOST_SCRIPT, '--standby'], cwd=cwd,
+                                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+    except Exception as e:
+        print(f"Could not start standby note host: {e}")
+        return None
+
+
+class PendingReply:
+    """A reply a handler sends later from the Tk thread, e.g. once a save is on disk
+
+    Only the first send() goes out; the connection stays open until then.
+    """
+
+    def __init__(self):
+        self.conn = None
+        self.reply = None
+        self.sent = False
+
+    def attach(self, conn):
+        """Called by ControlServer with the connection to answer on"""
+        self.conn = conn
+        if self.reply is not None:
+            self._deliver()
+
+    def send(self, reply):
+        if self.sent or self.reply is not None:
+            return
+        self.reply = reply
+        if self.conn is not None:
+            self._deliver()
+
+    def _deliver(self):
+        self.sent = True
+        try:
+            self.conn.send(self.reply)
+        except Exception as e:
+            print(f"Error answering control request: {e}")
+        finally:
+            self.conn.close()
+
+
+class ControlServer:
+    """Local request/response endpoint answered on the Tk thread
+
+    A listener thread accepts connections; each connection is authenticated
+    and read on a thread of its own, so a client that sends nothing holds up
+    only that thread. Requests are answered on the Tk thread, so handlers are
+    free to touch widgets: with a threaded Tcl the connection thread wakes the
+    Tk loop with a virtual event, otherwise the Tk loop polls every poll_ms.
+    A handler that can't answer straight away returns a PendingReply.
+    """
+
+    def __init__(self, address, handler, poll_ms=100, read_timeout=5.0):
+        self.address = address
+        self.handler = handler  # handler(message) -> reply or PendingReply, called on the Tk thread
+        self.poll_ms = poll_ms
+        self.read_timeout = read_timeout  # Seconds an authenticated client has to send its request
+        self.requests = queue.Queue()  # (message, connection) pairs from the listener thread
+        self.listener = None
+        self.root = None
+        self.poll_job = None
+        self.event_driven = False  # Woken by <<ControlRequest>> instead of polling
+
+    def start(self, root):
+        """Start listening and answering requests through root's event loop"""
+        try:
+            # Callers hold the lock guarding the address, so a socket file nobody
+            # listens on is stale; a live one is never taken over
+            if os.name != 'nt' and os.path.exists(self.address):
+                if endpoint_alive(self.address):
+                    print(f"Control endpoint {self.address} is already in use")
+                    return False
+                os.unlink(self.address)
+            self.listener = Listener(self.address)
+            if os.name != 'nt':
+                os.chmod(self.address, 0o600)
+            thread = threading.Thread(target=self._accept_loop, name='ControlListener', daemon=True)
+            thread.start()
+        except Exception as e:
+            print(f"Could not start control endpoint {self.address}: {e}")
+            self.listener = None
+            return False
+        self.root = root
+        self.event_driven = bool(root.tk.call('info', 'exists', 'tcl_platform(threaded)'))
+        if self.event_driven:
+            root.bind('<<ControlRequest>>', lambda e: self.poll(), add='+')
+        self.poll_job = self.root.after(self.poll_ms, self.poll)
+        return True
+
+    def _accept_loop(self):
+        """Listener thread: hand each connection to a thread of its own"""
+        listener = self.listener
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError):
+                break
+            threading.Thread(target=self._read_request, args=(conn,), name='ControlConnection',
+                             daemon=True).start()
+
+    def _read_request(self, conn):
+        """Connection thread: authenticate and queue one request; it is answered from the Tk thread"""
+        try:
+            authkey = get_authkey()
+            deliver_challenge(conn, authkey)
+            answer_challenge(conn, authkey)
+            if not conn.poll(self.read_timeout):
+                conn.close()
+                return
+            self.requests.put((conn.recv(), conn))
+        except Exception as e:
+            print(f"Error reading control request: {e}")
+            conn.close()
+            return
+        if self.event_driven:
+            self.wake()
+
+    def wake(self):
+        """Connection thread: have the Tk thread answer queued requests"""
+        # The call is handed to the Tk thread, which must be in its main loop;
+        # retry while it is still starting up
+        while self.listener is not None:
+            try:
+                self.root.event_generate('<<ControlRequest>>', when='tail')
+                return
+            except RuntimeError:
+                time.sleep(0.1)
+            except tk.TclError:
+                return
+
+    def poll(self):
+        """Answer queued requests on the Tk thread"""
+        self.poll_job = None
+        while True:
+            try:
+                message, conn = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                reply = self.handler(message)
+                if isinstance(reply, PendingReply):
+                    reply.attach(conn)
+                    continue
+                conn.send(reply)
+            except Exception as e:
+                print(f"Error answering control request: {e}")
+            conn.close()
+        if self.listener is not None and not self.event_driven:
+            self.poll_job = self.root.after(self.poll_ms, self.poll)
+
+    def close(self):
+        """Stop listening; the endpoint disappears"""
+        if self.poll_job is not None:
+            self.root.after_cancel(self.poll_job)
+            self.poll_job = None
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+
+
+class NoteHost:
+    """Owns one Tk root and opens each note instance as a Toplevel"""
+
+    def __init__(self, keep_alive=False, poll_ms=100, idle_exit_ms=None, report_ready=False,
+                 startup_trace=False, lock=None):
+        self.root = tk.Tk()
+        self.root.withdraw()  # The host root is never shown; notes are Toplevels
+        self.root.title("Smart Notes Host")
+        self.notes = {}  # Instance ID -> DesktopWidget
+        self.keep_alive = keep_alive  # Keep running after the last note closes
+        self.idle_exit_ms = idle_exit_ms  # With keep_alive, exit after being empty this long
+        self.idle_exit_job = None
+        self.report_ready = report_ready  # Print a READY line per note once it has painted
+        self.startup_trace = startup_trace  # Print each note's startup timeline
+        self.control = ControlServer(get_host_address(), self.handle_request, poll_ms)
+        self.lock = lock  # Host endpoint lock, held until shutdown
+
+    def preload(self):
+        """Import the widget modules and open the note store ahead of the first note"""
+        try:
+            import sticky_notes_widget
+            sticky_notes_widget.get_store()
+            sticky_notes_widget.get_persistence_worker().attach(self.root)
+        except Exception as e:
+            print(f"Could not preload note modules: {e}")
+
+    def start_listener(self):
+        """Accept requests from other processes"""
+        return self.control.start(self.root)
+
+    def handle_request(self, message):
+        """Run one request and build its reply"""
+        command = message.get('command')
+        if command == 'ping':
+            return {'ok': True, 'pid': os.getpid(), 'notes': list(self.notes)}
+        if command == 'note':
+            note = self.notes.get(message.get('instance_id'))
+            if note is None:
+                return {'ok': False, 'error': NOT_OPEN}
+            return note.handle_control(message.get('action'))
+        if command == 'open':
+            ready = {}
+            for instance_id in message.get('instance_ids', []):
+                seconds = self.open_note_timed(instance_id)
+                if seconds is not None:
+                    ready[instance_id] = seconds
+            return {'ok': True, 'ready': ready}
+        return {'ok': False, 'error': f"Unknown command: {command}"}
+
+    def open_note_timed(self, instance_id=None):
+        """Open a note and return the seconds until its first paint, or None on failure"""
+        start = time.perf_counter()
+        note = self.open_note(instance_id)
+        if note is None:
+            return None
+        # Process pending geometry and redraws so the note is on screen
+        self.root.update_idletasks()
+        seconds = time.perf_counter() - start
+        if self.report_ready:
+            print(f"READY {note.instance_id} {seconds:.4f}", flush=True)
+        return seconds
+
+    def open_note(self, instance_id=None):
+        """Open a note in this process, or bring it forward if it is already open"""
+        if instance_id in self.notes:
+            note = self.notes[instance_id]
+            if note.is_minimized:
+                note.restore_widget()
+            note.root.lift()
+            return note
+
+        # Imported here so launch_notes() callers don't pay for the widget module
+        from sticky_notes_widget import DesktopWidget
+        from instance_lock import InstanceAlreadyRunning
+        from startup_trace import StartupTrace
+        try:
+            note = DesktopWidget(instance_id, master=self.root, host=self,
+                                 restored=instance_id is not None,
+                                 trace=StartupTrace(self.startup_trace, label=f"note {instance_id}"))
+        except InstanceAlreadyRunning:
+            # Another process runs this note; bring that copy forward instead
+            print(f"Note {instance_id} is already running in another process")
+            send_request({'command': 'note', 'instance_id': instance_id, 'action': 'show'},
+                         timeout=1.0, address=get_note_address(instance_id))
+            return None
+        except Exception as e:
+            print(f"Could not open note {instance_id}: {e}")
+            return None
+        self.notes[note.instance_id] = note
+        if self.idle_exit_job is not None:
+            self.root.after_cancel(self.idle_exit_job)
+            self.idle_exit_job = None
+        return note
+
+    def on_note_closed(self, instance_id):
+        """Called by a note after it has saved and destroyed its windows"""
+        self.notes.pop(instance_id, None)
+        if not self.notes:
+            if not self.keep_alive:
+                self.shutdown()
+            else:
+                self.schedule_idle_exit()
+
+    def schedule_idle_exit(self):
+        """Exit a kept-alive host that stays empty for idle_exit_ms"""
+        if self.idle_exit_ms is not None and self.idle_exit_job is None:
+            self.idle_exit_job = self.root.after(self.idle_exit_ms, self.on_idle_exit)
+
+    def on_idle_exit(self):
+        self.idle_exit_job = None
+        if not self.notes:
+            self.shutdown()
+
+    def shutdown(self):
+        """Stop accepting requests and leave the main loop"""
+        self.control.close()
+        if self.lock is not None:
+            self.lock.release()
+        self.root.quit()
+
+    def run(self):
+        """Start the host main loop"""
+        if not self.notes and not self.keep_alive:
+            print("No notes could be opened.")
+            return
+        if not self.notes:
+            self.schedule_idle_exit()
+        self.root.mainloop()
+
+
+def hand_over(instance_ids, host_lock):
+    """Give the notes to the host that holds the endpoint lock
+
+    Returns True if this process got the lock after all (the other host went
+    away) and should host the notes itself.
+    """
+    deadline = time.perf_counter() + HOST_HANDOVER_TIMEOUT
+    while time.perf_counter() < deadline:
+        if ping_host(1.0) is not None:
+            if instance_ids and request_open(instance_ids) is not None:
+                print(f"Opened {len(instance_ids)} note(s) in the running note host")
+            else:
+                print("A note host is already running")
+            return False
+        if host_lock.acquire():
+            return True
+        time.sleep(0.05)
+    print("Another note host holds the endpoint but is not answering")
+    return False
+
+
+def main():
+    """Main entry point"""
+    instance_ids = []
+    standby = '--standby' in sys.argv
+    keep_alive = standby or '--keep-alive' in sys.argv
+    args = sys.argv[1:]
+    for i, arg in enumerate(args):
+        if arg == '--instance-id' and i + 1 < len(args):
+            instance_ids.append(args[i + 1])
+
+    # Hand the request to a host that is already running
+    if instance_ids and request_open(instance_ids) is not None:
+        print(f"Opened {len(instance_ids)} note(s) in the running note host")
+        return
+    if standby and ping_host() is not None:
+        print("A note host is already running")
+        return
+
+    # Only one host owns the endpoint. A host started at the same moment as
+    # another (the manager's standby host and a launch) hands its notes over
+    host_lock = InstanceLock(get_host_lock_name())
+    if not host_lock.acquire():
+        if not hand_over(instance_ids, host_lock):
+            return
+
+    host = NoteHost(keep_alive=keep_alive,
+                    idle_exit_ms=STANDBY_IDLE_EXIT_MS if standby else None,
+                    report_ready='--report-ready' in sys.argv,
+                    startup_trace='--startup-trace' in sys.argv,
+                    lock=host_lock)
+    host.start_listener()
+    if standby:
+        # Stay warm without opening a note
+        host.preload()
+    else:
+        for instance_id in instance_ids or [None]:
+            host.open_note_timed(instance_id)
+    host.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Startup trace for Smart Notes
+Records a timeline of startup phases, printed when --startup-trace is given
+"""
+
+import time
+
+
+class StartupTrace:
+    """Collects (phase, time) marks and prints them as a timeline relative to start"""
+
+    def __init__(self, enabled=False, start=None, label='startup'):
+        self.enabled = enabled
+        self.start = start if start is not None else time.perf_counter()
+        self.label = label
+        self.marks = []
+
+    def mark(self, phase, at=None):
+        """Record that a phase finished (now, or at an earlier perf_counter() time)"""
+        if self.enabled:
+            self.marks.append((phase, at if at is not None else time.perf_counter()))
+
+    def report(self):
+        """Print the timeline"""
+        if not self.enabled:
+            return
+        print(f"Startup trace ({self.label}):")
+        previous = self.start
+        for phase, at in self.marks:
+            print(f"  {(at - self.start) * 1000:8.1f} ms  (+{(at - previous) * 1000:7.1f} ms)  {phase}")
+            previous = at
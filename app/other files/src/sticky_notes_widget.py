@@ -1,46 +1,60 @@
+import time
+MODULE_LOAD_START = time.perf_counter()  # For --startup-trace
+
 import tkinter as tk
-from tkinter import ttk, messagebox
 import os
-import json
 import sys
-import winreg
-import uuid
+import threading
 from datetime import datetime
 
+# Shared modules (note store, registries) live in the app directory
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from note_store import get_store
+from persistence_worker import get_persistence_worker
+from edit_recorder import TextEditRecorder
+from instance_lock import InstanceLock, InstanceAlreadyRunning
+from startup_trace import StartupTrace
+from style_registry import THEMES, StyleRegistry, get_font
+
+# Only needed after the window is shown (or never): imported where used
+# messagebox, winreg, uuid, asset_cache, find_bar, large_note_view, note_host (control channel)
+
+MODULE_LOADED = time.perf_counter()
+
 class DesktopWidget:
     # Class variable to track all instances
     _instance_registry = {}
-    _registry_file = os.path.join(os.path.expanduser('~'), '.smart_notes_instance_registry.json')
+    _registry_name = 'instance_registry'
     
     @classmethod
     def register_instance(cls, instance_id, metadata):
         """Register an instance in the global registry"""
         cls._instance_registry[instance_id] = metadata
-        cls._save_instance_registry()
+        get_persistence_worker().submit('instance registry', get_store().put_registry_entry,
+                                        cls._registry_name, instance_id, dict(metadata))
     
     @classmethod
     def unregister_instance(cls, instance_id):
         """Unregister an instance from the global registry"""
         if instance_id in cls._instance_registry:
             del cls._instance_registry[instance_id]
-            cls._save_instance_registry()
+            get_persistence_worker().submit('instance registry', get_store().remove_registry_entry,
+                                            cls._registry_name, instance_id)
     
     @classmethod
     def _save_instance_registry(cls):
-        """Save the instance registry to file"""
-        try:
-            with open(cls._registry_file, 'w', encoding='utf-8') as f:
-                json.dump(cls._instance_registry, f, indent=2)
-        except Exception as e:
-            print(f"Could not save instance registry: {e}")
+        """Save the instance registry to the note store"""
+        get_persistence_worker().submit('instance registry', get_store().replace_registry,
+                                        cls._registry_name, dict(cls._instance_registry))
     
     @classmethod
     def _load_instance_registry(cls):
-        """Load the instance registry from file"""
+        """Load the instance registry from the note store"""
         try:
-            if os.path.exists(cls._registry_file):
-                with open(cls._registry_file, 'r', encoding='utf-8') as f:
-                    cls._instance_registry = json.load(f)
+            cls._instance_registry = get_store().get_registry(cls._registry_name)
         except Exception as e:
             print(f"Could not load instance registry: {e}")
             cls._instance_registry = {}
@@ -52,15 +66,18 @@ class DesktopWidget:
             cls._load_instance_registry()
         return cls._instance_registry
     
-    def __init__(self, instance_id=None):
+    def __init__(self, instance_id=None, master=None, host=None, restored=None, trace=None):
         print("Initializing Desktop Widget...")
         
-        # Load the instance registry first
-        self._load_instance_registry()
+        # When hosted, this note is a Toplevel of the note host's Tk root (see note_host.py)
+        self.host = host
+        self.restored = restored
+        self.trace = trace or StartupTrace()
         
         # Generate instance ID if not provided
         if instance_id is None:
             # Check if there are existing instances to restore
+            self._load_instance_registry()
             existing_instances = self.get_instance_registry()
             if existing_instances:
                 # Use the first available instance ID
@@ -68,6 +85,7 @@ class DesktopWidget:
                 print(f"Restoring existing instance: {instance_id}")
             else:
                 # Create new instance ID
+                import uuid
                 instance_id = str(uuid.uuid4())
                 print(f"Creating new instance: {instance_id}")
         else:
@@ -75,66 +93,93 @@ class DesktopWidget:
         
         self.instance_id = instance_id
         
+        # Only one process may run a given note at a time
+        self.instance_lock = InstanceLock(self.instance_id)
+        if not self.instance_lock.acquire():
+            raise InstanceAlreadyRunning(self.instance_id)
+        
         # Store default size
         self.default_width = 300
         self.default_height = 400
         
-        # Define color scheme
-        self.colors = {
-            'bg_dark': '#1e1e1e',
-            'bg_medium': '#2d2d2d',
-            'bg_light': '#363636',
-            'text_primary': '#ffffff',
-            'text_secondary': '#cccccc',
-            'accent': '#007acc',
-            'success': '#28a745'
-        }
-        
         # Initialize state variables
         self.is_locked = False
         self.is_minimized = False
         self.is_resizable = False
         
-        # Default themes
-        self.themes = {
-            'dark': {
-                'bg_dark': '#1e1e1e',
-                'bg_medium': '#2d2d2d',
-                'bg_light': '#363636',
-                'text_primary': '#ffffff',
-                'text_secondary': '#cccccc',
-                'accent': '#007acc',
-                'success': '#28a745'
-            },
-            'light': {
-                'bg_dark': '#f0f0f0',
-                'bg_medium': '#e1e1e1',
-                'bg_light': '#ffffff',
-                'text_primary': '#000000',
-                'text_secondary': '#666666',
-                'accent': '#0066cc',
-                'success': '#28a745'
-            },
-            'blue': {
-                'bg_dark': '#1a1a2e',
-                'bg_medium': '#16213e',
-                'bg_light': '#0f3460',
-                'text_primary': '#ffffff',
-                'text_secondary': '#a8a8a8',
-                'accent': '#e94560',
-                'success': '#48bb78'
-            }
+        # Autosave state (driven by the Text <<Modified>> flag, see on_text_modified)
+        self.autosave_idle_ms = 2000  # Save once typing has been idle this long
+        self.autosave_max_interval_ms = 30000  # Never keep edits unsaved longer than this
+        self.is_dirty = False
+        self.autosave_idle_job = None
+        self.autosave_max_job = None
+        self.autosave_stats = {'saves_performed': 0, 'saves_skipped': 0}
+        self.journal_compact_bytes = 256 * 1024  # Fold the edit journal into a snapshot past this size
+        self.journal_compact_ops = 2000  # ... or past this many ops (each op costs a chunk copy on replay)
+        
+        # Geometry/settings persistence is coalesced (see schedule_persist)
+        self.persist_quiet_ms = 500  # At most one write per interval while dragging
+        self.persist_pending = set()
+        self.persist_job = None
+        
+        # Control channel endpoint (only for notes running in a process of their own)
+        self.control = None
+        self.control_flush_timeout = 1.5  # save-now answers 'pending' if not written by then (callers wait 2 s)
+        
+        # Find/replace bar, created the first time it's opened (Ctrl+F)
+        self.find_bar = None
+        
+        # Performance mode: large notes switch to a fast profile (no wrap, throttled
+        # scrollbar, earlier journal compaction) or, above windowed_chars, to a
+        # window of lines (see large_note_view.py). Thresholds are kept in settings.
+        self.performance_thresholds = {
+            'fast_mode_chars': 1024 * 1024,  # Note size that enables the fast profile
+            'long_line_chars': 10000,  # Longest line that enables the fast profile
+            'windowed_chars': 4 * 1024 * 1024,  # Note size shown through a window of lines
+            'paste_measure_chars': 64 * 1024,  # Pastes at least this large re-measure the note
+            'chunked_insert_chars': 256 * 1024,  # Loads and pastes this large are inserted in chunks
+            'scrollbar_throttle_ms': 100,  # Scrollbar refresh interval in the fast profile
+            'large_journal_compact_ops': 500  # Journal ops kept before compaction in fast/windowed mode
         }
-        
-        # Set default theme
+        self.performance_mode = 'normal'  # normal, fast or windowed
+        self.performance_stats = {'mode': 'normal', 'chars': 0, 'lines': 0, 'longest_line': 0,
+                                  'measure_ms': 0.0, 'mode_switches': 0}
+        self.normal_journal_compact_ops = self.journal_compact_ops
+        self.scrollbar_throttle_ms = 0
+        self.scrollbar_job = None
+        # Custom scrollbar state: redraws are coalesced to one per idle cycle,
+        # drag scrolling to one per frame
+        self.scrollbar_frame_ms = 16
+        self.scrollbar_view = (0.0, 1.0)  # Last (first, last) from yscrollcommand
+        self.scrollbar_height = 0  # Canvas height, tracked with <Configure>
+        self.scrollbar_thumb_coords = None
+        self.scrollbar_visible = True
+        self.scrollbar_drag_ratio = None
+        self.scrollbar_drag_job = None
+        # Window drag/resize: motion events only queue the latest geometry,
+        # which is applied at most once per frame
+        self.geometry_frame_ms = 16
+        self.pending_geometry = {}
+        self.geometry_job = None
+        self.large_view = None
+        self.chunked_insert = None  # Load or paste still being inserted (see chunked_insert.py)
+        
+        # Themes are shared by all notes in the process; the style registry
+        # knows which widget options follow which theme role
+        self.themes = THEMES
         self.current_theme = 'dark'
-        self.colors = self.themes[self.current_theme]
+        self.styles = StyleRegistry(self.current_theme)
+        self.colors = self.styles.colors
+        
+        # All instance state (notes, settings, positions, metadata) lives in the note store;
+        # writes are snapshotted on the Tk thread and performed by the persistence worker
+        self.store = get_store()
+        self.persistence = get_persistence_worker()
         
-        # Define instance-specific file paths
-        self.settings_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{self.instance_id}_settings.json')
-        self.notes_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{self.instance_id}_notes.txt')
-        self.position_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{self.instance_id}_position.json')
-        self.mini_position_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{self.instance_id}_mini_position.json')
+        # Settings, position and mini position are fetched in one query before the
+        # first paint; later loads (e.g. reload-settings) read the store directly
+        self.startup_documents = self.store.get_documents(self.instance_id)
+        self.trace.mark('note store opened')
         
         # Instance metadata
         self.instance_name = f"Instance {self.instance_id[:8]}"
@@ -142,8 +187,14 @@ class DesktopWidget:
         self.instance_last_modified = datetime.now().isoformat()
         
         # Create the main window
-        self.root = tk.Tk()
+        if master is not None:
+            self.root = tk.Toplevel(master)
+        else:
+            self.root = tk.Tk()
         self.root.title(f"Smart Notes - {self.instance_name}")
+        # Results are delivered through the process root, which outlives hosted notes
+        self.persistence.attach(master if master is not None else self.root)
+        self.trace.mark('window created')
         
         # Set window attributes
         self.root.overrideredirect(True)  # Remove window decorations
@@ -153,6 +204,7 @@ class DesktopWidget:
         
         # Create UI components
         self.create_widget_ui()
+        self.trace.mark('UI built')
         
         # Set window attributes
         self.root.overrideredirect(True)  # Remove window decorations
@@ -175,9 +227,7 @@ class DesktopWidget:
         
         # Make widget draggable
         self.make_draggable()
-        
-        # Load saved notes
-        self.load_notes()
+        self.trace.mark('settings and position applied')
         
         # Check if this is a restored instance (auto-start)
         self.is_restored_instance = self.check_if_restored_instance()
@@ -188,6 +238,23 @@ class DesktopWidget:
         
         # Ensure proper window sizing
         self.root.update_idletasks()
+        self.trace.mark('first paint')
+        
+        # Notes, registration and the control channel wait until the window is up
+        self.startup_complete = False
+        self.root.after(0, self.finish_startup)
+        
+        print(f"Widget shown for instance: {self.instance_id}")
+        if self.is_restored_instance:
+            print("Instance restored in minimized widget mode")
+    
+    def finish_startup(self):
+        """Second startup phase, run once the window is on screen"""
+        self.startup_documents = {}
+        
+        # Load saved notes
+        self.load_notes()
+        self.trace.mark('notes loaded')
         
         # Save instance metadata
         self.save_instance_metadata()
@@ -198,42 +265,53 @@ class DesktopWidget:
             'created_date': self.instance_created,
             'last_modified': self.instance_last_modified,
             'theme': self.current_theme,
-            'auto_start': self.check_auto_start_status(),
-            'files': {
-                'settings': self.settings_file,
-                'notes': self.notes_file,
-                'position': self.position_file,
-                'mini_position': self.mini_position_file
-            }
+            'auto_start': self.check_auto_start_status()
         })
         
+        # The manager keeps running status from these notices (and the instance locks)
+        self.notify_manager(True)
+        
+        # Hosted notes are reached through the host's endpoint; a note running
+        # in a process of its own serves the control channel itself
+        if self.host is None:
+            from note_host import ControlServer, get_note_address
+            self.control = ControlServer(get_note_address(self.instance_id), self.handle_control_request)
+            self.control.start(self.root)
+        self.trace.mark('registered')
+        
+        self.startup_complete = True
         print(f"Widget initialization complete for instance: {self.instance_id}")
-        if self.is_restored_instance:
-            print("Instance restored in minimized widget mode")
+        self.trace.report()
     
     def create_widget_ui(self):
         """Create the modern UI components"""
         # Main container with rounded corners
         main_frame = tk.Frame(self.root, bg=self.colors['bg_dark'])
         main_frame.pack(fill='both', expand=True, padx=2, pady=2)
+        self.styles.register(self.root, bg='bg_dark')
+        self.styles.register(main_frame, bg='bg_dark')
         
         # Modern header with gradient effect
         header_frame = tk.Canvas(main_frame, height=40, bg=self.colors['bg_medium'], highlightthickness=0)
         header_frame.pack(fill='x', padx=0, pady=0)
+        self.styles.register(header_frame, bg='bg_medium')
         
         # Create gradient effect
-        header_frame.create_rectangle(0, 0, self.default_width, 40, fill=self.colors['bg_medium'], width=0)
+        header_rect = header_frame.create_rectangle(0, 0, self.default_width, 40, fill=self.colors['bg_medium'], width=0)
+        self.styles.register_item(header_frame, header_rect, fill='bg_medium')
         
         # Title with modern font
-        title_label = tk.Label(header_frame, 
+        self.title_label = title_label = tk.Label(header_frame, 
                               text="📝 Smart Notes", 
                               bg=self.colors['bg_medium'],
                               fg=self.colors['text_primary'], 
-                              font=('Segoe UI', 12, 'bold'))
+                              font=get_font('title', self.root))
+        self.styles.register(title_label, bg='bg_medium', fg='text_primary')
         header_frame.create_window(10, 20, window=title_label, anchor='w')
         
         # Control buttons container
         controls_frame = tk.Frame(header_frame, bg=self.colors['bg_medium'])
+        self.styles.register(controls_frame, bg='bg_medium')
         header_frame.create_window(self.default_width - 10, 20, window=controls_frame, anchor='e')
         
         # Modern button style with hover effects
@@ -250,45 +328,60 @@ class DesktopWidget:
                             command=self.close_widget,
                             fg='#ff4444',
                             activeforeground='#ff6666',
-                            font=('Segoe UI', 14, 'bold'),
+                            font=get_font('large', self.root),
                             **button_style)
         close_btn.pack(side='right', padx=2)
+        self.styles.register(close_btn, bg='bg_medium', activebackground='bg_light')
         
         # Lock button with color feedback
         self.lock_btn = tk.Button(controls_frame, 
                                 text="🔓", 
                                 command=self.toggle_lock,
                                 fg=self.colors['text_primary'],
-                                font=('Segoe UI', 11),
+                                font=get_font('body', self.root),
                                 **button_style)
         self.lock_btn.pack(side='left', padx=2)
+        self.styles.register(self.lock_btn, bg='bg_medium', activebackground='bg_light', fg='text_primary')
         
         # Settings button
         self.settings_btn = tk.Button(controls_frame, 
                                     text="⚙️", 
                                     command=self.show_settings,
                                     fg=self.colors['text_primary'],
-                                    font=('Segoe UI', 11),
+                                    font=get_font('body', self.root),
                                     **button_style)
         self.settings_btn.pack(side='left', padx=2)
+        self.styles.register(self.settings_btn, bg='bg_medium', activebackground='bg_light', fg='text_primary')
         
         # Instance Controller button
         self.controller_btn = tk.Button(controls_frame, 
                                       text="📋", 
                                       command=self.show_instance_controller,
                                       fg=self.colors['text_primary'],
-                                      font=('Segoe UI', 11),
+                                      font=get_font('body', self.root),
                                       **button_style)
         self.controller_btn.pack(side='left', padx=2)
+        self.styles.register(self.controller_btn, bg='bg_medium', activebackground='bg_light', fg='text_primary')
+        
+        # Find button
+        find_btn = tk.Button(controls_frame, 
+                            text="🔍", 
+                            command=self.show_find_bar,
+                            fg=self.colors['text_primary'],
+                            font=get_font('body', self.root),
+                            **button_style)
+        find_btn.pack(side='left', padx=2)
+        self.styles.register(find_btn, bg='bg_medium', activebackground='bg_light', fg='text_primary')
         
         # Minimize button
         minimize_btn = tk.Button(controls_frame, 
                                 text="−", 
                                 command=self.minimize_widget,
                                 fg=self.colors['text_secondary'],
-                                font=('Segoe UI', 11),
+                                font=get_font('body', self.root),
                                 **button_style)
         minimize_btn.pack(side='left', padx=2)
+        self.styles.register(minimize_btn, bg='bg_medium', activebackground='bg_light', fg='text_secondary')
         
         # Notes area
         self.text = tk.Text(main_frame,
@@ -296,11 +389,21 @@ class DesktopWidget:
                            bg=self.colors['bg_light'],
                            fg=self.colors['text_primary'],
                            insertbackground=self.colors['accent'],
-                           font=('Segoe UI', 11),
+                           font=get_font('body', self.root),
                            bd=0,
                            padx=10,
                            pady=10)
         self.text.pack(fill='both', expand=True, padx=10, pady=10)
+        self.styles.register(self.text, bg='bg_light', fg='text_primary', insertbackground='accent')
+        self.text.bind('<<Modified>>', self.on_text_modified)
+        self.text.bind('<<Paste>>', self.on_paste)
+        
+        # Record edits as deltas for the append-only note journal
+        self.edit_recorder = TextEditRecorder(self.text)
+        
+        # Ctrl+F opens the find bar (the Text class binding would move the cursor)
+        self.text.bind('<Control-f>', lambda e: self.show_find_bar() or 'break')
+        self.root.bind('<Control-f>', lambda e: self.show_find_bar())
         
         # Create modern custom scrollbar
         self.create_modern_scrollbar(main_frame)
@@ -326,6 +429,7 @@ class DesktopWidget:
                 self.resize_canvas.unbind("<B1-Motion>")
                 self.resize_canvas.unbind("<ButtonRelease-1>")
             self.lock_btn.configure(text="🔒", fg=self.colors['success'])
+            self.styles.register(self.lock_btn, fg='success')
         else:
             self.make_draggable()
             self.enable_resize()
@@ -340,6 +444,7 @@ class DesktopWidget:
                 self.resize_canvas.bind("<B1-Motion>", self.on_resize)
                 self.resize_canvas.bind("<ButtonRelease-1>", self.stop_resize)
             self.lock_btn.configure(text="🔓", fg=self.colors['text_primary'])
+            self.styles.register(self.lock_btn, fg='text_primary')
         self.save_settings()
 
     def create_resize_handle(self, parent):
@@ -347,6 +452,7 @@ class DesktopWidget:
         # Create resize handle frame
         self.resize_handle = tk.Frame(parent, width=20, height=20, bg=self.colors['bg_dark'])
         self.resize_handle.pack(side='bottom', anchor='se', padx=0, pady=0)
+        self.styles.register(self.resize_handle, bg='bg_dark')
         
         # Create canvas for the resize handle
         self.resize_canvas = tk.Canvas(self.resize_handle, 
@@ -355,6 +461,7 @@ class DesktopWidget:
                                      bg=self.colors['bg_dark'],
                                      highlightthickness=0)
         self.resize_canvas.pack()
+        self.styles.register(self.resize_canvas, bg='bg_dark')
         
         # Draw resize handle (corner triangle with dots)
         self.resize_canvas.create_polygon(0, 20, 20, 20, 20, 0, 
@@ -362,6 +469,7 @@ class DesktopWidget:
                                         outline=self.colors['text_primary'],
                                         width=1,
                                         tags="resize_handle")
+        self.styles.register_item(self.resize_canvas, "resize_handle", fill='accent', outline='text_primary')
         
         # Add dots to indicate resize functionality
         self.resize_canvas.create_oval(12, 12, 16, 16, 
@@ -376,6 +484,7 @@ class DesktopWidget:
                                      fill=self.colors['text_primary'],
                                      outline='',
                                      tags="resize_dots")
+        self.styles.register_item(self.resize_canvas, "resize_dots", fill='text_primary')
         
         # Add hover effects
         self.resize_canvas.bind("<Enter>", self.resize_handle_enter)
@@ -410,6 +519,7 @@ class DesktopWidget:
         # Create scrollbar frame
         self.scrollbar_frame = tk.Frame(parent, width=12, bg=self.colors['bg_dark'])
         self.scrollbar_frame.pack(side='right', fill='y', padx=(0, 5))
+        self.styles.register(self.scrollbar_frame, bg='bg_dark')
         
         # Create scrollbar canvas
         self.scrollbar_canvas = tk.Canvas(self.scrollbar_frame, 
@@ -418,57 +528,82 @@ class DesktopWidget:
                                         highlightthickness=0,
                                         relief='flat')
         self.scrollbar_canvas.pack(fill='y', expand=True)
+        self.styles.register(self.scrollbar_canvas, bg='bg_dark')
         
         # Create scrollbar track (background)
-        self.scrollbar_canvas.create_rectangle(0, 0, 12, 400, 
+        scrollbar_track = self.scrollbar_canvas.create_rectangle(0, 0, 12, 400, 
                                              fill=self.colors['bg_medium'],
                                              outline='',
                                              width=0)
+        self.styles.register_item(self.scrollbar_canvas, scrollbar_track, fill='bg_medium')
         
         # Create scrollbar thumb (the draggable part)
         self.scrollbar_thumb = self.scrollbar_canvas.create_rectangle(2, 0, 10, 50,
                                                                     fill=self.colors['accent'],
                                                                     outline='',
                                                                     width=0)
+        self.styles.register_item(self.scrollbar_canvas, self.scrollbar_thumb, fill='accent')
         
         # Bind scrollbar events
+        self.scrollbar_canvas.bind("<Configure>", self.on_scrollbar_configure)
         self.scrollbar_canvas.bind("<Button-1>", self.scrollbar_click)
         self.scrollbar_canvas.bind("<B1-Motion>", self.scrollbar_drag)
         self.scrollbar_canvas.bind("<MouseWheel>", self.scrollbar_wheel)
         
-        # Bind text widget to update scrollbar
-        self.text.configure(yscrollcommand=self.update_scrollbar)
-        
         # Configure text widget to use custom scrolling
         self.text.configure(yscrollcommand=self.update_scrollbar)
         
         # Initial scrollbar update
         self.update_scrollbar()
 
+    def on_scrollbar_configure(self, event):
+        """Track the scrollbar canvas height and redraw the thumb for it"""
+        if event.height != self.scrollbar_height:
+            self.scrollbar_height = event.height
+            self.update_scrollbar()
+    
     def scrollbar_click(self, event):
         """Handle scrollbar click"""
         if not self.is_locked:
+            # A click overrides a drag step that hasn't been applied yet
+            if self.scrollbar_drag_job is not None:
+                self.root.after_cancel(self.scrollbar_drag_job)
+                self.scrollbar_drag_job = None
+            
             # Get scrollbar position
-            scrollbar_height = self.scrollbar_canvas.winfo_height()
+            scrollbar_height = self.scrollbar_height or self.scrollbar_canvas.winfo_height()
             click_y = event.y
             
             # Calculate scroll position
             content_height = float(self.text.index('end-1c').split('.')[0])
             visible_height = self.text.winfo_height() // 20  # Approximate line height
             
-            if content_height > visible_height:
+            if self.large_view is not None:
+                self.large_view.moveto(click_y / scrollbar_height)
+            elif content_height > visible_height:
                 scroll_ratio = click_y / scrollbar_height
                 target_line = int(scroll_ratio * content_height)
                 self.text.yview_moveto(scroll_ratio)
 
     def scrollbar_drag(self, event):
-        """Handle scrollbar drag"""
+        """Handle scrollbar drag (the latest position is applied once per frame)"""
         if not self.is_locked:
-            scrollbar_height = self.scrollbar_canvas.winfo_height()
+            scrollbar_height = self.scrollbar_height or self.scrollbar_canvas.winfo_height()
+            if scrollbar_height <= 0:
+                return
             drag_y = max(0, min(event.y, scrollbar_height))
             
-            scroll_ratio = drag_y / scrollbar_height
-            self.text.yview_moveto(scroll_ratio)
+            self.scrollbar_drag_ratio = drag_y / scrollbar_height
+            if self.scrollbar_drag_job is None:
+                self.scrollbar_drag_job = self.root.after(self.scrollbar_frame_ms, self.apply_scrollbar_drag)
+    
+    def apply_scrollbar_drag(self):
+        """Scroll to the last drag position"""
+        self.scrollbar_drag_job = None
+        if self.large_view is not None:
+            self.large_view.moveto(self.scrollbar_drag_ratio)
+        else:
+            self.text.yview_moveto(self.scrollbar_drag_ratio)
 
     def scrollbar_wheel(self, event):
         """Handle mouse wheel scrolling"""
@@ -489,13 +624,29 @@ class DesktopWidget:
             self.text.yview_scroll(int(delta), "units")
 
     def update_scrollbar(self, first=None, last=None):
-        """Update scrollbar position and size"""
+        """yscrollcommand: schedule one scrollbar redraw per idle cycle (per scrollbar_throttle_ms in the fast profile)"""
+        if first is not None:
+            self.scrollbar_view = (float(first), float(last))
+        if self.large_view is not None:
+            self.large_view.on_view_changed()
+        if self.scrollbar_job is None:
+            if self.scrollbar_throttle_ms:
+                self.scrollbar_job = self.root.after(self.scrollbar_throttle_ms, self.render_scrollbar)
+            else:
+                self.scrollbar_job = self.root.after_idle(self.render_scrollbar)
+    
+    def render_scrollbar(self):
+        """Redraw the scrollbar thumb for the current view"""
+        self.scrollbar_job = None
         try:
-            # Get text widget scroll info
-            first, last = self.text.yview()
+            # Get text widget scroll info (relative to the whole note in windowed mode)
+            if self.large_view is not None:
+                first, last = self.large_view.yview()
+            else:
+                first, last = self.scrollbar_view
             
             # Calculate scrollbar dimensions
-            scrollbar_height = self.scrollbar_canvas.winfo_height()
+            scrollbar_height = self.scrollbar_height
             if scrollbar_height <= 0:
                 return
             
@@ -504,16 +655,21 @@ class DesktopWidget:
             thumb_height = max(20, int(scrollbar_height * content_ratio))
             thumb_y = int(scrollbar_height * first)
             
-            # Update thumb position and size
-            self.scrollbar_canvas.coords(self.scrollbar_thumb, 
-                                       2, thumb_y, 
-                                       10, thumb_y + thumb_height)
+            # Update thumb position and size (only when it moved)
+            coords = (2, thumb_y, 10, thumb_y + thumb_height)
+            if coords != self.scrollbar_thumb_coords:
+                self.scrollbar_canvas.coords(self.scrollbar_thumb, *coords)
+                self.scrollbar_thumb_coords = coords
             
-            # Show/hide scrollbar based on content
-            if content_ratio < 1.0:
-                self.scrollbar_frame.pack(side='right', fill='y', padx=(0, 5))
-            else:
-                self.scrollbar_frame.pack_forget()
+            # Show/hide scrollbar based on content; repacking forces a relayout,
+            # so only do it when visibility actually flips
+            visible = content_ratio < 1.0
+            if visible != self.scrollbar_visible:
+                if visible:
+                    self.scrollbar_frame.pack(side='right', fill='y', padx=(0, 5))
+                else:
+                    self.scrollbar_frame.pack_forget()
+                self.scrollbar_visible = visible
                 
         except Exception as e:
             # Fallback to default scrollbar if custom one fails
@@ -526,79 +682,49 @@ class DesktopWidget:
             self.resize_canvas.bind("<B1-Motion>", self.on_resize)
             self.resize_canvas.bind("<ButtonRelease-1>", self.stop_resize)
 
-    def start_resize(self, event):
-        """Start resize operation"""
-        if not self.is_locked:
-            self.resize_x = event.x_root
-            self.resize_y = event.y_root
-            self.resize_w = self.root.winfo_width()
-            self.resize_h = self.root.winfo_height()
-            # Bind to root window for global mouse tracking
-            self.root.bind("<B1-Motion>", self.on_resize)
-            self.root.bind("<ButtonRelease-1>", self.stop_resize)
-
-    def on_resize(self, event):
-        """Handle resize operation"""
-        if not self.is_locked:
-            dx = event.x_root - self.resize_x
-            dy = event.y_root - self.resize_y
-            new_width = max(200, self.resize_w + dx)
-            new_height = max(300, self.resize_h + dy)
-            
-            # Smooth resize with immediate visual feedback
-            self.root.geometry(f"{new_width}x{new_height}")
-            
-            # Update resize handle position
-            if hasattr(self, 'resize_handle'):
-                self.resize_handle.pack_forget()
-                self.resize_handle.pack(side='bottom', anchor='se', padx=0, pady=0)
-            
-            # Force update for smooth visual feedback
-            self.root.update_idletasks()
-
     def stop_resize(self, event):
         """Stop resize operation"""
+        self.apply_geometry()
         self.root.unbind("<B1-Motion>")
         self.root.unbind("<ButtonRelease-1>")
-        self.save_size()
+        # Restore the window drag bindings replaced during the resize
+        self.make_draggable()
+        self.flush_persist()
         
         # Final update to ensure smooth completion
         self.root.update_idletasks()
 
     def save_size(self):
         """Save current window size"""
-        with open(self.position_file, 'r+') as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                data = {}
-            data['width'] = self.root.winfo_width()
-            data['height'] = self.root.winfo_height()
-            f.seek(0)
-            json.dump(data, f)
-            f.truncate()
+        self.persistence.submit('size', self.store.update_document, self.instance_id, 'position', {
+            'width': self.root.winfo_width(),
+            'height': self.root.winfo_height()
+        })
     
     def save_mini_position(self):
         """Save minimize widget position"""
         if hasattr(self, 'mini_window') and self.mini_window.winfo_exists():
             try:
-                with open(self.mini_position_file, 'w') as f:
-                    data = {
-                        'x': self.mini_window.winfo_x(),
-                        'y': self.mini_window.winfo_y()
-                    }
-                    json.dump(data, f)
+                self.persistence.submit('mini position', self.store.put_document, self.instance_id, 'mini_position', {
+                    'x': self.mini_window.winfo_x(),
+                    'y': self.mini_window.winfo_y()
+                })
             except Exception as e:
                 print(f"Could not save mini position: {e}")
     
+    def get_startup_document(self, kind):
+        """Get a per-instance document, from the startup prefetch when available"""
+        if kind in self.startup_documents:
+            return self.startup_documents.pop(kind)
+        return self.store.get_document(self.instance_id, kind)
+    
     def load_mini_position(self):
         """Load minimize widget position or use default"""
         try:
-            if os.path.exists(self.mini_position_file):
-                with open(self.mini_position_file, 'r') as f:
-                    data = json.load(f)
-                    self.mini_x = data.get('x', 100)
-                    self.mini_y = data.get('y', 100)
+            data = self.get_startup_document('mini_position')
+            if data is not None:
+                self.mini_x = data.get('x', 100)
+                self.mini_y = data.get('y', 100)
             else:
                 # Default position (bottom right corner)
                 screen_width = self.root.winfo_screenwidth()
@@ -617,11 +743,18 @@ class DesktopWidget:
         """Minimize the widget"""
         self.root.withdraw()
         self.is_minimized = True
+        self.show_minimized_button()
+    
+    def show_minimized_button(self):
+        """Show the minimized button, creating it the first time"""
+        if hasattr(self, 'mini_window') and self.mini_window.winfo_exists():
+            self.mini_window.deiconify()
+            return
         self.create_minimized_button()
     
     def create_minimized_button(self):
         """Create a modern floating circular button when minimized"""
-        self.mini_window = tk.Toplevel()
+        self.mini_window = tk.Toplevel(self.root)
         self.mini_window.overrideredirect(True)
         self.mini_window.attributes('-topmost', True)
         self.mini_window.attributes('-alpha', 0.9)
@@ -633,6 +766,7 @@ class DesktopWidget:
                                   height=size, 
                                   bg=self.colors['bg_medium'])
         self.mini_frame.pack()
+        self.styles.register(self.mini_frame, bg='bg_medium')
 
         # Create canvas for the main icon area
         icon_size = 40
@@ -642,45 +776,28 @@ class DesktopWidget:
                                     bg=self.colors['bg_medium'],
                                     highlightthickness=0)
         self.icon_canvas.place(x=5, y=5)  # Center the icon
+        self.styles.register(self.icon_canvas, bg='bg_medium')
 
         # Draw circular background
-        self.icon_canvas.create_oval(2, 2, icon_size-2, icon_size-2, 
+        icon_circle = self.icon_canvas.create_oval(2, 2, icon_size-2, icon_size-2, 
                                    fill=self.colors['bg_medium'],
                                    outline=self.colors['accent'],
                                    width=2)
+        self.styles.register_item(self.icon_canvas, icon_circle, fill='bg_medium', outline='accent')
 
-        # Load and display the icon.png
-        try:
-            from PIL import Image, ImageTk
-            # Look for icon in assets folder
-            icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'icon.png')
-            if os.path.exists(icon_path):
-                # Load and resize icon
-                icon_img = Image.open(icon_path)
-                icon_img = icon_img.resize((24, 24), Image.Resampling.LANCZOS)
-                self.icon_photo = ImageTk.PhotoImage(icon_img)
-                # Place icon in center
-                self.icon_canvas.create_image(icon_size//2, icon_size//2, 
-                                            image=self.icon_photo)
-            else:
-                # Fallback to text icon
-                self.icon_canvas.create_text(icon_size//2, icon_size//2,
-                                           text="📝",
-                                           font=("Segoe UI", 14),
-                                           fill=self.colors['text_primary'])
-        except ImportError:
-            # PIL not available, use text icon
-            self.icon_canvas.create_text(icon_size//2, icon_size//2,
-                                       text="📝",
-                                       font=("Segoe UI", 14),
-                                       fill=self.colors['text_primary'])
-        except Exception as e:
-            print(f"Could not load icon: {e}")
+        # Display icon.png, pre-scaled once and shared by every note in the process
+        from asset_cache import get_icon
+        self.icon_photo = get_icon('icon.png', 24, master=self.root)
+        if self.icon_photo is not None:
+            self.icon_canvas.create_image(icon_size//2, icon_size//2, 
+                                        image=self.icon_photo)
+        else:
             # Fallback to text icon
-            self.icon_canvas.create_text(icon_size//2, icon_size//2,
+            icon_text = self.icon_canvas.create_text(icon_size//2, icon_size//2,
                                        text="📝",
-                                       font=("Segoe UI", 14),
+                                       font=get_font('icon', self.root),
                                        fill=self.colors['text_primary'])
+            self.styles.register_item(self.icon_canvas, icon_text, fill='text_primary')
 
         # Create drag handle in lower left corner (small triangle)
         self.drag_handle = tk.Canvas(self.mini_frame, 
@@ -689,12 +806,14 @@ class DesktopWidget:
                                     bg=self.colors['bg_medium'],
                                     highlightthickness=0)
         self.drag_handle.place(x=0, y=size-15)  # Position in lower left
+        self.styles.register(self.drag_handle, bg='bg_medium')
 
         # Draw drag handle (small triangle)
-        self.drag_handle.create_polygon(0, 15, 15, 15, 0, 0, 
+        drag_triangle = self.drag_handle.create_polygon(0, 15, 15, 15, 0, 0, 
                                       fill=self.colors['accent'],
                                       outline=self.colors['text_primary'],
                                       width=1)
+        self.styles.register_item(self.drag_handle, drag_triangle, fill='accent', outline='text_primary')
 
         # Bind click to restore (only on the main icon area)
         self.icon_canvas.bind("<Button-1>", lambda e: self.restore_widget())
@@ -711,29 +830,28 @@ class DesktopWidget:
 
     def start_mini_move(self, event):
         """Start moving minimized button"""
-        self.mini_x = event.x
-        self.mini_y = event.y
-        self.move_time = event.time
+        self.mini_drag_start = (event.x_root, event.y_root)
+        # The origin is read once; motion is applied relative to it
+        self.mini_drag_origin = (self.mini_window.winfo_x(), self.mini_window.winfo_y())
 
     def on_mini_move(self, event):
         """Handle minimized button movement"""
         if not self.is_locked:
-            dx = event.x - self.mini_x
-            dy = event.y - self.mini_y
-            x = self.mini_window.winfo_x() + dx
-            y = self.mini_window.winfo_y() + dy
-            self.mini_window.geometry(f"+{x}+{y}")
-            self.save_mini_position()
+            x = self.mini_drag_origin[0] + event.x_root - self.mini_drag_start[0]
+            y = self.mini_drag_origin[1] + event.y_root - self.mini_drag_start[1]
+            self.queue_geometry(self.mini_window, position=f"+{x}+{y}")
+            self.schedule_persist('mini_position')
 
     def stop_mini_move(self, event):
         """Stop moving minimized button"""
-        self.save_mini_position()
+        self.apply_geometry()
+        self.flush_persist()
     
     def restore_widget(self):
         """Restore the widget from minimized state"""
-        if hasattr(self, 'mini_window'):
-            self.save_mini_position()  # Save position before destroying
-            self.mini_window.destroy()
+        if hasattr(self, 'mini_window') and self.mini_window.winfo_exists():
+            self.save_mini_position()  # Save position before hiding
+            self.mini_window.withdraw()
         self.root.deiconify()
         self.is_minimized = False
     
@@ -742,6 +860,7 @@ class DesktopWidget:
         if not self.is_locked:
             self.root.bind("<Button-1>", self.start_move)
             self.root.bind("<B1-Motion>", self.on_move)
+            self.root.bind("<ButtonRelease-1>", self.stop_move)
             # Bind resize events
             self.root.bind("<Control-Button-1>", self.start_resize)
             self.root.bind("<Control-B1-Motion>", self.on_resize)
@@ -749,20 +868,24 @@ class DesktopWidget:
     def start_resize(self, event):
         """Start widget resizing"""
         if not self.is_locked:
-            self.x = event.x
-            self.y = event.y
+            self.x = event.x_root
+            self.y = event.y_root
             self.width = self.root.winfo_width()
             self.height = self.root.winfo_height()
+            # Don't also start a window move from the root's <Button-1>
+            return 'break'
     
     def on_resize(self, event):
         """Handle widget resizing"""
         if not self.is_locked:
-            dx = event.x - self.x
-            dy = event.y - self.y
+            dx = event.x_root - self.x
+            dy = event.y_root - self.y
             new_width = max(200, self.width + dx)
             new_height = max(300, self.height + dy)
-            self.root.geometry(f"{new_width}x{new_height}")
-            self.save_size()
+            self.queue_geometry(self.root, size=f"{new_width}x{new_height}")
+            self.schedule_persist('size')
+            # The root's <B1-Motion> would otherwise move the window as well
+            return 'break'
     
     def save_size(self):
         """Save widget size"""
@@ -771,40 +894,111 @@ class DesktopWidget:
                 'width': self.root.winfo_width(),
                 'height': self.root.winfo_height()
             }
-            with open(self.position_file, 'r+') as f:
-                data = json.load(f)
-                data.update(size_data)
-                f.seek(0)
-                json.dump(data, f)
-                f.truncate()
+            self.persistence.submit('size', self.store.update_document, self.instance_id, 'position', size_data)
         except Exception as e:
             print(f"Could not save size: {e}")
     
     def close_widget(self):
         """Close the widget"""
-        if messagebox.askyesno("Confirm Exit", "Are you sure you want to close Smart Notes?"):
-            self.save_notes()
+        from tkinter import messagebox
+        if messagebox.askyesno("Confirm Exit", "Are you sure you want to close Smart Notes?", parent=self.root):
+            self.flush_persist()
+            self.autosave()
             self.save_position()
             self.save_settings()
             # Unregister the instance from the global registry
             self.unregister_instance(self.instance_id)
-            self.root.quit()
+            # Wait for the writer thread before the window (or process) goes away
+            self.persistence.flush()
+            if self.control is not None:
+                self.control.close()
+            self.instance_lock.release()
+            notice = self.notify_manager(False)
+            if self.host is not None:
+                # Other notes in this process keep running
+                self.root.destroy()
+                self.host.on_note_closed(self.instance_id)
+            else:
+                # The process exits next; let the notice get out first
+                notice.join(1.0)
+                self.root.quit()
+    
+    def notify_manager(self, running):
+        """Tell a running manager that this note started or stopped (it doesn't poll)"""
+        from single_instance import notify_manager
+        message = {'command': 'note-status', 'instance_id': self.instance_id, 'running': running}
+        thread = threading.Thread(target=notify_manager, args=(message,), name='ManagerNotice', daemon=True)
+        thread.start()
+        return thread
     
     def start_move(self, event):
         """Start widget movement"""
         if not self.is_locked:
-            self.x = event.x
-            self.y = event.y
+            self.x = event.x_root
+            self.y = event.y_root
+            # The origin is read once; motion is applied relative to it
+            self.move_origin = (self.root.winfo_x(), self.root.winfo_y())
     
     def on_move(self, event):
         """Handle widget movement"""
         if not self.is_locked:
-            deltax = event.x - self.x
-            deltay = event.y - self.y
-            x = self.root.winfo_x() + deltax
-            y = self.root.winfo_y() + deltay
-            self.root.geometry(f"+{x}+{y}")
-            self.save_position()
+            x = self.move_origin[0] + event.x_root - self.x
+            y = self.move_origin[1] + event.y_root - self.y
+            self.queue_geometry(self.root, position=f"+{x}+{y}")
+            self.schedule_persist('position')
+    
+    def stop_move(self, event):
+        """Stop widget movement or resizing"""
+        self.apply_geometry()
+        self.flush_persist()
+    
+    def queue_geometry(self, window, size=None, position=None):
+        """Keep only the latest size and position for a window; they are applied at most once per frame"""
+        pending = self.pending_geometry.setdefault(window, {})
+        if size is not None:
+            pending['size'] = size
+        if position is not None:
+            pending['position'] = position
+        if self.geometry_job is None:
+            self.geometry_job = self.root.after(self.geometry_frame_ms, self.apply_geometry)
+    
+    def apply_geometry(self):
+        """Apply the queued window geometries"""
+        if self.geometry_job is not None:
+            self.root.after_cancel(self.geometry_job)
+            self.geometry_job = None
+        pending, self.pending_geometry = self.pending_geometry, {}
+        for window, geometry in pending.items():
+            try:
+                window.geometry(geometry.get('size', '') + geometry.get('position', ''))
+            except tk.TclError as e:
+                print(f"Could not move window: {e}")
+    
+    def schedule_persist(self, kind):
+        """Queue a geometry/settings save; writes are coalesced to one per interval"""
+        self.persist_pending.add(kind)
+        if self.persist_job is None:
+            self.persist_job = self.root.after(self.persist_quiet_ms, self.flush_persist)
+    
+    def flush_persist(self):
+        """Write all queued geometry/settings state now"""
+        if self.persist_job is not None:
+            self.root.after_cancel(self.persist_job)
+            self.persist_job = None
+        pending = self.persist_pending
+        self.persist_pending = set()
+        
+        # A position save also records the size
+        if 'position' in pending:
+            pending.discard('size')
+        savers = {
+            'position': self.save_position,
+            'size': self.save_size,
+            'mini_position': self.save_mini_position,
+            'settings': self.save_settings
+        }
+        for kind in pending:
+            savers[kind]()
     
     def save_position(self):
         """Save widget position and size"""
@@ -817,18 +1011,15 @@ class DesktopWidget:
                 'is_locked': self.is_locked,
                 'is_minimized': self.is_minimized
             }
-            with open(self.position_file, 'w') as f:
-                json.dump(position_data, f)
+            self.persistence.submit('position', self.store.put_document, self.instance_id, 'position', position_data)
         except Exception as e:
             print(f"Could not save position: {e}")
     
     def load_position(self):
         """Load saved widget position and size"""
         try:
-            if os.path.exists(self.position_file):
-                with open(self.position_file, 'r') as f:
-                    position_data = json.load(f)
-                
+            position_data = self.get_startup_document('position')
+            if position_data is not None:
                 # Load position
                 x = position_data.get('x', 100)
                 y = position_data.get('y', 100)
@@ -857,25 +1048,24 @@ class DesktopWidget:
                 'theme': self.current_theme,
                 'transparency': self.root.attributes('-alpha'),
                 'width': self.root.winfo_width(),
-                'height': self.root.winfo_height()
+                'height': self.root.winfo_height(),
+                'autosave_idle_ms': self.autosave_idle_ms,
+                'autosave_max_interval_ms': self.autosave_max_interval_ms,
+                'performance': self.performance_thresholds
             }
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f)
+            self.persistence.submit('settings', self.store.put_document, self.instance_id, 'settings', settings)
         except Exception as e:
             print(f"Could not save settings: {e}")
     
     def load_settings(self):
         """Load widget settings"""
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                
+            settings = self.get_startup_document('settings')
+            if settings is not None:
                 # Load theme
                 theme = settings.get('theme', 'dark')
                 if theme in self.themes:
                     self.current_theme = theme
-                    self.colors = self.themes[theme]
                 
                 # Load window attributes
                 self.root.attributes('-alpha', settings.get('transparency', 0.85))
@@ -886,18 +1076,38 @@ class DesktopWidget:
                 # Load state
                 self.is_locked = settings.get('is_locked', False)
                 
+                # Load autosave timing
+                self.autosave_idle_ms = int(settings.get('autosave_idle_ms', self.autosave_idle_ms))
+                self.autosave_max_interval_ms = int(settings.get('autosave_max_interval_ms', self.autosave_max_interval_ms))
+                
+                # Load performance mode thresholds
+                for key, value in settings.get('performance', {}).items():
+                    if key in self.performance_thresholds:
+                        self.performance_thresholds[key] = int(value)
+                
                 # Apply theme
                 self.apply_theme()
         except Exception as e:
             print(f"Could not load settings: {e}")
     
     def show_settings(self):
-        """Show settings window"""
+        """Show settings window, built once and refreshed on later opens"""
+        settings_window = getattr(self, 'settings_window', None)
+        if settings_window is not None and settings_window.winfo_exists():
+            self.refresh_settings()
+            settings_window.deiconify()
+            settings_window.lift()
+            settings_window.grab_set()
+            return
+        
         settings_window = tk.Toplevel(self.root)
+        self.settings_window = settings_window
         settings_window.title("Settings")
         settings_window.geometry("400x600")
         settings_window.configure(bg=self.colors['bg_dark'])
+        self.styles.register(settings_window, bg='bg_dark')
         settings_window.attributes('-topmost', True)
+        settings_window.protocol("WM_DELETE_WINDOW", self.hide_settings)
         
         # Center the settings window
         settings_window.transient(self.root)
@@ -909,38 +1119,44 @@ class DesktopWidget:
                                      bg=self.colors['bg_dark'],
                                      fg=self.colors['text_primary'])
         instance_frame.pack(fill='x', padx=10, pady=10)
+        self.styles.register(instance_frame, bg='bg_dark', fg='text_primary')
         
         # Instance name entry
         name_frame = tk.Frame(instance_frame, bg=self.colors['bg_dark'])
         name_frame.pack(fill='x', padx=10, pady=5)
+        self.styles.register(name_frame, bg='bg_dark')
         
-        tk.Label(name_frame, 
+        self.styles.register(tk.Label(name_frame, 
                 text="Instance Name:",
                 bg=self.colors['bg_dark'],
-                fg=self.colors['text_primary']).pack(side='left')
+                fg=self.colors['text_primary']), bg='bg_dark', fg='text_primary').pack(side='left')
         
         name_entry = tk.Entry(name_frame, 
                              bg=self.colors['bg_light'],
                              fg=self.colors['text_primary'],
                              insertbackground=self.colors['accent'])
         name_entry.insert(0, self.instance_name)
+        self.settings_name_entry = name_entry
+        self.styles.register(name_entry, bg='bg_light', fg='text_primary', insertbackground='accent')
         name_entry.pack(side='right', fill='x', expand=True, padx=(10, 0))
         
         # Rename button
         def rename_instance():
+            from tkinter import messagebox
             if self.rename_instance(name_entry.get()):
                 messagebox.showinfo("Success", "Instance renamed successfully!")
             else:
                 messagebox.showerror("Error", "Please enter a valid name!")
         
-        tk.Button(instance_frame,
+        self.styles.register(tk.Button(instance_frame,
                   text="Rename Instance",
                   command=rename_instance,
                   bg=self.colors['bg_medium'],
-                  fg=self.colors['text_primary']).pack(pady=5)
+                  fg=self.colors['text_primary']), bg='bg_medium', fg='text_primary').pack(pady=5)
         
         # Auto-start checkbox for this instance
         auto_start_var = tk.BooleanVar(value=self.check_auto_start_status())
+        self.settings_auto_start_var = auto_start_var
         
         def toggle_instance_auto_start():
             self.toggle_instance_auto_start()
@@ -956,28 +1172,33 @@ class DesktopWidget:
                                             activebackground=self.colors['bg_dark'],
                                             activeforeground=self.colors['text_primary'])
         auto_start_checkbox.pack(pady=5)
+        self.styles.register(auto_start_checkbox, bg='bg_dark', fg='text_primary', selectcolor='bg_light',
+                             activebackground='bg_dark', activeforeground='text_primary')
         
         # Instance info
         info_frame = tk.Frame(instance_frame, bg=self.colors['bg_dark'])
         info_frame.pack(fill='x', padx=10, pady=5)
+        self.styles.register(info_frame, bg='bg_dark')
         
-        tk.Label(info_frame,
+        self.styles.register(tk.Label(info_frame,
                 text=f"Instance ID: {self.instance_id[:8]}...",
                 bg=self.colors['bg_dark'],
                 fg=self.colors['text_secondary'],
-                font=('Segoe UI', 9)).pack(anchor='w')
+                font=get_font('small', self.root)), bg='bg_dark', fg='text_secondary').pack(anchor='w')
         
-        tk.Label(info_frame,
+        self.styles.register(tk.Label(info_frame,
                 text=f"Created: {self.instance_created[:10]}",
                 bg=self.colors['bg_dark'],
                 fg=self.colors['text_secondary'],
-                font=('Segoe UI', 9)).pack(anchor='w')
+                font=get_font('small', self.root)), bg='bg_dark', fg='text_secondary').pack(anchor='w')
         
-        tk.Label(info_frame,
+        self.settings_modified_label = tk.Label(info_frame,
                 text=f"Last Modified: {self.instance_last_modified[:10]}",
                 bg=self.colors['bg_dark'],
                 fg=self.colors['text_secondary'],
-                font=('Segoe UI', 9)).pack(anchor='w')
+                font=get_font('small', self.root))
+        self.settings_modified_label.pack(anchor='w')
+        self.styles.register(self.settings_modified_label, bg='bg_dark', fg='text_secondary')
         
         # Theme section
         theme_frame = tk.LabelFrame(settings_window,
@@ -985,17 +1206,20 @@ class DesktopWidget:
                                   bg=self.colors['bg_dark'],
                                   fg=self.colors['text_primary'])
         theme_frame.pack(fill='x', padx=10, pady=10)
+        self.styles.register(theme_frame, bg='bg_dark', fg='text_primary')
         
+        self.settings_theme_var = tk.StringVar(value=self.current_theme)
         for theme in self.themes:
             btn = tk.Radiobutton(theme_frame,
                                 text=theme.capitalize(),
                                 value=theme,
-                                variable=tk.StringVar(value=self.current_theme),
+                                variable=self.settings_theme_var,
                                 command=lambda t=theme: self.change_theme(t),
                                 bg=self.colors['bg_dark'],
                                 fg=self.colors['text_primary'],
                                 selectcolor=self.colors['bg_medium'])
             btn.pack(pady=5)
+            self.styles.register(btn, bg='bg_dark', fg='text_primary', selectcolor='bg_medium')
         
         # Transparency section
         transparency_frame = tk.LabelFrame(settings_window,
@@ -1003,6 +1227,7 @@ class DesktopWidget:
                                          bg=self.colors['bg_dark'],
                                          fg=self.colors['text_primary'])
         transparency_frame.pack(fill='x', padx=10, pady=10)
+        self.styles.register(transparency_frame, bg='bg_dark', fg='text_primary')
         
         transparency_scale = tk.Scale(transparency_frame,
                                      from_=0.3,
@@ -1013,7 +1238,10 @@ class DesktopWidget:
                                      bg=self.colors['bg_dark'],
                                      fg=self.colors['text_primary'])
         transparency_scale.set(self.root.attributes('-alpha'))
+        self.settings_transparency_scale = transparency_scale
+        self.styles.register(transparency_scale, bg='bg_dark', fg='text_primary')
         transparency_scale.pack(fill='x', padx=10, pady=5)
+        transparency_scale.bind('<ButtonRelease-1>', lambda e: self.flush_persist())
         
         # Auto-start section
         auto_start_frame = tk.LabelFrame(settings_window,
@@ -1021,48 +1249,61 @@ class DesktopWidget:
                                        bg=self.colors['bg_dark'],
                                        fg=self.colors['text_primary'])
         auto_start_frame.pack(fill='x', padx=10, pady=10)
+        self.styles.register(auto_start_frame, bg='bg_dark', fg='text_primary')
         
-        tk.Button(auto_start_frame,
+        self.styles.register(tk.Button(auto_start_frame,
                   text="Enable Auto-start",
                   command=self.enable_auto_start,
                   bg=self.colors['bg_medium'],
-                  fg=self.colors['text_primary']).pack(pady=5)
+                  fg=self.colors['text_primary']), bg='bg_medium', fg='text_primary').pack(pady=5)
         
-        tk.Button(auto_start_frame,
+        self.styles.register(tk.Button(auto_start_frame,
                   text="Disable Auto-start",
                   command=self.disable_auto_start,
                   bg=self.colors['bg_medium'],
-                  fg=self.colors['text_primary']).pack(pady=5)
+                  fg=self.colors['text_primary']), bg='bg_medium', fg='text_primary').pack(pady=5)
+    
+    def refresh_settings(self):
+        """Update the settings window's fields from the current state"""
+        self.settings_name_entry.delete(0, 'end')
+        self.settings_name_entry.insert(0, self.instance_name)
+        self.settings_auto_start_var.set(self.check_auto_start_status())
+        self.settings_modified_label.configure(text=f"Last Modified: {self.instance_last_modified[:10]}")
+        self.settings_theme_var.set(self.current_theme)
+        self.settings_transparency_scale.set(self.root.attributes('-alpha'))
+    
+    def hide_settings(self):
+        """Hide the settings window so the next open can reuse it"""
+        self.settings_window.grab_release()
+        self.settings_window.withdraw()
+    
+    def show_find_bar(self):
+        """Show the find/replace bar"""
+        if self.find_bar is None:
+            from find_bar import FindBar
+            self.find_bar = FindBar(self.text, self.styles, get_view=lambda: self.large_view)
+        self.find_bar.show()
     
     def change_theme(self, theme_name):
         """Change the widget theme"""
         self.current_theme = theme_name
-        self.colors = self.themes[theme_name]
         self.apply_theme()
         self.save_settings()
     
     def apply_theme(self):
-        """Apply the current theme to all widgets"""
-        self.root.configure(bg=self.colors['bg_dark'])
-        for widget in self.root.winfo_children():
-            if isinstance(widget, (tk.Frame, tk.Label, tk.Button)):
-                widget.configure(bg=self.colors['bg_medium'])
-                if isinstance(widget, (tk.Label, tk.Button)):
-                    widget.configure(fg=self.colors['text_primary'])
-        if hasattr(self, 'text'):
-            self.text.configure(
-                bg=self.colors['bg_light'],
-                fg=self.colors['text_primary'],
-                insertbackground=self.colors['accent'])
+        """Apply the current theme to the registered widgets whose colours change"""
+        self.styles.set_theme(self.current_theme)
+        self.colors = self.styles.colors
     
     def change_transparency(self, value):
         """Change widget transparency"""
         self.root.attributes('-alpha', float(value))
-        self.save_settings()
+        self.schedule_persist('settings')
     
     def check_auto_start(self):
         """Check if auto-start is enabled"""
         try:
+            import winreg
             key = winreg.OpenKey(winreg.HKEY_CURRENT_USER,
                                 r"Software\Microsoft\Windows\CurrentVersion\Run",
                                 0, winreg.KEY_READ)
@@ -1078,6 +1319,7 @@ class DesktopWidget:
     
     def enable_auto_start(self):
         """Enable auto-start"""
+        from tkinter import messagebox
         try:
             # Import instance controller to use the global auto-start method
             from instance_controller import InstanceController
@@ -1091,6 +1333,7 @@ class DesktopWidget:
     
     def disable_auto_start(self):
         """Disable auto-start"""
+        from tkinter import messagebox
         try:
             # Import instance controller to use the global auto-start method
             from instance_controller import InstanceController
@@ -1111,63 +1354,285 @@ class DesktopWidget:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f"{width}x{height}+{x}+{y}")
     
+    def on_text_modified(self, event=None):
+        """Mark notes dirty and (re)schedule the idle autosave"""
+        if not self.text.edit_modified():
+            return
+        # Reset the flag so the next edit fires <<Modified>> again
+        self.text.edit_modified(False)
+        
+        if self.find_bar is not None:
+            self.find_bar.on_text_changed()
+        
+        if not self.is_dirty:
+            self.is_dirty = True
+            # Hard upper bound so continuous typing still gets saved
+            self.autosave_max_job = self.root.after(self.autosave_max_interval_ms, self.autosave)
+        
+        # Debounce: restart the idle timer on every edit
+        if self.autosave_idle_job is not None:
+            self.root.after_cancel(self.autosave_idle_job)
+        self.autosave_idle_job = self.root.after(self.autosave_idle_ms, self.autosave)
+    
+    def cancel_autosave(self):
+        """Cancel pending autosave timers"""
+        for job in (self.autosave_idle_job, self.autosave_max_job):
+            if job is not None:
+                self.root.after_cancel(job)
+        self.autosave_idle_job = None
+        self.autosave_max_job = None
+    
+    def autosave(self):
+        """Save notes only if they changed since the last save"""
+        self.cancel_autosave()
+        if not self.is_dirty:
+            self.autosave_stats['saves_skipped'] += 1
+            return False
+        return self.save_notes()
+    
+    def get_autosave_stats(self):
+        """Get autosave counters"""
+        return dict(self.autosave_stats)
+    
     def save_notes(self):
-        """Save notes content"""
+        """Save notes content (journal deltas when possible, otherwise a full snapshot)"""
         try:
-            with open(self.notes_file, 'w', encoding='utf-8') as f:
-                f.write(self.text.get('1.0', 'end-1c'))
+            # Clear the dirty flag first; edits made after this point mark it again
+            self.is_dirty = False
             # Update last modified timestamp
             self.instance_last_modified = datetime.now().isoformat()
-            self.save_instance_metadata()
+            # Notes and metadata are committed together by the writer thread
+            # so they never drift apart
+            if self.large_view is not None:
+                ops = self.large_view.take_ops()
+            else:
+                ops = self.edit_recorder.take()
+            if ops is None and self.large_view is not None:
+                # Joining a huge note is left to the writer thread
+                from large_note_view import save_lines
+                self.persistence.submit('notes', save_lines,
+                                        self.store,
+                                        self.instance_id,
+                                        self.large_view.snapshot_lines(),
+                                        self.build_instance_metadata(),
+                                        callback=self.on_notes_saved)
+            elif ops is None:
+                # A snapshot needs the whole note in the Text
+                self.complete_chunked_insert()
+                self.persistence.submit('notes', self.store.save_notes,
+                                        self.instance_id,
+                                        self.text.get('1.0', 'end-1c'),
+                                        self.build_instance_metadata(),
+                                        callback=self.on_notes_saved)
+            else:
+                self.persistence.submit('notes journal', self.store.append_journal,
+                                        self.instance_id,
+                                        ops,
+                                        self.build_instance_metadata(),
+                                        callback=self.on_notes_saved)
+            self.autosave_stats['saves_performed'] += 1
+            return True
         except Exception as e:
+            self.is_dirty = True
+            self.edit_recorder.needs_snapshot = True
             print(f"Could not save notes: {e}")
+            return False
+    
+    def on_notes_saved(self, ok, result):
+        """Handle the writer thread's result for a notes save"""
+        if not ok:
+            print(f"Could not save notes: {result}")
+            # The lost deltas can't be replayed; retry with a full snapshot
+            self.edit_recorder.needs_snapshot = True
+            # Raise the modified flag again so autosave retries
+            self.text.edit_modified(True)
+        elif result is not None and (result[0] > self.journal_compact_ops or result[1] > self.journal_compact_bytes):
+            # append_journal returns the journal (ops, bytes); compact in the background
+            self.persistence.submit('journal compaction', self.store.compact_journal, self.instance_id)
     
     def load_notes(self):
         """Load saved notes"""
         try:
-            if os.path.exists(self.notes_file):
-                with open(self.notes_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+            content = self.store.get_notes(self.instance_id)
+            if content is not None:
                 if hasattr(self, 'text'):
-                    self.text.delete('1.0', 'end')
-                    self.text.insert('1.0', content)
+                    self.large_view = None
+                    if self.chunked_insert is not None:
+                        self.chunked_insert.cancel()
+                        self.chunked_insert = None
+                    lines = content.split('\n')
+                    mode = self.choose_performance_mode(self.measure_note(content, lines))
+                    self.apply_performance_mode(mode)
+                    if mode == 'windowed':
+                        # Only a window of lines around the viewport goes into the Text
+                        from large_note_view import LargeNoteView
+                        self.large_view = LargeNoteView(self.text, self.edit_recorder, content, lines=lines,
+                                                        on_page=self.on_large_view_paged)
+                        self.large_view.show(0)
+                    elif len(content) >= self.performance_thresholds['chunked_insert_chars']:
+                        # First screen now, the rest in slices between events
+                        self.edit_recorder.enabled = False
+                        self.text.delete('1.0', 'end')
+                        self.edit_recorder.enabled = True
+                        self.start_chunked_insert(content, '1.0', recorder=self.edit_recorder)
+                        self.text.mark_set('insert', '1.0')
+                        self.text.yview_moveto(0)
+                    else:
+                        self.edit_recorder.enabled = False
+                        self.text.delete('1.0', 'end')
+                        self.text.insert('1.0', content)
+                        self.edit_recorder.enabled = True
+                    # Loaded content is already saved
+                    self.text.edit_modified(False)
+                    self.edit_recorder.clear()
+                    self.is_dirty = False
         except Exception as e:
             print(f"Could not load notes: {e}")
     
+    def measure_note(self, content=None, lines=None):
+        """Measure note size and line lengths (from content, or a list of lines)"""
+        started = time.perf_counter()
+        if lines is None:
+            lines = content.split('\n')
+        chars = len(content) if content is not None else sum(map(len, lines)) + len(lines) - 1
+        self.performance_stats.update({
+            'chars': chars,
+            'lines': len(lines),
+            'longest_line': max(map(len, lines)) if lines else 0,
+            'measure_ms': round((time.perf_counter() - started) * 1000, 1)
+        })
+        return self.performance_stats
+    
+    def choose_performance_mode(self, stats):
+        """Pick the performance mode for measured note statistics"""
+        thresholds = self.performance_thresholds
+        if stats['chars'] >= thresholds['windowed_chars']:
+            return 'windowed'
+        if stats['chars'] >= thresholds['fast_mode_chars'] or stats['longest_line'] >= thresholds['long_line_chars']:
+            return 'fast'
+        return 'normal'
+    
+    def apply_performance_mode(self, mode):
+        """Switch the fast profile on or off and show the mode in the header"""
+        fast = mode != 'normal'
+        self.text.configure(wrap='none' if fast else 'word')
+        self.scrollbar_throttle_ms = self.performance_thresholds['scrollbar_throttle_ms'] if fast else 0
+        # Replaying the journal is slowest on large notes, so they are compacted sooner
+        self.journal_compact_ops = (self.performance_thresholds['large_journal_compact_ops'] if fast
+                                    else self.normal_journal_compact_ops)
+        self.title_label.configure(text="📝 Smart Notes" if not fast else f"📝 Smart Notes · {mode}")
+        if mode != self.performance_mode:
+            self.performance_stats['mode_switches'] += 1
+            stats = self.performance_stats
+            print(f"Performance mode {self.performance_mode} -> {mode} for instance {self.instance_id} "
+                  f"({stats['chars']} chars, {stats['lines']} lines, longest line {stats['longest_line']}, "
+                  f"measured in {stats['measure_ms']} ms)")
+        self.performance_mode = mode
+        self.performance_stats['mode'] = mode
+    
+    def start_chunked_insert(self, content, index, recorder=None, on_done=None):
+        """Insert content at index in chunks, first chunk now and the rest via after"""
+        from chunked_insert import ChunkedInsert
+        self.complete_chunked_insert()
+        self.chunked_insert = ChunkedInsert(self.text, content, index, recorder=recorder, on_done=on_done)
+        self.chunked_insert.start()
+        print(f"Chunked insert of {len(content)} chars, first chunk in "
+              f"{self.chunked_insert.stats['first_chunk_ms']} ms")
+    
+    def complete_chunked_insert(self):
+        """Finish a chunked insert that is still running"""
+        if self.chunked_insert is not None and self.chunked_insert.is_running():
+            self.chunked_insert.complete()
+    
+    def on_paste(self, event=None):
+        """Insert large pastes in chunks and re-measure the note after them"""
+        try:
+            clipboard = self.text.clipboard_get()
+        except tk.TclError:
+            return
+        if len(clipboard) >= self.performance_thresholds['chunked_insert_chars']:
+            # Replace the selection like the Text class binding does
+            try:
+                self.text.delete('sel.first', 'sel.last')
+            except tk.TclError:
+                pass
+            if self.large_view is not None:
+                self.large_view.paused = True
+            self.start_chunked_insert(clipboard, 'insert', on_done=self.on_paste_inserted)
+            return 'break'
+        if len(clipboard) >= self.performance_thresholds['paste_measure_chars']:
+            # The paste itself runs in the Text class binding after this one
+            self.root.after_idle(self.measure_after_paste)
+    
+    def on_paste_inserted(self):
+        """A chunked paste is all in: resume paging and re-measure"""
+        self.text.see('insert')
+        if self.large_view is not None:
+            self.large_view.paused = False
+            self.large_view.on_view_changed()
+        self.measure_after_paste()
+    
+    def measure_after_paste(self):
+        """Move to a faster performance mode if a paste made the note too large (never back)"""
+        if self.large_view is not None:
+            self.large_view.sync()
+            self.measure_note(lines=self.large_view.lines)
+            return
+        content = self.text.get('1.0', 'end-1c')
+        mode = self.choose_performance_mode(self.measure_note(content))
+        modes = ('normal', 'fast', 'windowed')
+        if modes.index(mode) <= modes.index(self.performance_mode):
+            return
+        self.apply_performance_mode(mode)
+        if mode == 'windowed':
+            # Journal the paste first; the windowed view starts from saved content
+            if self.edit_recorder.ops or self.edit_recorder.needs_snapshot:
+                self.save_notes()
+            from large_note_view import LargeNoteView
+            top_line = int(self.text.index('@0,0').split('.')[0]) - 1
+            self.large_view = LargeNoteView(self.text, self.edit_recorder, content,
+                                            on_page=self.on_large_view_paged)
+            self.large_view.show(top_line)
+    
+    def on_large_view_paged(self):
+        """The windowed view reloaded the Text: re-apply find highlights to the new window"""
+        if self.find_bar is not None:
+            self.find_bar.on_view_paged()
+    
+    def get_line_count(self):
+        """Lines in the note (the whole note, not just the window, in windowed mode)"""
+        if self.large_view is not None:
+            return self.large_view.line_count()
+        return int(self.text.index('end-1c').split('.')[0])
+    
+    def build_instance_metadata(self):
+        """Build the metadata record for this instance"""
+        return {
+            'instance_id': self.instance_id,
+            'name': self.instance_name,
+            'created_date': self.instance_created,
+            'last_modified': datetime.now().isoformat(),
+            'theme': self.current_theme
+        }
+    
     def save_instance_metadata(self):
         """Save instance metadata"""
         try:
-            metadata_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{self.instance_id}_metadata.json')
-            metadata = {
-                'instance_id': self.instance_id,
-                'name': self.instance_name,
-                'created_date': self.instance_created,
-                'last_modified': datetime.now().isoformat(),
-                'theme': self.current_theme,
-                'files': {
-                    'settings': self.settings_file,
-                    'notes': self.notes_file,
-                    'position': self.position_file,
-                    'mini_position': self.mini_position_file
-                }
-            }
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            self.persistence.submit('metadata', self.store.put_metadata,
+                                    self.instance_id, self.build_instance_metadata())
         except Exception as e:
             print(f"Could not save instance metadata: {e}")
     
     def load_instance_metadata(self):
         """Load instance metadata"""
         try:
-            metadata_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{self.instance_id}_metadata.json')
-            if os.path.exists(metadata_file):
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                    self.instance_name = metadata.get('name', self.instance_name)
-                    self.instance_created = metadata.get('created_date', self.instance_created)
-                    self.instance_last_modified = metadata.get('last_modified', self.instance_last_modified)
-                    # Update window title
-                    self.root.title(f"Smart Notes - {self.instance_name}")
+            metadata = self.store.get_metadata(self.instance_id)
+            if metadata is not None:
+                self.instance_name = metadata.get('name', self.instance_name)
+                self.instance_created = metadata.get('created_date', self.instance_created)
+                self.instance_last_modified = metadata.get('last_modified', self.instance_last_modified)
+                # Update window title
+                self.root.title(f"Smart Notes - {self.instance_name}")
         except Exception as e:
             print(f"Could not load instance metadata: {e}")
 
@@ -1179,16 +1644,81 @@ class DesktopWidget:
         print(f"Widget geometry: {self.root.winfo_width()}x{self.root.winfo_height()}+{self.root.winfo_x()}+{self.root.winfo_y()}")
         print(f"Widget visible: {self.root.winfo_viewable()}")
         
-        # Auto-save notes periodically (every 30 seconds)
-        def auto_save():
-            self.save_notes()
-            self.root.after(30000, auto_save)
-        
-        self.root.after(30000, auto_save)
+        # Auto-save is event driven (see on_text_modified), so an idle note
+        # schedules no timers and performs no writes
         
         # Start the main event loop
         self.root.mainloop()
 
+    def handle_control_request(self, message):
+        """Answer a request on this note's own control endpoint"""
+        if message.get('command') != 'note' or message.get('instance_id') != self.instance_id:
+            return {'ok': False, 'error': 'not open'}
+        return self.handle_control(message.get('action'))
+    
+    def save_now(self):
+        """Save for the control channel; answered once the writer thread has committed it
+
+        Nothing waits on the Tk thread (other notes in the host stay live). A
+        write still going after control_flush_timeout is answered as pending.
+        """
+        from note_host import PendingReply
+        self.flush_persist()
+        saved = self.autosave()
+        failed = self.persistence.stats['jobs_failed']
+        reply = PendingReply()
+        pending_job = self.root.after(int(self.control_flush_timeout * 1000),
+                                      lambda: reply.send({'ok': True, 'saved': saved, 'pending': True}))
+        
+        def on_written(ok, result):
+            self.root.after_cancel(pending_job)
+            if self.persistence.stats['jobs_failed'] > failed:
+                reply.send({'ok': False, 'saved': saved, 'error': 'save failed'})
+            else:
+                reply.send({'ok': True, 'saved': saved})
+        
+        self.persistence.when_written(on_written)
+        return reply
+    
+    def handle_control(self, action):
+        """Run a control channel action (ping, save-now, show, hide, get-stats, reload-settings)"""
+        try:
+            if action == 'ping':
+                return {'ok': True,
+                        'instance_id': self.instance_id,
+                        'name': self.instance_name,
+                        'pid': os.getpid(),
+                        'minimized': self.is_minimized}
+            if action == 'save-now':
+                return self.save_now()
+            if action == 'show':
+                if self.is_minimized:
+                    self.restore_widget()
+                self.root.deiconify()
+                self.root.lift()
+                return {'ok': True}
+            if action == 'hide':
+                if not self.is_minimized:
+                    self.minimize_widget()
+                return {'ok': True}
+            if action == 'get-stats':
+                return {'ok': True,
+                        'autosave': self.get_autosave_stats(),
+                        'persistence': dict(self.persistence.stats),
+                        'dirty': self.is_dirty,
+                        'lines': self.get_line_count(),
+                        'performance': dict(self.performance_stats),
+                        'loading': self.chunked_insert is not None and self.chunked_insert.is_running(),
+                        'minimized': self.is_minimized}
+            if action == 'reload-settings':
+                self.load_settings()
+                self.load_instance_metadata()
+                return {'ok': True}
+            return {'ok': False, 'error': f"Unknown action: {action}"}
+        except Exception as e:
+            print(f"Error handling control action {action}: {e}")
+            return {'ok': False, 'error': str(e)}
+    
     def rename_instance(self, new_name):
         """Rename the current instance"""
         if new_name and new_name.strip():
@@ -1201,6 +1731,9 @@ class DesktopWidget:
     def check_if_restored_instance(self):
         """Check if this instance is being restored from auto-start"""
         try:
+            # Hosted notes are told explicitly by the note host
+            if self.restored is not None:
+                return self.restored
             # Check if this instance was launched with --instance-id (restored)
             if len(sys.argv) > 2 and sys.argv[1] == '--instance-id':
                 return True
@@ -1212,12 +1745,9 @@ class DesktopWidget:
         """Check if auto-start is enabled for this instance"""
         try:
             # Check the instance registry for auto-start flag
-            registry_file = os.path.join(os.path.expanduser('~'), '.smart_notes_instance_registry.json')
-            if os.path.exists(registry_file):
-                with open(registry_file, 'r') as f:
-                    registry = json.load(f)
-                    if self.instance_id in registry:
-                        return registry[self.instance_id].get('auto_start', False)
+            registry = self.store.get_registry(self._registry_name)
+            if self.instance_id in registry:
+                return registry[self.instance_id].get('auto_start', False)
         except Exception as e:
             print(f"Error checking auto-start status: {e}")
         return False
@@ -1225,22 +1755,16 @@ class DesktopWidget:
     def toggle_instance_auto_start(self):
         """Toggle auto-start for this instance"""
         try:
-            registry_file = os.path.join(os.path.expanduser('~'), '.smart_notes_instance_registry.json')
-            
-            if os.path.exists(registry_file):
-                with open(registry_file, 'r') as f:
-                    registry = json.load(f)
-            else:
-                registry = {}
+            registry = self.store.get_registry(self._registry_name)
             
             # Toggle auto-start status
             if self.instance_id in registry:
                 current_status = registry[self.instance_id].get('auto_start', False)
                 registry[self.instance_id]['auto_start'] = not current_status
                 
-                # Save updated registry
-                with open(registry_file, 'w') as f:
-                    json.dump(registry, f, indent=2)
+                # Save updated registry entry
+                self.persistence.submit('instance registry', self.store.put_registry_entry,
+                                        self._registry_name, self.instance_id, registry[self.instance_id])
                 
                 # Update instance metadata
                 self.save_instance_metadata()
@@ -1254,6 +1778,7 @@ class DesktopWidget:
     
     def show_instance_controller(self):
         """Show the standalone instance manager"""
+        from tkinter import messagebox
         try:
             import subprocess
             import os
@@ -1288,5 +1813,16 @@ if __name__ == "__main__":
         instance_id = sys.argv[2]
         print(f"Launching with instance ID: {instance_id}")
     
-    widget = DesktopWidget(instance_id)
+    # --startup-trace prints import, UI build, load and first-paint timings
+    trace = StartupTrace('--startup-trace' in sys.argv, start=MODULE_LOAD_START, label='process')
+    trace.mark('imports', at=MODULE_LOADED)
+    
+    try:
+        widget = DesktopWidget(instance_id, trace=trace)
+    except InstanceAlreadyRunning:
+        # Bring the running copy forward instead of opening a second one
+        print(f"Instance {instance_id} is already running")
+        from note_host import send_note_command
+        send_note_command(instance_id, 'show')
+        sys.exit(0)
     widget.run()
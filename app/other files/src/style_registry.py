@@ -0,0 +1,117 @@
+"""
+Style registry for Smart Notes
+Themes and named fonts are shared by every note in the process; each note
+records which theme role each widget option uses, so a theme switch only
+reconfigures options whose colour actually changes
+"""
+
+import tkinter as tk
+import tkinter.font as tkfont
+
+THEMES = {
+    'dark': {
+        'bg_dark': '#1e1e1e',
+        'bg_medium': '#2d2d2d',
+        'bg_light': '#363636',
+        'text_primary': '#ffffff',
+        'text_secondary': '#cccccc',
+        'accent': '#007acc',
+        'success': '#28a745'
+    },
+    'light': {
+        'bg_dark': '#f0f0f0',
+        'bg_medium': '#e1e1e1',
+        'bg_light': '#ffffff',
+        'text_primary': '#000000',
+        'text_secondary': '#666666',
+        'accent': '#0066cc',
+        'success': '#28a745'
+    },
+    'blue': {
+        'bg_dark': '#1a1a2e',
+        'bg_medium': '#16213e',
+        'bg_light': '#0f3460',
+        'text_primary': '#ffffff',
+        'text_secondary': '#a8a8a8',
+        'accent': '#e94560',
+        'success': '#48bb78'
+    }
+}
+
+FONTS = {
+    'title': ('Segoe UI', 12, 'bold'),
+    'large': ('Segoe UI', 14, 'bold'),
+    'icon': ('Segoe UI', 14, 'normal'),
+    'body': ('Segoe UI', 11, 'normal'),
+    'small': ('Segoe UI', 9, 'normal')
+}
+
+_fonts = {}  # Named fonts created here; Tk deletes a named font once its Font object is collected
+
+
+def get_font(role, master=None):
+    """Get the process-wide named Tk font for a role (title, large, icon, body, small)"""
+    name = f'SmartNotes{role.capitalize()}'
+    try:
+        return tkfont.Font(root=master, name=name, exists=True)
+    except tk.TclError:
+        pass
+    family, size, weight = FONTS[role]
+    font = tkfont.Font(root=master, name=name, family=family, size=size, weight=weight)
+    _fonts[name] = font
+    return font
+
+
+class StyleRegistry:
+    """Theme roles used by one note's widgets and canvas items"""
+
+    def __init__(self, theme='dark'):
+        self.theme = theme
+        self.colors = THEMES[theme]
+        self.roles = {}  # Role -> {(widget, canvas item or None, option)}
+        self.bindings = {}  # (widget, canvas item or None, option) -> role
+
+    def register(self, widget, **options):
+        """Record that widget options (bg='bg_medium', ...) follow theme roles"""
+        for option, role in options.items():
+            self._bind((widget, None, option), role)
+        return widget
+
+    def register_item(self, canvas, item, **options):
+        """Record that canvas item options (fill='accent', ...) follow theme roles"""
+        for option, role in options.items():
+            self._bind((canvas, item, option), role)
+        return item
+
+    def _bind(self, key, role):
+        previous = self.bindings.get(key)
+        if previous is not None:
+            self.roles[previous].discard(key)
+        self.bindings[key] = role
+        self.roles.setdefault(role, set()).add(key)
+
+    def _unbind(self, key):
+        role = self.bindings.pop(key, None)
+        if role is not None:
+            self.roles[role].discard(key)
+
+    def set_theme(self, theme):
+        """Switch theme, reconfiguring only options whose role changed colour; returns how many"""
+        colors = THEMES[theme]
+        changed = [role for role in self.roles if colors[role] != self.colors[role]]
+        self.theme = theme
+        self.colors = colors
+        updated = 0
+        for role in changed:
+            for key in list(self.roles[role]):
+                widget, item, option = key
+                try:
+                    if item is None:
+                        widget.configure({option: colors[role]})
+                    else:
+                        widget.itemconfigure(item, {option: colors[role]})
+                    updated += 1
+                except tk.TclError:
+                    # Widget was destroyed
+                    self._unbind(key)
+        return updated
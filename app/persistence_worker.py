@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Persistence Worker for Smart Notes
+Single writer thread so note store writes never block the Tk mainloop
+"""
+
+import queue
+import threading
+
+
+class PersistenceWorker:
+    """Runs write jobs on one background thread and reports results to Tk"""
+    FLUSH_JOB = 'flush'
+
+    def __init__(self, poll_ms=50):
+        self.poll_ms = poll_ms
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.root = None
+        self.poll_job = None
+        self.outstanding = 0  # Jobs whose results have not been delivered yet (Tk thread only)
+        self.stats = {'jobs_completed': 0, 'jobs_failed': 0}
+        self.thread = threading.Thread(target=self._run, name='SmartNotesWriter', daemon=True)
+        self.thread.start()
+
+    def attach(self, root):
+        """Deliver job results on the Tk thread of the given root window"""
+        self.root = root
+
+    def submit(self, name, func, *args, callback=None):
+        """Queue a write job; func runs on the writer thread, callback(ok, result) on the Tk thread"""
+        self.outstanding += 1
+        self.jobs.put((name, func, args, callback))
+        self._schedule_poll()
+
+    def _run(self):
+        """Writer thread main loop"""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            name, func, args, callback = job
+            try:
+                result = func(*args)
+                self.results.put((name, True, result, callback))
+            except Exception as e:
+                print(f"Background save '{name}' failed: {e}")
+                self.results.put((name, False, e, callback))
+
+    def _schedule_poll(self):
+        # Only poll while results are outstanding, so an idle note has no timers
+        if self.root is not None and self.poll_job is None:
+            self.poll_job = self.root.after(self.poll_ms, self.process_results)
+
+    def process_results(self):
+        """Deliver finished job results on the Tk thread"""
+        self.poll_job = None
+        while True:
+            try:
+                name, ok, result, callback = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.outstanding -= 1
+            if name != self.FLUSH_JOB:
+                self.stats['jobs_completed' if ok else 'jobs_failed'] += 1
+            if callback is not None:
+                try:
+                    callback(ok, result)
+                except Exception as e:
+                    print(f"Error handling result of '{name}': {e}")
+        if self.outstanding > 0:
+            self._schedule_poll()
+
+    def when_written(self, callback):
+        """Call callback(ok, result) on the Tk thread once every job queued so far has been written"""
+        self.submit(self.FLUSH_JOB, lambda: None, callback=callback)
+
+    def flush(self, timeout=5.0):
+        """Block until every job queued so far has been written; returns False on timeout"""
+        if not self.thread.is_alive():
+            return False
+        done = threading.Event()
+        self.jobs.put((self.FLUSH_JOB, done.set, (), None))
+        self.outstanding += 1
+        finished = done.wait(timeout)
+        if self.poll_job is not None and self.root is not None:
+            self.root.after_cancel(self.poll_job)
+        self.process_results()
+        return finished
+
+    def stop(self, timeout=5.0):
+        """Flush pending jobs and stop the writer thread"""
+        self.flush(timeout)
+        self.jobs.put(None)
+        self.thread.join(timeout)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_persistence_worker():
+    """Get the process-wide persistence worker"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = PersistenceWorker()
+        return _worker
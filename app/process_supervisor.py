@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Process Supervisor for Smart Notes
+One thread watches every launched note process and reports exits to Tk
+"""
+
+import os
+import queue
+import selectors
+import threading
+import time
+import tkinter as tk
+
+
+class ProcessSupervisor:
+    """Tracks child processes through a single event source and posts exits to the Tk thread
+
+    On Linux each process is watched through a pidfd in one selector, so exits are
+    seen immediately. Elsewhere the same thread polls all processes at poll_interval.
+    The thread count stays at one however many processes are watched. With a
+    threaded Tcl the thread wakes the Tk loop with a virtual event; otherwise
+    the Tk loop polls every poll_ms while processes are watched.
+    """
+
+    def __init__(self, poll_ms=100, poll_interval=0.5, max_restarts=3,
+                 restart_backoff=1.0, stable_seconds=30.0):
+        self.poll_ms = poll_ms  # How often the Tk thread checks for exits (only without a threaded Tcl)
+        self.poll_interval = poll_interval  # Fallback polling interval without pidfd
+        self.max_restarts = max_restarts  # Consecutive crash restarts before giving up
+        self.restart_backoff = restart_backoff  # Seconds before the first restart; doubles each time
+        self.stable_seconds = stable_seconds  # A process that ran this long resets its restart count
+        self.use_pidfd = hasattr(os, 'pidfd_open')
+        self.lock = threading.Lock()
+        self.pending = []  # Processes handed to the supervisor thread but not yet watched by it
+        self.exits = queue.Queue()  # (key, process, returncode) from the supervisor thread
+        self.watches = {}  # Key -> watch state (Tk thread only)
+        self.root = None
+        self.poll_job = None
+        self.event_driven = False  # Woken by <<ProcessExited>> instead of polling
+        self.thread = None
+        self.wake_event = threading.Event()
+        self.wake_read = self.wake_write = None
+        if self.use_pidfd:
+            self.wake_read, self.wake_write = os.pipe()
+
+    def attach(self, root):
+        """Deliver exit callbacks on the Tk thread of the given root window"""
+        if root is self.root:
+            return
+        self.root = root
+        self.event_driven = bool(root.tk.call('info', 'exists', 'tcl_platform(threaded)'))
+        if self.event_driven:
+            root.bind('<<ProcessExited>>', lambda e: self.process_exits(), add='+')
+        # Exits may have been reported before there was a Tk thread to deliver them
+        self.poll_job = root.after_idle(self.process_exits)
+
+    def watch(self, key, process, on_exit=None, restart=None):
+        """Watch a process; on_exit(key, returncode) runs on the Tk thread when it exits
+
+        If restart is given, a crash (positive exit code) calls restart() after a
+        backoff; it should return the new process, or None to stop watching.
+        """
+        previous = self.watches.get(key)
+        self.watches[key] = {
+            'process': process,
+            'on_exit': on_exit,
+            'restart': restart,
+            'started': time.time(),
+            'restarts': previous['restarts'] if previous else 0
+        }
+        with self.lock:
+            self.pending.append((key, process))
+        self._ensure_thread()
+        self._wake()
+        self._schedule_poll()
+
+    def is_watched(self, key):
+        """Check whether a process is being watched under key"""
+        return key in self.watches
+
+    def _ensure_thread(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='ProcessSupervisor', daemon=True)
+            self.thread.start()
+
+    def _wake(self):
+        if self.use_pidfd:
+            os.write(self.wake_write, b'x')
+        else:
+            self.wake_event.set()
+
+    def _take_pending(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        return pending
+
+    def _run(self):
+        """Supervisor thread main loop"""
+        if self.use_pidfd:
+            self._run_pidfd()
+        else:
+            self._run_polling()
+
+    def _run_pidfd(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self.wake_read, selectors.EVENT_READ, None)
+        while True:
+            for selector_key, _ in selector.select():
+                if selector_key.data is None:
+                    os.read(self.wake_read, 4096)
+                    for key, process in self._take_pending():
+                        try:
+                            pidfd = os.pidfd_open(process.pid)
+                        except OSError:
+                            # Already reaped; report it straight away
+                            self._post_exit(key, process, process.wait())
+                            continue
+                        selector.register(pidfd, selectors.EVENT_READ, (key, process))
+                else:
+                    key, process = selector_key.data
+                    selector.unregister(selector_key.fd)
+                    os.close(selector_key.fd)
+                    self._post_exit(key, process, process.wait())
+
+    def _run_polling(self):
+        watched = []
+        while True:
+            self.wake_event.wait(self.poll_interval if watched else None)
+            self.wake_event.clear()
+            watched.extend(self._take_pending())
+            still_running = []
+            for key, process in watched:
+                returncode = process.poll()
+                if returncode is None:
+                    still_running.append((key, process))
+                else:
+                    self._post_exit(key, process, returncode)
+            watched = still_running
+
+    def _post_exit(self, key, process, returncode):
+        """Supervisor thread: queue an exit and wake the Tk thread to deliver it"""
+        self.exits.put((key, process, returncode))
+        if not self.event_driven:
+            return
+        # The call is handed to the Tk thread, which must be in its main loop;
+        # retry while it is still starting up
+        while True:
+            try:
+                self.root.event_generate('<<ProcessExited>>', when='tail')
+                return
+            except RuntimeError:
+                time.sleep(0.1)
+            except tk.TclError:
+                return
+
+    def _schedule_poll(self):
+        # Only poll (without a threaded Tcl) while processes are watched, so an
+        # idle manager has no timers
+        if self.root is not None and not self.event_driven and self.poll_job is None:
+            self.poll_job = self.root.after(self.poll_ms, self.process_exits)
+
+    def process_exits(self):
+        """Deliver exits on the Tk thread"""
+        self.poll_job = None
+        while True:
+            try:
+                key, process, returncode = self.exits.get_nowait()
+            except queue.Empty:
+                break
+            watch = self.watches.get(key)
+            if watch is None or watch['process'] is not process:
+                # Not watched any more, or replaced by a newer process under the same key
+                continue
+            if returncode is not None and returncode > 0 and watch['restart'] is not None:
+                if self.schedule_restart(key, watch):
+                    continue
+            del self.watches[key]
+            if watch['on_exit'] is not None:
+                try:
+                    watch['on_exit'](key, returncode)
+                except Exception as e:
+                    print(f"Error handling exit of {key}: {e}")
+        if self.watches:
+            self._schedule_poll()
+
+    def schedule_restart(self, key, watch):
+        """Restart a crashed process after a backoff; returns False once restarts are used up"""
+        if time.time() - watch['started'] >= self.stable_seconds:
+            watch['restarts'] = 0
+        if watch['restarts'] >= self.max_restarts:
+            print(f"{key} crashed {watch['restarts']} times in a row, not restarting")
+            return False
+        delay = self.restart_backoff * (2 ** watch['restarts'])
+        watch['restarts'] += 1
+        watch['process'] = None
+        print(f"{key} crashed, restarting in {delay:.1f}s")
+        self.root.after(int(delay * 1000), lambda: self.restart(key))
+        return True
+
+    def restart(self, key):
+        """Run the restart callback for a crashed process"""
+        watch = self.watches.get(key)
+        if watch is None or watch['process'] is not None:
+            return
+        process = None
+        try:
+            process = watch['restart']()
+        except Exception as e:
+            print(f"Could not restart {key}: {e}")
+        if process is None:
+            # Nothing to watch any more (failed, or handed to a running process)
+            del self.watches[key]
+            if watch['on_exit'] is not None:
+                watch['on_exit'](key, None)
+            return
+        self.watch(key, process, watch['on_exit'], watch['restart'])
+
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+def get_process_supervisor():
+    """Get the process-wide process supervisor"""
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = ProcessSupervisor()
+        return _supervisor
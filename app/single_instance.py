@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Single Instance Activation for Smart Notes
+Lets a second launch of the manager hand its arguments to the running one and exit
+"""
+
+import os
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+MANAGER_LOCK_NAME = 'manager'  # Lock file ~/.smart_notes_manager.lock (see instance_lock.py)
+AUTHKEY_FILE = '.smart_notes_authkey'  # Shared secret for the local control endpoints
+
+_authkey = None
+
+
+def get_authkey():
+    """Secret that clients of the local control endpoints authenticate with
+
+    Created on first use in the home directory, readable only by this user.
+    """
+    global _authkey
+    if _authkey is not None:
+        return _authkey
+    path = os.path.join(os.path.expanduser('~'), AUTHKEY_FILE)
+    for _ in range(20):
+        try:
+            with open(path, 'rb') as f:
+                key = f.read()
+            if key:
+                _authkey = key
+                return key
+        except FileNotFoundError:
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                continue
+            key = os.urandom(32)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(key)
+            _authkey = key
+            return key
+        # Another process created the file and is still writing it
+        time.sleep(0.05)
+    raise OSError(f"Could not read {path}")
+
+
+def get_manager_address():
+    """Address of the running manager's local endpoint (Unix socket, or named pipe on Windows)"""
+    if os.name == 'nt':
+        return r'\\.\pipe\smart_notes_manager_' + os.environ.get('USERNAME', 'user')
+    return os.path.join(os.path.expanduser('~'), '.smart_notes_manager.sock')
+
+
+def notify_manager(message, reply_timeout=0.5):
+    """Send a notice to the running manager, if any; returns whether it was answered"""
+    try:
+        conn = Client(get_manager_address(), authkey=get_authkey())
+    except (OSError, AuthenticationError):
+        return False
+    try:
+        conn.send(message)
+        return conn.poll(reply_timeout) and bool(conn.recv().get('ok'))
+    except (OSError, EOFError):
+        return False
+    finally:
+        conn.close()
+
+
+def activate_running_manager(argv=None, wait=2.0, reply_timeout=1.0):
+    """Ask a running manager to show itself; returns False if no manager took the request
+
+    A manager that holds its lock but is still starting up gets up to wait
+    seconds to open its endpoint. Once the request is sent it counts as handed
+    off: the manager answers from its Tk loop, which may not get to it within
+    reply_timeout.
+    """
+    deadline = time.perf_counter() + wait
+    while True:
+        try:
+            conn = Client(get_manager_address(), authkey=get_authkey())
+        except (OSError, AuthenticationError):
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.05)
+            continue
+        try:
+            conn.send({'command': 'activate', 'argv': list(argv or [])})
+            if not conn.poll(reply_timeout):
+                return True
+            return bool(conn.recv().get('ok'))
+        except (OSError, EOFError) as e:
+            print(f"Running manager did not answer: {e}")
+            return False
+        finally:
+            conn.close()
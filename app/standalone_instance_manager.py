@@ -4,26 +4,80 @@ Standalone Instance Manager for Smart Notes Widget
 This manager can remain open independently of sticky note instances
 """
 
+import os
+import sys
+from instance_lock import InstanceLock, is_instance_locked
+from single_instance import MANAGER_LOCK_NAME, get_manager_address, activate_running_manager
+
+_manager_lock = None  # Held for the life of the manager process
+
+
+def claim_manager_lock():
+    """Take the manager lock; if another manager has it, activate that one and return None"""
+    manager_lock = InstanceLock(MANAGER_LOCK_NAME)
+    if manager_lock.acquire():
+        return manager_lock
+    if activate_running_manager(sys.argv[1:]):
+        print("Smart Notes Instance Manager is already running.")
+    else:
+        print("Another Smart Notes Instance Manager is starting or not responding.")
+    return None
+
+
+# A second launch hands off to the running manager before paying for Tk,
+# the note store and the search index
+if __name__ == "__main__":
+    _manager_lock = claim_manager_lock()
+    if _manager_lock is None:
+        sys.exit(0)
+
 import tkinter as tk
 from tkinter import ttk, messagebox
-import os
-import json
 import uuid
 from datetime import datetime
-import subprocess
-import sys
-import threading
+import time
 import winreg
 from auto_start_registry import AutoStartRegistry
+from note_store import get_store
+from note_search import get_note_index
+from persistence_worker import get_persistence_worker
+from process_supervisor import get_process_supervisor
+
+# Widget-side modules (note host) live in the widget source directory
+WIDGET_SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'other files', 'src')
+if WIDGET_SRC_DIR not in sys.path:
+    sys.path.insert(0, WIDGET_SRC_DIR)
+
+from note_host import launch_notes, start_standby_host, send_note_command, ControlServer
 
 class StandaloneInstanceManager:
+    TREE_COLUMNS = ('checkbox', 'name', 'status', 'created', 'last_modified', 'auto_start')
+    HOST_WATCH_KEY = 'note host'  # Supervisor key of the note host process this manager started
+    
     def __init__(self):
         self.instances = {}
         self.controller_window = None
+        self.rename_window = None
+        self.rename_instance_id = None
         self.item_to_instance_map = {}  # Map treeview items to instance IDs
+        self.instance_to_item_map = {}  # Map instance IDs to treeview items
+        self.row_values = {}  # View model: instance ID -> values currently shown in the tree
         self.max_instances = 10  # Maximum number of instances allowed
         self.running_instances = set()  # Track running instances
+        self.launch_times = {}  # Instance ID -> time of launch, for notes the host may not report yet
+        self.launch_grace_seconds = 10  # How long a launched note counts as running without confirmation
+        self.supervisor = get_process_supervisor()  # One thread watches every launched process
+        self.restart_crashed_notes = False  # Relaunch a note host that crashes (with backoff)
+        self.host_notes = set()  # Notes opened in the note host; a crashed host is relaunched with all of them
         self.auto_start_registry = AutoStartRegistry()  # Auto-start registry manager
+        self.store = get_store()  # Shared note store
+        self.instances_generation = None  # Note store index generation of self.instances
+        self.note_index = get_note_index()  # Full-text search over all notes
+        self.worker = get_persistence_worker()  # Searches (and index updates) run off the Tk thread
+        self.search_delay_ms = 250  # Wait for typing to pause before searching
+        self.search_job = None
+        self.search_serial = 0  # Results of anything but the latest search are dropped
+        self.search_result_map = {}  # Search result items -> instance IDs
         self.colors = {
             'bg_dark': '#1e1e1e',
             'bg_medium': '#2d2d2d',
@@ -38,6 +92,11 @@ class StandaloneInstanceManager:
         # Load existing instances
         self.load_instances()
         
+        # Warm up a note host now so the first launch doesn't pay interpreter and Tk startup
+        process = start_standby_host(cwd=os.path.dirname(os.path.abspath(__file__)))
+        if process is not None:
+            self.watch_host(process)
+        
         # Create the main window
         self.create_main_window()
         
@@ -60,6 +119,14 @@ class StandaloneInstanceManager:
         # Bind window close event
         self.controller_window.protocol("WM_DELETE_WINDOW", self.on_window_close)
         
+        # Process exits and search results are delivered on this window's Tk thread
+        self.supervisor.attach(self.controller_window)
+        self.worker.attach(self.controller_window)
+        
+        # Later launches of the manager activate this one instead of starting another
+        self.control = ControlServer(get_manager_address(), self.handle_control_request)
+        self.control.start(self.controller_window)
+        
     def create_ui(self):
         """Create the user interface"""
         # Main container
@@ -117,13 +184,45 @@ class StandaloneInstanceManager:
         # Update auto-start button text
         self.update_auto_start_button_text()
         
+        # Search box (ranked full-text search across all notes)
+        search_frame = tk.Frame(main_frame, bg=self.colors['bg_dark'])
+        search_frame.pack(fill='x', pady=(0, 10))
+        
+        tk.Label(search_frame,
+                text="Search notes:",
+                bg=self.colors['bg_dark'],
+                fg=self.colors['text_primary'],
+                font=('Segoe UI', 10)).pack(side='left')
+        
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', lambda *args: self.schedule_search())
+        search_entry = tk.Entry(search_frame,
+                               textvariable=self.search_var,
+                               bg=self.colors['bg_light'],
+                               fg=self.colors['text_primary'],
+                               insertbackground=self.colors['accent'],
+                               font=('Segoe UI', 10))
+        search_entry.pack(side='left', fill='x', expand=True, padx=(10, 0))
+        search_entry.bind('<Escape>', lambda e: self.search_var.set(''))
+        
+        # Search results, shown only while there is a query
+        self.search_results_frame = tk.Frame(main_frame, bg=self.colors['bg_dark'])
+        self.search_tree = ttk.Treeview(self.search_results_frame, columns=('name', 'snippet'),
+                                        show='headings', height=6)
+        self.search_tree.heading('name', text='Instance Name')
+        self.search_tree.heading('snippet', text='Match')
+        self.search_tree.column('name', width=150, anchor='w', stretch=False)
+        self.search_tree.column('snippet', width=600, anchor='w')
+        self.search_tree.pack(fill='x')
+        self.search_tree.bind('<Double-1>', self.on_search_result_double_click)
+        
         # Instance list frame
         list_frame = tk.Frame(main_frame, bg=self.colors['bg_dark'])
         list_frame.pack(fill='both', expand=True)
+        self.list_frame = list_frame
         
         # Create Treeview with checkboxes
-        columns = ('checkbox', 'name', 'status', 'created', 'last_modified', 'auto_start')
-        self.tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
+        self.tree = ttk.Treeview(list_frame, columns=self.TREE_COLUMNS, show='headings', height=15)
         
         # Configure columns
         self.tree.heading('checkbox', text='Auto-Start')
@@ -152,6 +251,18 @@ class StandaloneInstanceManager:
         # Bind double-click event
         self.tree.bind('<Double-1>', self.on_instance_double_click)
         
+        # Right-click menu with commands for running notes (sent over the control channel)
+        self.note_menu = tk.Menu(self.controller_window, tearoff=0,
+                                 bg=self.colors['bg_medium'],
+                                 fg=self.colors['text_primary'])
+        self.note_menu.add_command(label="Show Note", command=lambda: self.send_command_to_selected('show'))
+        self.note_menu.add_command(label="Hide Note", command=lambda: self.send_command_to_selected('hide'))
+        self.note_menu.add_command(label="Save Now", command=lambda: self.send_command_to_selected('save-now'))
+        self.note_menu.add_command(label="Reload Settings", command=lambda: self.send_command_to_selected('reload-settings'))
+        self.note_menu.add_separator()
+        self.note_menu.add_command(label="Statistics", command=self.show_selected_instance_stats)
+        self.tree.bind('<Button-3>', self.on_instance_right_click)
+        
         # Action buttons frame
         action_frame = tk.Frame(main_frame, bg=self.colors['bg_dark'])
         action_frame.pack(fill='x', pady=(20, 0))
@@ -227,76 +338,145 @@ class StandaloneInstanceManager:
         # Populate the tree
         self.refresh_instance_list()
         
+        
     def load_instances(self):
-        """Load all existing instances from metadata files and auto-start registry"""
+        """Load all existing instances from the note store and auto-start registry"""
+        # The instance index only changes when its generation does
+        generation = self.store.index_generation()
+        if generation == self.instances_generation:
+            return
+        self.instances_generation = generation
         self.instances = {}
-        home_dir = os.path.expanduser('~')
         
         try:
-            # Scan for all metadata files
-            for filename in os.listdir(home_dir):
-                if filename.startswith('.smart_notes_') and filename.endswith('_metadata.json'):
-                    try:
-                        with open(os.path.join(home_dir, filename), 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-                            instance_id = metadata.get('instance_id')
-                            if instance_id:
-                                self.instances[instance_id] = metadata
-                    except Exception as e:
-                        print(f"Error loading instance metadata {filename}: {e}")
+            self.instances = self.store.list_instances()
         except Exception as e:
-            print(f"Error scanning for instances: {e}")
+            print(f"Error loading instances: {e}")
         
-        # Also load instances from auto-start registry (in case metadata files are missing)
+        # Also load instances from auto-start registry (in case metadata is missing)
         try:
             auto_start_instances = self.auto_start_registry.get_auto_start_instances()
             for instance_id, metadata in auto_start_instances.items():
                 if instance_id not in self.instances:
-                    # Add auto-start instance even if metadata file is missing
+                    # Add auto-start instance even if metadata is missing
                     print(f"Loading auto-start instance from registry: {metadata.get('name', instance_id)}")
                     self.instances[instance_id] = metadata
         except Exception as e:
             print(f"Error loading auto-start instances: {e}")
     
     def refresh_instance_list(self):
-        """Refresh the instance list display"""
+        """Refresh the instance list display, applying only the rows that changed"""
         print("🔄 Refreshing instance list...")
         
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Reload instances
+        # Reload instances (no-op when the note store index is unchanged)
         self.load_instances()
         
-        # Populate tree
-        for instance_id, metadata in self.instances.items():
-            # Check if instance is running
-            status = "Running" if instance_id in self.running_instances else "Stopped"
-            
-            # Check auto-start status
-            auto_start_enabled = self.check_instance_auto_start(instance_id)
-            auto_start_text = "Enabled" if auto_start_enabled else "Disabled"
-            
-            print(f"  Instance: {metadata.get('name', 'Unknown')} - Auto-start: {auto_start_text}")
-            
-            # Create item
-            item = self.tree.insert('', 'end', values=(
-                "☑" if auto_start_enabled else "☐",
-                metadata.get('name', 'Unknown'),
-                status,
-                metadata.get('created_date', '')[:10] if metadata.get('created_date') else '',
-                metadata.get('last_modified', '')[:10] if metadata.get('last_modified') else '',
-                auto_start_text
-            ))
-            
-            # Store mapping
-            self.item_to_instance_map[item] = instance_id
+        # Read which notes are running from their instance locks
+        self.sync_running_instances()
+        
+        # Remove rows for instances that no longer exist
+        for instance_id in list(self.row_values):
+            if instance_id not in self.instances:
+                self.remove_instance_row(instance_id)
+        
+        # Insert new rows and update changed ones
+        for instance_id in self.instances:
+            self.update_instance_row(instance_id)
         
         # Update status
         self.update_status()
         print(f"✅ Refresh complete. Auto-start count: {self.auto_start_registry.get_auto_start_count()}")
     
+    def sync_running_instances(self):
+        """Update running_instances from the instance locks; returns the IDs whose status changed"""
+        try:
+            # Every running note (in any process) holds its instance lock; the OS
+            # drops it when the process exits, so this needs no heartbeat writes
+            running = {instance_id for instance_id in self.instances if is_instance_locked(instance_id)}
+        except Exception as e:
+            print(f"Error checking instance locks: {e}")
+            running = set()
+        
+        # A just-launched note may still be starting in a new host process
+        now = time.time()
+        for instance_id, launched in list(self.launch_times.items()):
+            if instance_id in running or now - launched > self.launch_grace_seconds:
+                del self.launch_times[instance_id]
+            else:
+                running.add(instance_id)
+        
+        changed = running ^ self.running_instances
+        self.running_instances = running
+        return changed
+    
+    def refresh_running_status(self):
+        """Re-check running status; runs on note notices and launch deadlines, never on a timer loop"""
+        try:
+            changed = self.sync_running_instances()
+            for instance_id in changed:
+                self.update_instance_row(instance_id)
+            if changed:
+                self.update_status()
+        except Exception as e:
+            print(f"Error refreshing instance status: {e}")
+    
+    def on_note_status(self, instance_id, running):
+        """A note started or stopped (notice sent by the note itself)"""
+        if running:
+            self.launch_times.pop(instance_id, None)
+        else:
+            # Closed on purpose, so a host crash later must not bring it back
+            self.host_notes.discard(instance_id)
+        # Also catches notes that stopped without a notice (a crashed process)
+        self.refresh_running_status()
+    
+    def build_row_values(self, instance_id):
+        """Build the treeview values for an instance"""
+        metadata = self.instances[instance_id]
+        
+        # Check if instance is running
+        status = "Running" if instance_id in self.running_instances else "Stopped"
+        
+        # Check auto-start status
+        auto_start_enabled = self.check_instance_auto_start(instance_id)
+        auto_start_text = "Enabled" if auto_start_enabled else "Disabled"
+        
+        return (
+            "☑" if auto_start_enabled else "☐",
+            metadata.get('name', 'Unknown'),
+            status,
+            metadata.get('created_date', '')[:10] if metadata.get('created_date') else '',
+            metadata.get('last_modified', '')[:10] if metadata.get('last_modified') else '',
+            auto_start_text
+        )
+    
+    def update_instance_row(self, instance_id):
+        """Insert or update the row for one instance, touching only changed cells"""
+        if instance_id not in self.instances:
+            self.remove_instance_row(instance_id)
+            return
+        
+        values = self.build_row_values(instance_id)
+        old_values = self.row_values.get(instance_id)
+        if old_values is None:
+            item = self.tree.insert('', 'end', values=values)
+            self.item_to_instance_map[item] = instance_id
+            self.instance_to_item_map[instance_id] = item
+        elif old_values != values:
+            item = self.instance_to_item_map[instance_id]
+            for column, old_value, value in zip(self.TREE_COLUMNS, old_values, values):
+                if old_value != value:
+                    self.tree.set(item, column, value)
+        self.row_values[instance_id] = values
+    
+    def remove_instance_row(self, instance_id):
+        """Remove the row for one instance"""
+        item = self.instance_to_item_map.pop(instance_id, None)
+        self.row_values.pop(instance_id, None)
+        if item is not None:
+            self.item_to_instance_map.pop(item, None)
+            self.tree.delete(item)
+    
     def check_instance_auto_start(self, instance_id):
         """Check if auto-start is enabled for a specific instance"""
         return self.auto_start_registry.is_auto_start_enabled(instance_id)
@@ -432,26 +612,17 @@ class StandaloneInstanceManager:
                 'created_date': datetime.now().isoformat(),
                 'last_modified': datetime.now().isoformat(),
                 'theme': 'dark',
-                'auto_start': False,  # Default to disabled
-                'files': {
-                    'settings': f'~/.smart_notes_{instance_id}_settings.json',
-                    'notes': f'~/.smart_notes_{instance_id}_notes.txt',
-                    'position': f'~/.smart_notes_{instance_id}_position.json',
-                    'mini_position': f'~/.smart_notes_{instance_id}_mini_position.json'
-                }
+                'auto_start': False  # Default to disabled
             }
             
-            # Save metadata
-            metadata_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{instance_id}_metadata.json')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(instance_metadata, f, indent=2)
+            # Save metadata and registry entry together
+            with self.store.transaction():
+                self.store.put_metadata(instance_id, instance_metadata)
+                self.update_instance_registry(instance_id, instance_metadata)
             
             # Add to instances dict
             self.instances[instance_id] = instance_metadata
             
-            # Update instance registry
-            self.update_instance_registry(instance_id, instance_metadata)
-            
             # Refresh the display
             self.refresh_instance_list()
             
@@ -463,60 +634,127 @@ class StandaloneInstanceManager:
     def update_instance_registry(self, instance_id, metadata):
         """Update the instance registry"""
         try:
-            registry_file = os.path.join(os.path.expanduser('~'), '.smart_notes_instance_registry.json')
-            
-            if os.path.exists(registry_file):
-                with open(registry_file, 'r') as f:
-                    registry = json.load(f)
-            else:
-                registry = {}
-            
-            # Add/update instance
-            registry[instance_id] = metadata
-            
-            # Save registry
-            with open(registry_file, 'w') as f:
-                json.dump(registry, f, indent=2)
-                
+            self.store.put_registry_entry('instance_registry', instance_id, metadata)
         except Exception as e:
             print(f"Error updating instance registry: {e}")
     
     def launch_instance(self, instance_id):
         """Launch an existing instance"""
         try:
-            # Check if instance is already running
-            if instance_id in self.running_instances:
-                messagebox.showinfo("Info", f"Instance '{self.instances.get(instance_id, {}).get('name', 'Unknown')}' is already running.")
+            # If the instance is already running (its lock is held by some process), bring it forward instead
+            if is_instance_locked(instance_id):
+                reply = send_note_command(instance_id, 'show')
+                if reply is None or not reply.get('ok'):
+                    messagebox.showinfo("Info", f"Instance '{self.instances.get(instance_id, {}).get('name', 'Unknown')}' is already running.")
                 return
             
             # Add to running instances
             self.running_instances.add(instance_id)
+            self.launch_times[instance_id] = time.time()
+            # A note that never starts is marked stopped once its grace period ends
+            self.controller_window.after(self.launch_grace_seconds * 1000 + 100, self.refresh_running_status)
             
-            # Get the current script path
-            script_path = os.path.join(os.path.dirname(__file__), 'other files', 'src', 'sticky_notes_widget.py')
+            # Open the note in the shared note host (starting one if needed)
+            process = launch_notes([instance_id])
+            self.host_notes.add(instance_id)
             
-            # Launch the instance with the instance ID as argument
-            process = subprocess.Popen([sys.executable, script_path, '--instance-id', instance_id])
-            
-            # Monitor process to remove from running instances when it closes
-            def monitor_process():
-                process.wait()
-                if instance_id in self.running_instances:
-                    self.running_instances.remove(instance_id)
-                    # Update display
-                    self.controller_window.after(0, self.refresh_instance_list)
-            
-            monitor_thread = threading.Thread(target=monitor_process, daemon=True)
-            monitor_thread.start()
+            # Watch a newly started host; notes handed to a running host are covered by its watch
+            if process is not None:
+                self.watch_host(process)
             
             # Update display
-            self.refresh_instance_list()
+            self.update_instance_row(instance_id)
+            self.update_status()
             
         except Exception as e:
             messagebox.showerror("Error", f"Could not launch instance: {e}")
             if instance_id in self.running_instances:
                 self.running_instances.remove(instance_id)
     
+    def watch_host(self, process):
+        """Have the supervisor report (and optionally restart) a note host process"""
+        restart = self.restart_host_notes if self.restart_crashed_notes else None
+        self.supervisor.watch(self.HOST_WATCH_KEY, process,
+                              on_exit=lambda key, returncode: self.on_host_exited(),
+                              restart=restart)
+    
+    def stopped_host_notes(self):
+        """Notes opened in the note host whose lock is gone (the host exited)"""
+        return [instance_id for instance_id in self.host_notes if not is_instance_locked(instance_id)]
+    
+    def restart_host_notes(self):
+        """Relaunch every note the crashed host had open; returns the new host process"""
+        instance_ids = [instance_id for instance_id in self.stopped_host_notes() if instance_id in self.instances]
+        self.host_notes = set(instance_ids)
+        if not instance_ids:
+            return None
+        now = time.time()
+        for instance_id in instance_ids:
+            self.launch_times[instance_id] = now
+        return launch_notes(instance_ids)
+    
+    def on_host_exited(self):
+        """Handle the note host process exiting: every note it held has stopped"""
+        for instance_id in self.stopped_host_notes():
+            self.host_notes.discard(instance_id)
+            self.launch_times.pop(instance_id, None)
+            if instance_id in self.running_instances:
+                self.running_instances.remove(instance_id)
+                self.update_instance_row(instance_id)
+        self.update_status()
+    
+    def on_instance_right_click(self, event):
+        """Select the row under the pointer and show the note command menu"""
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return
+        self.tree.selection_set(item)
+        self.note_menu.tk_popup(event.x_root, event.y_root)
+    
+    def get_selected_instance_id(self):
+        """Get the instance ID of the selected row, or None"""
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        return self.item_to_instance_map.get(selection[0])
+    
+    def send_command_to_selected(self, action):
+        """Send a control channel command to the selected running note"""
+        instance_id = self.get_selected_instance_id()
+        if not instance_id:
+            messagebox.showwarning("Warning", "Please select an instance.")
+            return None
+        
+        reply = send_note_command(instance_id, action)
+        name = self.instances.get(instance_id, {}).get('name', 'Unknown')
+        if reply is None:
+            messagebox.showinfo("Info", f"Instance '{name}' is not running.")
+            return None
+        if not reply.get('ok'):
+            messagebox.showerror("Error", f"Instance '{name}' could not run '{action}': {reply.get('error', 'unknown error')}")
+            return None
+        if reply.get('pending'):
+            self.status_label.config(text=f"{action} sent to '{name}' (still writing)")
+        else:
+            self.status_label.config(text=f"{action} sent to '{name}'")
+        return reply
+    
+    def show_selected_instance_stats(self):
+        """Show statistics reported by the selected running note"""
+        reply = self.send_command_to_selected('get-stats')
+        if reply is None:
+            return
+        autosave = reply.get('autosave', {})
+        persistence = reply.get('persistence', {})
+        messagebox.showinfo("Instance Statistics",
+                            f"Lines: {reply.get('lines', 0)}\n"
+                            f"Unsaved changes: {'Yes' if reply.get('dirty') else 'No'}\n"
+                            f"Minimized: {'Yes' if reply.get('minimized') else 'No'}\n"
+                            f"Saves performed: {autosave.get('saves_performed', 0)}\n"
+                            f"Saves skipped: {autosave.get('saves_skipped', 0)}\n"
+                            f"Background writes: {persistence.get('jobs_completed', 0)} "
+                            f"({persistence.get('jobs_failed', 0)} failed)")
+    
     def launch_selected_instance(self):
         """Launch the selected instance"""
         selection = self.tree.selection()
@@ -570,18 +808,15 @@ class StandaloneInstanceManager:
             if instance_id in self.running_instances:
                 self.running_instances.remove(instance_id)
             
-            # Remove metadata file
-            metadata_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{instance_id}_metadata.json')
-            if os.path.exists(metadata_file):
-                os.remove(metadata_file)
+            # Remove stored data and registry entry together
+            with self.store.transaction():
+                self.store.delete_instance(instance_id)
+                self.remove_from_instance_registry(instance_id)
             
             # Remove from instances dict
             if instance_id in self.instances:
                 del self.instances[instance_id]
             
-            # Update instance registry
-            self.remove_from_instance_registry(instance_id)
-            
             # Refresh display
             self.refresh_instance_list()
             
@@ -593,19 +828,7 @@ class StandaloneInstanceManager:
     def remove_from_instance_registry(self, instance_id):
         """Remove instance from the registry"""
         try:
-            registry_file = os.path.join(os.path.expanduser('~'), '.smart_notes_instance_registry.json')
-            
-            if os.path.exists(registry_file):
-                with open(registry_file, 'r') as f:
-                    registry = json.load(f)
-                
-                if instance_id in registry:
-                    del registry[instance_id]
-                    
-                    # Save updated registry
-                    with open(registry_file, 'w') as f:
-                        json.dump(registry, f, indent=2)
-                        
+            self.store.remove_registry_entry('instance_registry', instance_id)
         except Exception as e:
             print(f"Error removing instance from registry: {e}")
     
@@ -615,17 +838,13 @@ class StandaloneInstanceManager:
         if not instance:
             return
         
-        # Create rename dialog
-        rename_window = tk.Toplevel(self.controller_window)
-        rename_window.title("Rename Instance")
-        rename_window.geometry("400x150")
-        rename_window.configure(bg=self.colors['bg_dark'])
-        rename_window.attributes('-topmost', True)
-        rename_window.transient(self.controller_window)
-        rename_window.grab_set()
+        # The dialog is built once and reused for every rename
+        if self.rename_window is None or not self.rename_window.winfo_exists():
+            self.create_rename_dialog()
+        self.rename_instance_id = instance_id
+        rename_window = self.rename_window
         
         # Position above the controller window
-        rename_window.update_idletasks()
         controller_x = self.controller_window.winfo_rootx()
         controller_y = self.controller_window.winfo_rooty()
         x = controller_x + (self.controller_window.winfo_width() // 2) - 200
@@ -637,16 +856,39 @@ class StandaloneInstanceManager:
         
         rename_window.geometry(f"400x150+{x}+{y}")
         
+        self.rename_current_label.configure(text=f"Current name: {instance['name']}")
+        self.rename_entry.delete(0, tk.END)
+        self.rename_entry.insert(0, instance['name'])
+        
+        rename_window.deiconify()
+        rename_window.lift()
+        rename_window.grab_set()
+        self.rename_entry.focus()
+        self.rename_entry.select_range(0, tk.END)
+    
+    def create_rename_dialog(self):
+        """Create the (hidden) rename dialog"""
+        rename_window = tk.Toplevel(self.controller_window)
+        rename_window.withdraw()
+        rename_window.title("Rename Instance")
+        rename_window.geometry("400x150")
+        rename_window.configure(bg=self.colors['bg_dark'])
+        rename_window.attributes('-topmost', True)
+        rename_window.transient(self.controller_window)
+        rename_window.protocol("WM_DELETE_WINDOW", self.hide_rename_dialog)
+        self.rename_window = rename_window
+        
         # Content
         main_frame = tk.Frame(rename_window, bg=self.colors['bg_dark'])
         main_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Current name label
-        tk.Label(main_frame,
-                text=f"Current name: {instance['name']}",
+        self.rename_current_label = tk.Label(main_frame,
+                text="Current name:",
                 bg=self.colors['bg_dark'],
                 fg=self.colors['text_secondary'],
-                font=('Segoe UI', 10)).pack(anchor='w', pady=(0, 10))
+                font=('Segoe UI', 10))
+        self.rename_current_label.pack(anchor='w', pady=(0, 10))
         
         # New name entry
         name_frame = tk.Frame(main_frame, bg=self.colors['bg_dark'])
@@ -657,26 +899,20 @@ class StandaloneInstanceManager:
                 bg=self.colors['bg_dark'],
                 fg=self.colors['text_primary']).pack(side='left')
         
-        name_entry = tk.Entry(name_frame,
+        self.rename_entry = tk.Entry(name_frame,
                              bg=self.colors['bg_light'],
                              fg=self.colors['text_primary'],
                              insertbackground=self.colors['accent'])
-        name_entry.insert(0, instance['name'])
-        name_entry.pack(side='right', fill='x', expand=True, padx=(10, 0))
-        name_entry.focus()
-        name_entry.select_range(0, tk.END)
+        self.rename_entry.pack(side='right', fill='x', expand=True, padx=(10, 0))
         
         # Buttons
         button_frame = tk.Frame(main_frame, bg=self.colors['bg_dark'])
         button_frame.pack(fill='x')
         
         def rename_action():
-            new_name = name_entry.get().strip()
-            if self.rename_instance(instance_id, new_name):
-                rename_window.destroy()
-        
-        def cancel_action():
-            rename_window.destroy()
+            new_name = self.rename_entry.get().strip()
+            if self.rename_instance(self.rename_instance_id, new_name):
+                self.hide_rename_dialog()
         
         tk.Button(button_frame,
                   text="Rename",
@@ -688,12 +924,17 @@ class StandaloneInstanceManager:
         
         tk.Button(button_frame,
                   text="Cancel",
-                  command=cancel_action,
+                  command=self.hide_rename_dialog,
                   bg=self.colors['bg_medium'],
                   fg=self.colors['text_primary'],
                   bd=0,
                   padx=20).pack(side='left')
     
+    def hide_rename_dialog(self):
+        """Hide the rename dialog so the next rename can reuse it"""
+        self.rename_window.grab_release()
+        self.rename_window.withdraw()
+    
     def rename_instance(self, instance_id, new_name):
         """Rename an instance"""
         if not new_name or not new_name.strip():
@@ -706,13 +947,14 @@ class StandaloneInstanceManager:
                 self.instances[instance_id]['name'] = new_name.strip()
                 self.instances[instance_id]['last_modified'] = datetime.now().isoformat()
                 
-                # Save metadata file
-                metadata_file = os.path.join(os.path.expanduser('~'), f'.smart_notes_{instance_id}_metadata.json')
-                with open(metadata_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.instances[instance_id], f, indent=2)
+                # Save metadata and registry entry together
+                with self.store.transaction():
+                    self.store.put_metadata(instance_id, self.instances[instance_id])
+                    self.update_instance_registry(instance_id, self.instances[instance_id])
                 
-                # Update instance registry
-                self.update_instance_registry(instance_id, self.instances[instance_id])
+                # Let a running note pick up its new name
+                if instance_id in self.running_instances:
+                    send_note_command(instance_id, 'reload-settings', timeout=1.0)
                 
                 # Refresh display
                 self.refresh_instance_list()
@@ -810,6 +1052,49 @@ class StandaloneInstanceManager:
         else:
             self.auto_start_btn.config(text="Enable Global Auto-Start", bg=self.colors['success'])
     
+    def schedule_search(self):
+        """Search once typing pauses"""
+        if self.search_job is not None:
+            self.controller_window.after_cancel(self.search_job)
+        self.search_job = self.controller_window.after(self.search_delay_ms, self.run_search)
+    
+    def run_search(self):
+        """Search all notes for the current query in the background"""
+        self.search_job = None
+        self.search_serial += 1
+        query = self.search_var.get().strip()
+        if not query:
+            self.search_results_frame.pack_forget()
+            return
+        serial = self.search_serial
+        self.worker.submit('search', self.note_index.search, query,
+                           callback=lambda ok, result: self.show_search_results(serial, ok, result))
+    
+    def show_search_results(self, serial, ok, results):
+        """Show ranked search results (unless a newer search has started)"""
+        if serial != self.search_serial:
+            return
+        if not ok:
+            self.status_label.config(text=f"Search failed: {results}")
+            return
+        self.search_tree.delete(*self.search_tree.get_children())
+        self.search_result_map = {}
+        for result in results:
+            instance_id = result['instance_id']
+            name = self.instances.get(instance_id, {}).get('name', instance_id[:8])
+            item = self.search_tree.insert('', 'end', values=(name, result['snippet']))
+            self.search_result_map[item] = instance_id
+        if not results:
+            self.search_tree.insert('', 'end', values=('', 'No matching notes'))
+        if not self.search_results_frame.winfo_ismapped():
+            self.search_results_frame.pack(fill='x', pady=(0, 10), before=self.list_frame)
+    
+    def on_search_result_double_click(self, event):
+        """Open (or bring forward) the note of a search result"""
+        selection = self.search_tree.selection()
+        if selection and selection[0] in self.search_result_map:
+            self.launch_instance(self.search_result_map[selection[0]])
+    
     def update_status(self):
         """Update the status bar"""
         total_instances = len(self.instances)
@@ -836,6 +1121,18 @@ class StandaloneInstanceManager:
         # Show system tray icon or minimize to taskbar
         # For now, just keep it hidden but running
     
+    def handle_control_request(self, message):
+        """Answer a request from another launch of the manager, or a note's status notice"""
+        if message.get('command') == 'activate':
+            self.show_manager()
+            return {'ok': True}
+        if message.get('command') == 'ping':
+            return {'ok': True, 'pid': os.getpid()}
+        if message.get('command') == 'note-status':
+            self.on_note_status(message.get('instance_id'), bool(message.get('running')))
+            return {'ok': True}
+        return {'ok': False, 'error': f"Unknown command: {message.get('command')}"}
+    
     def show_manager(self):
         """Show the manager window"""
         if self.controller_window:
@@ -849,6 +1146,13 @@ class StandaloneInstanceManager:
 
 def main():
     """Main entry point"""
+    # Only one manager runs at a time; a second launch activates the first and exits
+    global _manager_lock
+    if _manager_lock is None:
+        _manager_lock = claim_manager_lock()
+        if _manager_lock is None:
+            return
+    
     manager = StandaloneInstanceManager()
     manager.run()
 
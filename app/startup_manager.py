@@ -6,60 +6,97 @@ Launches auto-start enabled instances when the system starts
 
 import os
 import sys
-import subprocess
 import time
 from auto_start_registry import AutoStartRegistry
+from instance_lock import is_instance_locked
+
+# Widget-side modules (note host) live in the widget source directory
+WIDGET_SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'other files', 'src')
+if WIDGET_SRC_DIR not in sys.path:
+    sys.path.insert(0, WIDGET_SRC_DIR)
+
+from note_host import launch_notes, start_standby_host, wait_for_host, request_open
 
 class StartupManager:
-    def __init__(self):
+    def __init__(self, ready_timeout=30.0):
         self.auto_start_registry = AutoStartRegistry()
         self.current_dir = os.path.dirname(os.path.abspath(__file__))
-        
+        self.ready_timeout = ready_timeout  # Seconds to wait for a note's readiness signal
+        self.launch_latency = {}  # Instance ID -> seconds from request to first paint
+    
     def launch_auto_start_instances(self):
-        """Launch all auto-start enabled instances"""
+        """Launch all auto-start enabled instances that are not already running"""
         try:
             auto_start_instances = self.auto_start_registry.get_auto_start_instances()
             
             if not auto_start_instances:
                 print("No auto-start instances found.")
+                # Keep a warm note host ready for notes opened later
+                start_standby_host(cwd=self.current_dir)
                 return
             
-            print(f"Launching {len(auto_start_instances)} auto-start instances...")
-            
+            # A running note holds its instance lock, whether it is in the note
+            # host or in a process of its own
+            pending = {}
             for instance_id, metadata in auto_start_instances.items():
-                try:
-                    self.launch_instance(instance_id, metadata)
-                    # Small delay to prevent overwhelming the system
-                    time.sleep(0.5)
-                except Exception as e:
-                    print(f"Error launching instance {instance_id}: {e}")
+                if is_instance_locked(instance_id):
+                    print(f"Already running: {metadata.get('name', instance_id)}")
+                else:
+                    pending[instance_id] = metadata
+            
+            if not pending:
+                print("All auto-start instances are already running.")
+                start_standby_host(cwd=self.current_dir)
+                return
+            
+            # Bring up the note host
+            if self.ensure_host() is None:
+                # No host to talk to; hand everything to a new host process in one go
+                print("Note host did not become ready, launching notes directly")
+                launch_notes(list(pending), cwd=self.current_dir, timeout=self.ready_timeout)
+                return
             
-            print("Auto-start instances launched successfully!")
+            print(f"Launching {len(pending)} auto-start instances...")
             
+            # The host opens notes one at a time on its Tk thread, so requests are
+            # sent one after another; each latency then covers only its own note
+            start = time.perf_counter()
+            results = [self.launch_instance(instance_id, metadata) for instance_id, metadata in pending.items()]
+            
+            launched = sum(1 for ok in results if ok)
+            print(f"Launched {launched}/{len(pending)} auto-start instances "
+                  f"in {time.perf_counter() - start:.2f}s")
+        
         except Exception as e:
             print(f"Error in startup manager: {e}")
     
+    def ensure_host(self):
+        """Start a note host if none is running and wait until it answers; returns its status"""
+        start_standby_host(cwd=self.current_dir)
+        return wait_for_host(timeout=self.ready_timeout)
+    
     def launch_instance(self, instance_id, metadata):
-        """Launch a single instance"""
+        """Launch a single instance and wait for its readiness signal"""
+        name = metadata.get('name', instance_id)
         try:
-            # Path to the sticky notes widget
-            widget_path = os.path.join(self.current_dir, 'other files', 'src', 'sticky_notes_widget.py')
+            start = time.perf_counter()
+            reply = request_open([instance_id], timeout=self.ready_timeout)
+            if reply is None:
+                # Host went away; fall back to a host process of its own
+                launch_notes([instance_id], cwd=self.current_dir, timeout=self.ready_timeout)
+                print(f"Launched instance: {name} (readiness unknown)")
+                return True
             
-            if not os.path.exists(widget_path):
-                print(f"Widget not found at: {widget_path}")
+            if instance_id not in reply.get('ready', {}):
+                print(f"Instance {name} failed to open")
                 return False
             
-            # Launch the instance with the instance ID
-            process = subprocess.Popen([
-                sys.executable, 
-                widget_path, 
-                '--instance-id', 
-                instance_id
-            ], cwd=self.current_dir)
-            
-            print(f"Launched instance: {metadata.get('name', instance_id)} (PID: {process.pid})")
+            latency = time.perf_counter() - start
+            self.launch_latency[instance_id] = latency
+            print(f"Launched instance: {name} (ready in {latency * 1000:.0f} ms, "
+                  f"painted in {reply['ready'][instance_id] * 1000:.0f} ms)")
             return True
-            
+        
         except Exception as e:
             print(f"Error launching instance {instance_id}: {e}")
             return False
@@ -69,17 +106,11 @@ class StartupManager:
         print("🚀 Smart Notes Startup Manager")
         print("=" * 40)
         
-        # Wait a bit for system to fully boot
-        print("Waiting for system to stabilize...")
-        time.sleep(2)
-        
-        # Launch auto-start instances
+        # Launch auto-start instances; each launch waits for its note's readiness
+        # signal, so no fixed delays are needed
         self.launch_auto_start_instances()
         
         print("Startup process completed.")
-        
-        # Keep the process running for a short time to ensure instances start
-        time.sleep(5)
 
 def main():
     """Main entry point"""
@@ -87,4 +118,4 @@ def main():
     startup_manager.run()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Tests for the find bar on a windowed (large) note
+"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'other files', 'src'))
+
+from find_bar import FindBar, CURRENT_TAG
+from large_note_view import LargeNoteView
+
+
+class FakeText:
+    """Just enough of tk.Text for FindBar and LargeNoteView (no display needed)"""
+
+    def __init__(self):
+        self.content = ''
+        self.marks = {'insert': 0}
+        self.tags = {}
+        self.top = 0  # Offset of the first visible line
+        self.modified = False
+        self.jobs = []
+
+    def offset(self, index):
+        index = str(index)
+        modifier = None
+        for suffix in (' linestart', ' lineend'):
+            if index.endswith(suffix):
+                index, modifier = index[:-len(suffix)], suffix.strip()
+        if index in ('end', 'end-1c'):
+            offset = len(self.content)
+        elif index in self.marks:
+            offset = self.marks[index]
+        elif index.startswith('@'):
+            offset = self.top
+        else:
+            line, column = map(int, index.split('.'))
+            lines = self.content.split('\n')
+            if line > len(lines):
+                return len(self.content)
+            offset = sum(len(l) + 1 for l in lines[:line - 1]) + min(column, len(lines[line - 1]))
+        if modifier == 'linestart':
+            offset = self.content.rfind('\n', 0, offset) + 1
+        elif modifier == 'lineend':
+            end = self.content.find('\n', offset)
+            offset = len(self.content) if end < 0 else end
+        return offset
+
+    def index(self, index):
+        return self.index_of(self.offset(index))
+
+    def index_of(self, offset):
+        line = self.content.count('\n', 0, offset)
+        return f"{line + 1}.{offset - (self.content.rfind(chr(10), 0, offset) + 1)}"
+
+    def get(self, first, last):
+        return self.content[self.offset(first):self.offset(last)]
+
+    def insert(self, index, chars):
+        offset = self.offset(index)
+        self.content = self.content[:offset] + chars + self.content[offset:]
+        self.modified = True
+
+    def delete(self, first, last):
+        first, last = self.offset(first), self.offset(last)
+        self.content = self.content[:first] + self.content[last:]
+        self.tags = {}
+        self.modified = True
+
+    def edit_modified(self, value=None):
+        if value is None:
+            return self.modified
+        self.modified = value
+
+    def edit_separator(self):
+        pass
+
+    def mark_set(self, name, index):
+        self.marks[name] = self.offset(index)
+
+    def see(self, index):
+        pass
+
+    def yview(self, *args):
+        if args:
+            self.top = self.offset(f"{args[0]} linestart")
+        return 0.0, 0.1
+
+    def winfo_height(self):
+        return 0
+
+    def tag_add(self, tag, *indices):
+        spans = self.tags.setdefault(tag, [])
+        for i in range(0, len(indices), 2):
+            spans.append((self.offset(indices[i]), self.offset(indices[i + 1])))
+
+    def tag_remove(self, tag, first, last):
+        self.tags.pop(tag, None)
+
+    def tag_ranges(self, tag):
+        return [self.index_of(offset) for span in self.tags.get(tag, []) for offset in span]
+
+    def tagged_text(self, tag):
+        return [self.content[start:end] for start, end in self.tags.get(tag, [])]
+
+    def after(self, ms, callback):
+        self.jobs.append(callback)
+        return callback
+
+    def after_idle(self, callback):
+        return self.after(0, callback)
+
+    def after_cancel(self, job):
+        if job in self.jobs:
+            self.jobs.remove(job)
+
+    def run_jobs(self):
+        while self.jobs:
+            self.jobs.pop(0)()
+
+
+class FakeRecorder:
+    enabled = True
+
+    def take(self):
+        return []
+
+    def clear(self):
+        pass
+
+
+class Var:
+    def __init__(self, value=''):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class Label:
+    text = ''
+
+    def configure(self, text=''):
+        self.text = text
+
+
+def make_find_bar(lines, query, replacement=''):
+    text = FakeText()
+    view = LargeNoteView(text, FakeRecorder(), None, window_lines=100, lines=list(lines))
+    bar = FindBar(text, styles=None, get_view=lambda: view)
+    view.on_page = bar.on_view_paged
+    view.show(0)
+    bar.find_var, bar.replace_var = Var(query), Var(replacement)
+    bar.case_var, bar.regex_var = Var(False), Var(False)
+    bar.count_label = Label()
+    bar.start_search()
+    text.run_jobs()
+    return text, view, bar
+
+
+def sample_lines():
+    lines = [f"line {i}" for i in range(1000)]
+    lines[5] = "a needle here"
+    lines[900] = "another needle"
+    return lines
+
+
+def test_find_searches_whole_windowed_document():
+    text, view, bar = make_find_bar(sample_lines(), 'needle')
+    assert len(bar.matches) == 2
+    assert bar.count_label.text == "2 matches"
+    # Only the match in the window is highlighted
+    assert text.tagged_text('find_match') == ['needle']
+
+    bar.find_next()
+    bar.find_next()
+    # The far match was paged into the Text and selected there
+    assert view.start <= 900 < view.end
+    assert text.tagged_text(CURRENT_TAG) == ['needle']
+    line = int(text.index(text.tag_ranges(CURRENT_TAG)[0]).split('.')[0])
+    assert view.start + line - 1 == 900
+    assert bar.count_label.text == "2 of 2"
+
+
+def test_replace_current_writes_back_to_document():
+    text, view, bar = make_find_bar(sample_lines(), 'needle', 'pin')
+    bar.find_next()
+    bar.find_next()
+    bar.replace_current()
+    assert view.get_text().split('\n')[900] == "another pin"
+    assert view.get_text().split('\n')[5] == "a needle here"
+
+
+def test_replace_all_rewrites_whole_document():
+    text, view, bar = make_find_bar(sample_lines(), 'needle', 'pin')
+    bar.replace_all()
+    lines = view.get_text().split('\n')
+    assert lines[5] == "a pin here" and lines[900] == "another pin"
+    assert not re.search('needle', view.get_text())
+    assert bar.count_label.text == "Replaced 2"
+    # Saved as a snapshot, and marked as an edit
+    assert view.take_ops() is None
+    assert text.edit_modified()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Tests for the note journal: edit recording and replay
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'other files', 'src'))
+
+from note_store import apply_journal
+
+
+def replay_naive(content, ops):
+    """Reference replay, one string rebuild per op"""
+    for op, pos, data in ops:
+        if op == 'i':
+            content = content[:pos] + data + content[pos:]
+        else:
+            content = content[:pos] + content[pos + int(data):]
+    return content
+
+
+def make_text():
+    """A tk.Text with a TextEditRecorder, or skip when there is no display"""
+    import tkinter as tk
+    from edit_recorder import TextEditRecorder
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    root.withdraw()
+    text = tk.Text(root)
+    return root, text, TextEditRecorder(text)
+
+
+class FakeTclText:
+    """A Tcl text widget command, for recorder tests without a display
+
+    Indices are line.column in code points; get() reports how much it copied.
+    """
+
+    def __init__(self, content=''):
+        self.content = content
+        self.marks = {'insert': 0}
+        self.copied = 0
+
+    def offset(self, index):
+        index = str(index)
+        delta = 0
+        for suffix, step in (('+1c', 1), ('-1c', -1)):
+            if index.endswith(suffix):
+                index, delta = index[:-len(suffix)], step
+        if index == 'end':
+            offset = len(self.content) + 1  # Tk's final newline
+        elif index in self.marks:
+            offset = self.marks[index]
+        else:
+            line, column = index.split('.')
+            starts = [0] + [i + 1 for i, char in enumerate(self.content) if char == '\n']
+            if int(line) > len(starts):
+                offset = len(self.content) + 1
+            else:
+                start = starts[int(line) - 1]
+                end = self.content.find('\n', start)
+                end = len(self.content) if end < 0 else end
+                offset = end if column == 'end' else min(start + int(column), end)
+        return max(0, min(offset + delta, len(self.content) + 1))
+
+    def index(self, offset):
+        line = self.content.count('\n', 0, offset)
+        return f"{line + 1}.{offset - (self.content.rfind(chr(10), 0, offset) + 1)}"
+
+    def command(self, name, *args):
+        if name == 'compare':
+            first, op, second = args
+            return {'>': self.offset(first) > self.offset(second)}[op]
+        if name == 'index':
+            return self.index(min(self.offset(args[0]), len(self.content)))
+        if name == 'get':
+            chars = self.content[self.offset(args[0]):min(self.offset(args[1]), len(self.content))]
+            self.copied += len(chars)
+            return chars
+        if name == 'count':
+            return max(0, min(self.offset(args[2]), len(self.content)) - self.offset(args[1]))
+        if name == 'insert':
+            offset = min(self.offset(args[0]), len(self.content))
+            self.content = self.content[:offset] + ''.join(args[1::2]) + self.content[offset:]
+            return ''
+        if name == 'delete':
+            first = min(self.offset(args[0]), len(self.content))
+            last = min(self.offset(args[1]) if len(args) > 1 else first + 1, len(self.content))
+            if last > first:
+                self.content = self.content[:first] + self.content[last:]
+            return ''
+        raise ValueError(name)
+
+
+class FakeTk:
+    def __init__(self, text):
+        self.text = text
+        self.commands = {}
+
+    def call(self, *args):
+        if len(args) == 1 and isinstance(args[0], tuple):
+            args = args[0]
+        if args[0] == 'rename':
+            return ''
+        if args[0] in self.commands:
+            return self.commands[args[0]](*args[1:])
+        return self.text.command(*args[1:])
+
+    def createcommand(self, name, func):
+        self.commands[name] = func
+
+    def getboolean(self, value):
+        return bool(value)
+
+
+class FakeWidget:
+    _w = '.note'
+
+    def __init__(self, content=''):
+        self.core = FakeTclText(content)
+        self.tk = FakeTk(self.core)
+
+    def __getattr__(self, name):
+        # text.insert(...) etc. go through the (wrapped) widget command
+        return lambda *args: self.tk.call(self._w, name, *args)
+
+
+def make_fake_text(content=''):
+    from edit_recorder import TextEditRecorder
+    text = FakeWidget()
+    recorder = TextEditRecorder(text)
+    recorder.enabled = False
+    text.insert('1.0', content)
+    recorder.enabled = True
+    return text, recorder
+
+
+def test_recorder_replays_random_edits_with_emoji():
+    rng = random.Random(7)
+    for _ in range(50):
+        text, recorder = make_fake_text(''.join(rng.choice('ab\n😀') for _ in range(rng.randint(0, 300))))
+        saved = text.core.content
+        for _ in range(60):
+            content = text.core.content
+            position = text.core.index(rng.randint(0, len(content)))
+            choice = rng.random()
+            if choice < 0.45:
+                text.insert(position, ''.join(rng.choice('xy\n😀') for _ in range(rng.randint(1, 5))))
+            elif choice < 0.7:
+                text.delete(position)
+            elif choice < 0.95:
+                end = text.core.index(min(len(content), text.core.offset(position) + rng.randint(0, 20)))
+                text.delete(position, end)
+            else:
+                # Unrecorded changes (like loading) are saved as a snapshot
+                recorder.enabled = False
+                text.insert(position, 'z\n')
+                recorder.enabled = True
+                recorder.take()
+                saved = text.core.content
+        assert apply_journal(saved, recorder.take()) == text.core.content
+
+
+def test_recorder_does_not_copy_the_note_per_keystroke():
+    text, recorder = make_fake_text('😀 line\n' * 20000)
+    saved = text.core.content
+    text.insert('15000.3', 'x')
+    text.core.copied = 0
+    for char in 'typing on one line':
+        text.core.marks['insert'] = text.core.offset('15000.4')
+        text.insert('insert', char)
+    # Only the edited line is read, not the note above it
+    assert text.core.copied < 20 * 200
+    assert apply_journal(saved, recorder.take()) == text.core.content
+
+
+def test_apply_journal_matches_naive_replay():
+    rng = random.Random(5)
+    for _ in range(200):
+        content = ''.join(rng.choice('ab\n😀') for _ in range(rng.randint(0, 2000)))
+        length = len(content)
+        ops = []
+        for _ in range(rng.randint(0, 40)):
+            if length == 0 or rng.random() < 0.5:
+                data = ''.join(rng.choice('xy😀') for _ in range(rng.randint(1, 200)))
+                ops.append(('i', rng.randint(0, length), data))
+                length += len(data)
+            else:
+                pos = rng.randint(0, length - 1)
+                count = rng.randint(1, length - pos)
+                ops.append(('d', pos, str(count)))
+                length -= count
+        chunk_chars = rng.choice([1, 7, 100, 64 * 1024])
+        assert apply_journal(content, ops, chunk_chars=chunk_chars) == replay_naive(content, ops)
+
+
+def test_apply_journal_after_emoji():
+    assert apply_journal('a😀b', [('i', 2, 'X')]) == 'a😀Xb'
+    assert apply_journal('a😀bc', [('d', 2, '1')]) == 'a😀c'
+
+
+def test_recorder_offsets_after_emoji():
+    root, text, recorder = make_text()
+    try:
+        recorder.enabled = False
+        text.insert('1.0', 'a😀b\nc😀d')
+        recorder.enabled = True
+        saved = text.get('1.0', 'end-1c')
+        text.insert('1.end', 'X')
+        text.delete('2.2', '2.3')
+        text.insert('end-1c', '😀!')
+        assert apply_journal(saved, recorder.take()) == text.get('1.0', 'end-1c')
+    finally:
+        root.destroy()
+
+
+def test_recorder_merges_typing_and_backspace():
+    root, text, recorder = make_text()
+    try:
+        for char in 'hello':
+            text.insert('insert', char)
+        text.delete('insert-1c')
+        text.delete('insert-1c')
+        assert recorder.ops == [('i', 0, 'hel')]
+        text.delete('1.0', '1.1')
+        text.delete('1.0', '1.1')
+        assert apply_journal('', recorder.take()) == text.get('1.0', 'end-1c') == 'l'
+    finally:
+        root.destroy()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for full-text search over the note store
+"""
+
+import os
+
+import pytest
+
+from note_search import NoteIndex
+from note_store import NoteStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = NoteStore(db_path=os.path.join(str(tmp_path), '.smart_notes.db'), home_dir=str(tmp_path))
+    yield store
+    store.close()
+
+
+def ranked(index, query):
+    return [result['instance_id'] for result in index.search(query)]
+
+
+def test_bm25_ranks_frequent_and_rare_terms_first(store):
+    store.save_notes('garden', "tomato tomato tomato basil")
+    store.save_notes('kitchen', "tomato soup with bread and butter and salt")
+    store.save_notes('office', "quarterly report draft")
+    index = NoteIndex(store)
+    # More occurrences in a shorter note rank higher
+    assert ranked(index, 'tomato') == ['garden', 'kitchen']
+    # A rare term outweighs a common one
+    assert ranked(index, 'tomato soup') == ['kitchen', 'garden']
+    assert ranked(index, 'nothing') == []
+    scores = [result['score'] for result in index.search('tomato')]
+    assert scores == sorted(scores, reverse=True) and scores[-1] > 0
+
+
+def test_trailing_partial_word_is_expanded(store):
+    store.save_notes('a', "meeting notes for the quarterly review")
+    store.save_notes('b', "quartz crystal")
+    store.save_notes('c', "quota")
+    index = NoteIndex(store)
+    assert set(ranked(index, 'quart')) == {'a', 'b'}
+    assert index.expand_terms('quart') == ['quart', 'quarterly', 'quartz']
+    # A finished word (followed by a space) is matched exactly
+    assert index.expand_terms('quart ') == ['quart']
+    assert ranked(index, 'quart ') == []
+
+
+def test_note_edited_after_indexing_is_refreshed_at_query_time(store):
+    store.save_notes('a', "pick up the parcel")
+    index = NoteIndex(store)
+    assert ranked(index, 'parcel') == ['a']
+    indexed = index.stats['notes_indexed']
+
+    store.save_notes('a', "pick up the groceries")
+    store.append_journal('a', [('i', 0, 'Tomorrow: ')])
+    # Nothing is re-indexed until the next query
+    assert index.stats['notes_indexed'] == indexed
+    assert ranked(index, 'parcel') == []
+    assert ranked(index, 'groceries') == ['a']
+    assert ranked(index, 'tomorrow') == ['a']
+    assert index.search('groceries')[0]['snippet'] == "Tomorrow: pick up the groceries"
+    # Only the edited note was indexed again, and only once
+    assert index.stats['notes_indexed'] == indexed + 1
+    assert store._query('SELECT COUNT(*) FROM search_pending')[0][0] == 0
+
+
+def test_deleted_note_leaves_the_index(store):
+    store.save_notes('a', "shared word alpha")
+    store.save_notes('b', "shared word beta")
+    index = NoteIndex(store)
+    assert set(ranked(index, 'shared')) == {'a', 'b'}
+
+    store.delete_instance('a')
+    assert ranked(index, 'shared') == ['b']
+    assert ranked(index, 'alpha') == []
+    assert store._query("SELECT COUNT(*) FROM search_postings WHERE instance_id = 'a'")[0][0] == 0
+    assert store._query("SELECT COUNT(*) FROM search_docs WHERE instance_id = 'a'")[0][0] == 0
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the note store's import of the legacy per-instance files
+"""
+
+import json
+import os
+
+from note_store import NoteStore
+
+INSTANCE_ID = 'c0ffee00-0000-4000-8000-000000000001'
+
+
+def write_json(home, filename, data):
+    with open(os.path.join(home, filename), 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def write_legacy_files(home):
+    """The files an old install leaves in the home directory"""
+    prefix = f'.smart_notes_{INSTANCE_ID}'
+    with open(os.path.join(home, prefix + '_notes.txt'), 'w', encoding='utf-8') as f:
+        f.write("Buy milk\nCall Ana 📞")
+    write_json(home, prefix + '_metadata.json', {
+        'instance_id': INSTANCE_ID,
+        'name': 'Groceries',
+        'created_at': '2024-01-02T03:04:05',
+        'files': {'notes': prefix + '_notes.txt'},
+    })
+    write_json(home, prefix + '_settings.json', {'is_locked': True, 'transparency': 0.9})
+    write_json(home, prefix + '_position.json', {'x': 10, 'y': 20})
+    write_json(home, prefix + '_mini_position.json', {'x': 300, 'y': 400})
+    write_json(home, '.smart_notes_instance_registry.json', {INSTANCE_ID: {'name': 'Groceries'}})
+    write_json(home, '.smart_notes_auto_start.json', {INSTANCE_ID: {'auto_start': True}})
+    # Not ours, and not readable as JSON: both must be left alone
+    write_json(home, '.other_app_settings.json', {'x': 1})
+    with open(os.path.join(home, '.smart_notes_broken_settings.json'), 'w', encoding='utf-8') as f:
+        f.write('{not json')
+
+
+def dump_store(store):
+    """Every row of every table except the migration marker"""
+    tables = [name for (name,) in store._query("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    return {table: sorted(store._query(f'SELECT * FROM {table}')) for table in sorted(tables)
+            if table != 'store_meta'}
+
+
+def open_store(home):
+    return NoteStore(db_path=os.path.join(home, '.smart_notes.db'), home_dir=home)
+
+
+def test_legacy_files_are_migrated(tmp_path):
+    home = str(tmp_path)
+    write_legacy_files(home)
+    store = open_store(home)
+    try:
+        assert store.get_notes(INSTANCE_ID) == "Buy milk\nCall Ana 📞"
+        metadata = store.get_metadata(INSTANCE_ID)
+        assert metadata['name'] == 'Groceries'
+        assert metadata['created_at'] == '2024-01-02T03:04:05'
+        assert 'files' not in metadata
+        assert list(store.list_instances()) == [INSTANCE_ID]
+        assert store.get_documents(INSTANCE_ID) == {
+            'settings': {'is_locked': True, 'transparency': 0.9},
+            'position': {'x': 10, 'y': 20},
+            'mini_position': {'x': 300, 'y': 400},
+        }
+        assert store.get_registry('instance_registry') == {INSTANCE_ID: {'name': 'Groceries'}}
+        assert store.get_registry('auto_start') == {INSTANCE_ID: {'auto_start': True}}
+        # The broken file was skipped without stopping the rest
+        assert store.get_documents('broken') == {}
+    finally:
+        store.close()
+    # The old files are left in place
+    assert os.path.exists(os.path.join(home, f'.smart_notes_{INSTANCE_ID}_notes.txt'))
+
+
+def test_second_migration_changes_nothing(tmp_path):
+    home = str(tmp_path)
+    write_legacy_files(home)
+    store = open_store(home)
+    try:
+        before = dump_store(store)
+        # Edits made after the import must survive a later migration
+        store.save_notes(INSTANCE_ID, "Buy oat milk")
+        after_edit = dump_store(store)
+        assert after_edit != before
+        store.migrate_legacy()
+        assert dump_store(store) == after_edit
+    finally:
+        store.close()
+
+    # Nor does reopening the store import the (still present) files again
+    store = open_store(home)
+    try:
+        assert dump_store(store) == after_edit
+        assert store.get_notes(INSTANCE_ID) == "Buy oat milk"
+    finally:
+        store.close()
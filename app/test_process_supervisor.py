@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the process supervisor's exit delivery
+"""
+
+import subprocess
+import sys
+import time
+
+from process_supervisor import ProcessSupervisor
+
+
+class FakeTk:
+    def __init__(self, threaded):
+        self.threaded = threaded
+
+    def call(self, *args):
+        return 1 if self.threaded else 0
+
+
+class FakeRoot:
+    """Tk root stand-in that records timers, bindings and generated events"""
+
+    def __init__(self, threaded):
+        self.tk = FakeTk(threaded)
+        self.jobs = []
+        self.bindings = {}
+        self.generated = 0
+
+    def bind(self, sequence, func, add=None):
+        self.bindings[sequence] = func
+
+    def after(self, ms, callback):
+        self.jobs.append(callback)
+        return callback
+
+    def after_idle(self, callback):
+        return self.after(0, callback)
+
+    def after_cancel(self, job):
+        pass
+
+    def event_generate(self, sequence, when=None):
+        self.generated += 1
+
+    def run_jobs(self):
+        while self.jobs:
+            self.jobs.pop(0)()
+
+
+def start_sleeper(seconds=0.1):
+    return subprocess.Popen([sys.executable, '-c', f'import time; time.sleep({seconds})'])
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+
+def test_threaded_tcl_is_woken_without_timers():
+    supervisor = ProcessSupervisor(poll_interval=0.05)
+    root = FakeRoot(threaded=True)
+    supervisor.attach(root)
+    root.run_jobs()
+    exits = []
+    supervisor.watch('note host', start_sleeper(), on_exit=lambda key, returncode: exits.append(key))
+    # Nothing polls while the process runs
+    assert root.jobs == []
+    wait_for(lambda: root.generated)
+    root.bindings['<<ProcessExited>>'](None)
+    assert exits == ['note host']
+    assert root.jobs == []
+
+
+def test_unthreaded_tcl_polls_only_while_watching():
+    supervisor = ProcessSupervisor(poll_interval=0.05)
+    root = FakeRoot(threaded=False)
+    supervisor.attach(root)
+    root.run_jobs()
+    exits = []
+    supervisor.watch('note host', start_sleeper(), on_exit=lambda key, returncode: exits.append(key))
+    wait_for(lambda: not supervisor.exits.empty())
+    root.run_jobs()
+    assert exits == ['note host']
+    assert root.jobs == []
+
+
+def test_exit_of_a_replaced_process_is_ignored():
+    supervisor = ProcessSupervisor(poll_interval=0.05)
+    root = FakeRoot(threaded=False)
+    supervisor.attach(root)
+    exits = []
+    old = start_sleeper(0.05)
+    supervisor.watch('note host', old, on_exit=lambda key, returncode: exits.append(key))
+    old.wait()
+    new = start_sleeper(5)
+    supervisor.watch('note host', new, on_exit=lambda key, returncode: exits.append(key))
+    wait_for(lambda: not supervisor.exits.empty())
+    time.sleep(0.1)
+    supervisor.process_exits()
+    assert exits == []
+    assert supervisor.is_watched('note host')
+    new.kill()
+    new.wait()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the frame-limited window drag/resize pipeline
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'other files', 'src'))
+
+from sticky_notes_widget import DesktopWidget
+
+
+class FakeRoot:
+    """Records geometry() calls; after() jobs run only when the test says so"""
+
+    def __init__(self):
+        self.geometries = []
+        self.jobs = {}
+        self.next_job = 0
+
+    def geometry(self, value):
+        self.geometries.append(value)
+
+    def winfo_x(self):
+        return 100
+
+    def winfo_y(self):
+        return 50
+
+    def winfo_width(self):
+        return 300
+
+    def winfo_height(self):
+        return 400
+
+    def after(self, ms, func):
+        self.next_job += 1
+        self.jobs[self.next_job] = func
+        return self.next_job
+
+    def after_cancel(self, job):
+        # Like Tk, cancelling a job that already ran is a no-op
+        self.jobs.pop(job, None)
+
+    def run_jobs(self):
+        while self.jobs:
+            self.jobs.pop(min(self.jobs))()
+
+
+class FakeWidget:
+    start_move = DesktopWidget.start_move
+    on_move = DesktopWidget.on_move
+    start_resize = DesktopWidget.start_resize
+    on_resize = DesktopWidget.on_resize
+    queue_geometry = DesktopWidget.queue_geometry
+    apply_geometry = DesktopWidget.apply_geometry
+
+    def __init__(self):
+        self.root = FakeRoot()
+        self.is_locked = False
+        self.geometry_frame_ms = 16
+        self.pending_geometry = {}
+        self.geometry_job = None
+
+    def schedule_persist(self, kind):
+        pass
+
+
+def event(x_root, y_root):
+    return SimpleNamespace(x_root=x_root, y_root=y_root, x=0, y=0)
+
+
+def test_resize_and_move_handlers_in_same_frame():
+    widget = FakeWidget()
+    # A grip drag reaches the canvas handler and (without 'break') the root's move handler
+    widget.start_move(event(500, 500))
+    assert widget.start_resize(event(500, 500)) == 'break'
+    assert widget.on_resize(event(540, 560)) == 'break'
+    widget.on_move(event(500, 500))
+    widget.root.run_jobs()
+    assert widget.root.geometries == ['340x460+100+50']
+
+
+def test_motion_is_applied_once_per_frame():
+    widget = FakeWidget()
+    widget.start_move(event(10, 10))
+    for step in range(1, 20):
+        widget.on_move(event(10 + step, 10 + 2 * step))
+    assert widget.root.geometries == []
+    widget.root.run_jobs()
+    assert widget.root.geometries == ['+119+88']
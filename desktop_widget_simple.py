@@ -29,6 +29,25 @@ class DesktopWidget:
         self.is_minimized = False
         self.is_resizable = False
         
+        # Autosave state (driven by the Text <<Modified>> flag, see on_text_modified)
+        self.autosave_idle_ms = 2000  # Save once typing has been idle this long
+        self.autosave_max_interval_ms = 30000  # Never keep edits unsaved longer than this
+        self.is_dirty = False
+        self.autosave_idle_job = None
+        self.autosave_max_job = None
+        self.autosave_stats = {'saves_performed': 0, 'saves_skipped': 0}
+        
+        # Geometry/settings persistence is coalesced (see schedule_persist)
+        self.persist_quiet_ms = 500  # At most one write per interval while dragging
+        self.persist_pending = set()
+        self.persist_job = None
+        
+        # Window drag/resize: motion events only queue the latest geometry,
+        # which is applied at most once per frame
+        self.geometry_frame_ms = 16
+        self.pending_geometry = {}
+        self.geometry_job = None
+        
         # Default themes
         self.themes = {
             'dark': {
@@ -191,6 +210,7 @@ class DesktopWidget:
                            padx=10,
                            pady=10)
         self.text.pack(fill='both', expand=True, padx=10, pady=10)
+        self.text.bind('<<Modified>>', self.on_text_modified)
         
         # Create modern custom scrollbar
         self.create_modern_scrollbar(main_frame)
@@ -416,41 +436,14 @@ class DesktopWidget:
             self.resize_canvas.bind("<B1-Motion>", self.on_resize)
             self.resize_canvas.bind("<ButtonRelease-1>", self.stop_resize)
 
-    def start_resize(self, event):
-        """Start resize operation"""
-        if not self.is_locked:
-            self.resize_x = event.x_root
-            self.resize_y = event.y_root
-            self.resize_w = self.root.winfo_width()
-            self.resize_h = self.root.winfo_height()
-            # Bind to root window for global mouse tracking
-            self.root.bind("<B1-Motion>", self.on_resize)
-            self.root.bind("<ButtonRelease-1>", self.stop_resize)
-
-    def on_resize(self, event):
-        """Handle resize operation"""
-        if not self.is_locked:
-            dx = event.x_root - self.resize_x
-            dy = event.y_root - self.resize_y
-            new_width = max(200, self.resize_w + dx)
-            new_height = max(300, self.resize_h + dy)
-            
-            # Smooth resize with immediate visual feedback
-            self.root.geometry(f"{new_width}x{new_height}")
-            
-            # Update resize handle position
-            if hasattr(self, 'resize_handle'):
-                self.resize_handle.pack_forget()
-                self.resize_handle.pack(side='bottom', anchor='se', padx=0, pady=0)
-            
-            # Force update for smooth visual feedback
-            self.root.update_idletasks()
-
     def stop_resize(self, event):
         """Stop resize operation"""
+        self.apply_geometry()
         self.root.unbind("<B1-Motion>")
         self.root.unbind("<ButtonRelease-1>")
-        self.save_size()
+        # Restore the window drag bindings replaced during the resize
+        self.make_draggable()
+        self.flush_persist()
         
         # Final update to ensure smooth completion
         self.root.update_idletasks()
@@ -600,23 +593,22 @@ class DesktopWidget:
 
     def start_mini_move(self, event):
         """Start moving minimized button"""
-        self.mini_x = event.x
-        self.mini_y = event.y
-        self.move_time = event.time
+        self.mini_drag_start = (event.x_root, event.y_root)
+        # The origin is read once; motion is applied relative to it
+        self.mini_drag_origin = (self.mini_window.winfo_x(), self.mini_window.winfo_y())
 
     def on_mini_move(self, event):
         """Handle minimized button movement"""
         if not self.is_locked:
-            dx = event.x - self.mini_x
-            dy = event.y - self.mini_y
-            x = self.mini_window.winfo_x() + dx
-            y = self.mini_window.winfo_y() + dy
-            self.mini_window.geometry(f"+{x}+{y}")
-            self.save_mini_position()
+            x = self.mini_drag_origin[0] + event.x_root - self.mini_drag_start[0]
+            y = self.mini_drag_origin[1] + event.y_root - self.mini_drag_start[1]
+            self.queue_geometry(self.mini_window, position=f"+{x}+{y}")
+            self.schedule_persist('mini_position')
 
     def stop_mini_move(self, event):
         """Stop moving minimized button"""
-        self.save_mini_position()
+        self.apply_geometry()
+        self.flush_persist()
     
     def restore_widget(self):
         """Restore the widget from minimized state"""
@@ -631,6 +623,7 @@ class DesktopWidget:
         if not self.is_locked:
             self.root.bind("<Button-1>", self.start_move)
             self.root.bind("<B1-Motion>", self.on_move)
+            self.root.bind("<ButtonRelease-1>", self.stop_move)
             # Bind resize events
             self.root.bind("<Control-Button-1>", self.start_resize)
             self.root.bind("<Control-B1-Motion>", self.on_resize)
@@ -638,20 +631,24 @@ class DesktopWidget:
     def start_resize(self, event):
         """Start widget resizing"""
         if not self.is_locked:
-            self.x = event.x
-            self.y = event.y
+            self.x = event.x_root
+            self.y = event.y_root
             self.width = self.root.winfo_width()
             self.height = self.root.winfo_height()
+            # Don't also start a window move from the root's <Button-1>
+            return 'break'
     
     def on_resize(self, event):
         """Handle widget resizing"""
         if not self.is_locked:
-            dx = event.x - self.x
-            dy = event.y - self.y
+            dx = event.x_root - self.x
+            dy = event.y_root - self.y
             new_width = max(200, self.width + dx)
             new_height = max(300, self.height + dy)
-            self.root.geometry(f"{new_width}x{new_height}")
-            self.save_size()
+            self.queue_geometry(self.root, size=f"{new_width}x{new_height}")
+            self.schedule_persist('size')
+            # The root's <B1-Motion> would otherwise move the window as well
+            return 'break'
     
     def save_size(self):
         """Save widget size"""
@@ -672,7 +669,8 @@ class DesktopWidget:
     def close_widget(self):
         """Close the widget"""
         if messagebox.askyesno("Confirm Exit", "Are you sure you want to close Smart Notes?"):
-            self.save_notes()
+            self.flush_persist()
+            self.autosave()
             self.save_position()
             self.save_settings()
             self.root.quit()
@@ -680,18 +678,71 @@ class DesktopWidget:
     def start_move(self, event):
         """Start widget movement"""
         if not self.is_locked:
-            self.x = event.x
-            self.y = event.y
+            self.x = event.x_root
+            self.y = event.y_root
+            # The origin is read once; motion is applied relative to it
+            self.move_origin = (self.root.winfo_x(), self.root.winfo_y())
     
     def on_move(self, event):
         """Handle widget movement"""
         if not self.is_locked:
-            deltax = event.x - self.x
-            deltay = event.y - self.y
-            x = self.root.winfo_x() + deltax
-            y = self.root.winfo_y() + deltay
-            self.root.geometry(f"+{x}+{y}")
-            self.save_position()
+            x = self.move_origin[0] + event.x_root - self.x
+            y = self.move_origin[1] + event.y_root - self.y
+            self.queue_geometry(self.root, position=f"+{x}+{y}")
+            self.schedule_persist('position')
+    
+    def stop_move(self, event):
+        """Stop widget movement or resizing"""
+        self.apply_geometry()
+        self.flush_persist()
+    
+    def queue_geometry(self, window, size=None, position=None):
+        """Keep only the latest size and position for a window; they are applied at most once per frame"""
+        pending = self.pending_geometry.setdefault(window, {})
+        if size is not None:
+            pending['size'] = size
+        if position is not None:
+            pending['position'] = position
+        if self.geometry_job is None:
+            self.geometry_job = self.root.after(self.geometry_frame_ms, self.apply_geometry)
+    
+    def apply_geometry(self):
+        """Apply the queued window geometries"""
+        if self.geometry_job is not None:
+            self.root.after_cancel(self.geometry_job)
+            self.geometry_job = None
+        pending, self.pending_geometry = self.pending_geometry, {}
+        for window, geometry in pending.items():
+            try:
+                window.geometry(geometry.get('size', '') + geometry.get('position', ''))
+            except tk.TclError as e:
+                print(f"Could not move window: {e}")
+    
+    def schedule_persist(self, kind):
+        """Queue a geometry/settings save; writes are coalesced to one per interval"""
+        self.persist_pending.add(kind)
+        if self.persist_job is None:
+            self.persist_job = self.root.after(self.persist_quiet_ms, self.flush_persist)
+    
+    def flush_persist(self):
+        """Write all queued geometry/settings state now"""
+        if self.persist_job is not None:
+            self.root.after_cancel(self.persist_job)
+            self.persist_job = None
+        pending = self.persist_pending
+        self.persist_pending = set()
+        
+        # A position save also records the size
+        if 'position' in pending:
+            pending.discard('size')
+        savers = {
+            'position': self.save_position,
+            'size': self.save_size,
+            'mini_position': self.save_mini_position,
+            'settings': self.save_settings
+        }
+        for kind in pending:
+            savers[kind]()
     
     def save_position(self):
         """Save widget position and size"""
@@ -744,7 +795,9 @@ class DesktopWidget:
                 'theme': self.current_theme,
                 'transparency': self.root.attributes('-alpha'),
                 'width': self.root.winfo_width(),
-                'height': self.root.winfo_height()
+                'height': self.root.winfo_height(),
+                'autosave_idle_ms': self.autosave_idle_ms,
+                'autosave_max_interval_ms': self.autosave_max_interval_ms
             }
             with open(self.settings_file, 'w') as f:
                 json.dump(settings, f)
@@ -773,6 +826,10 @@ class DesktopWidget:
                 # Load state
                 self.is_locked = settings.get('is_locked', False)
                 
+                # Load autosave timing
+                self.autosave_idle_ms = int(settings.get('autosave_idle_ms', self.autosave_idle_ms))
+                self.autosave_max_interval_ms = int(settings.get('autosave_max_interval_ms', self.autosave_max_interval_ms))
+                
                 # Apply theme
                 self.apply_theme()
         except Exception as e:
@@ -820,6 +877,7 @@ class DesktopWidget:
                                      fg=self.colors['text_primary'])
         transparency_scale.set(self.root.attributes('-alpha'))
         transparency_scale.pack(fill='x', padx=10, pady=5)
+        transparency_scale.bind('<ButtonRelease-1>', lambda e: self.flush_persist())
         
         # Auto-start section
         auto_start_frame = tk.LabelFrame(settings_window,
@@ -864,7 +922,7 @@ class DesktopWidget:
     def change_transparency(self, value):
         """Change widget transparency"""
         self.root.attributes('-alpha', float(value))
-        self.save_settings()
+        self.schedule_persist('settings')
     
     def check_auto_start(self):
         """Check if auto-start is enabled"""
@@ -916,13 +974,56 @@ class DesktopWidget:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f"{width}x{height}+{x}+{y}")
     
+    def on_text_modified(self, event=None):
+        """Mark notes dirty and (re)schedule the idle autosave"""
+        if not self.text.edit_modified():
+            return
+        # Reset the flag so the next edit fires <<Modified>> again
+        self.text.edit_modified(False)
+        
+        if not self.is_dirty:
+            self.is_dirty = True
+            # Hard upper bound so continuous typing still gets saved
+            self.autosave_max_job = self.root.after(self.autosave_max_interval_ms, self.autosave)
+        
+        # Debounce: restart the idle timer on every edit
+        if self.autosave_idle_job is not None:
+            self.root.after_cancel(self.autosave_idle_job)
+        self.autosave_idle_job = self.root.after(self.autosave_idle_ms, self.autosave)
+    
+    def cancel_autosave(self):
+        """Cancel pending autosave timers"""
+        for job in (self.autosave_idle_job, self.autosave_max_job):
+            if job is not None:
+                self.root.after_cancel(job)
+        self.autosave_idle_job = None
+        self.autosave_max_job = None
+    
+    def autosave(self):
+        """Save notes only if they changed since the last save"""
+        self.cancel_autosave()
+        if not self.is_dirty:
+            self.autosave_stats['saves_skipped'] += 1
+            return False
+        return self.save_notes()
+    
+    def get_autosave_stats(self):
+        """Get autosave counters"""
+        return dict(self.autosave_stats)
+    
     def save_notes(self):
         """Save notes content"""
         try:
+            # Clear the dirty flag first; edits made after this point mark it again
+            self.is_dirty = False
             with open(self.notes_file, 'w', encoding='utf-8') as f:
                 f.write(self.text.get('1.0', 'end-1c'))
+            self.autosave_stats['saves_performed'] += 1
+            return True
         except Exception as e:
+            self.is_dirty = True
             print(f"Could not save notes: {e}")
+            return False
     
     def load_notes(self):
         """Load saved notes"""
@@ -933,6 +1034,9 @@ class DesktopWidget:
                 if hasattr(self, 'text'):
                     self.text.delete('1.0', 'end')
                     self.text.insert('1.0', content)
+                    # Loaded content is already saved
+                    self.text.edit_modified(False)
+                    self.is_dirty = False
         except Exception as e:
             print(f"Could not load notes: {e}")
     
@@ -944,12 +1048,8 @@ class DesktopWidget:
         print(f"Widget geometry: {self.root.winfo_width()}x{self.root.winfo_height()}+{self.root.winfo_x()}+{self.root.winfo_y()}")
         print(f"Widget visible: {self.root.winfo_viewable()}")
         
-        # Auto-save notes periodically (every 30 seconds)
-        def auto_save():
-            self.save_notes()
-            self.root.after(30000, auto_save)
-        
-        self.root.after(30000, auto_save)
+        # Auto-save is event driven (see on_text_modified), so an idle note
+        # schedules no timers and performs no writes
         
         # Start the main event loop
         self.root.mainloop()
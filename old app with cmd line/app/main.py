@@ -6,10 +6,12 @@ Main entry point for the application
 
 import sys
 import os
+import time
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox
-import threading
-import time
+from multiprocessing.connection import Listener, Client
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -20,41 +22,130 @@ except ImportError as e:
     print(f"Error importing DesktopWidget: {e}")
     sys.exit(1)
 
-def check_single_instance():
-    """Check if another instance is already running"""
+SINGLE_INSTANCE_LOCK = os.path.join(os.path.expanduser('~'), '.smart_notes_widget.lock')
+
+
+def get_single_instance_address():
+    """Address of the running widget's activation endpoint (Unix socket, or named pipe on Windows)"""
+    if os.name == 'nt':
+        return r'\\.\pipe\smart_notes_widget_' + os.environ.get('USERNAME', 'user')
+    return os.path.join(os.path.expanduser('~'), '.smart_notes_widget.sock')
+
+
+def acquire_single_instance_lock():
+    """Take the single-instance lock; returns the open lock file, or None if another instance holds it"""
+    lock_file = open(SINGLE_INSTANCE_LOCK, 'a+')
     try:
-        import win32gui
-        import win32con
-        
-        def enum_windows_callback(hwnd, windows):
-            if win32gui.IsWindowVisible(hwnd):
-                window_text = win32gui.GetWindowText(hwnd)
-                if "Smart Notes" in window_text:
-                    windows.append(hwnd)
-            return True
-        
-        windows = []
-        win32gui.EnumWindows(enum_windows_callback, windows)
-        
-        if len(windows) > 0:
-            # Bring existing window to front
-            hwnd = windows[0]
-            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            win32gui.SetForegroundWindow(hwnd)
-            return True
-        return False
-        
-    except ImportError:
-        # win32gui not available, continue anyway
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    # Held (and released by the OS) for the life of the process
+    return lock_file
+
+
+def check_single_instance(wait=2.0):
+    """Hand our arguments to the running instance; returns True if one took them"""
+    deadline = time.perf_counter() + wait
+    while True:
+        try:
+            conn = Client(get_single_instance_address())
+            break
+        except OSError:
+            # The running instance may still be starting up
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.05)
+    try:
+        conn.send({'command': 'activate', 'argv': sys.argv[1:]})
+        return conn.poll(wait) and bool(conn.recv())
+    except (OSError, EOFError):
         return False
+    finally:
+        conn.close()
+
+
+def start_activation_listener(widget):
+    """Let later launches bring this widget to the front"""
+    address = get_single_instance_address()
+    requests = queue.Queue()
+    try:
+        # We hold the lock, so an existing socket file is stale
+        if os.name != 'nt' and os.path.exists(address):
+            os.unlink(address)
+        listener = Listener(address)
+    except Exception as e:
+        print(f"Could not start activation listener: {e}")
+        return None
+
+    # A threaded Tcl can be woken from the accept thread; otherwise poll
+    event_driven = bool(widget.root.tk.call('info', 'exists', 'tcl_platform(threaded)'))
+
+    def wake():
+        # Tk needs its main loop running to take the call from this thread
+        while True:
+            try:
+                widget.root.event_generate('<<Activate>>', when='tail')
+                return
+            except RuntimeError:
+                time.sleep(0.1)
+            except tk.TclError:
+                return
+
+    def accept_loop():
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError):
+                break
+            try:
+                requests.put(conn.recv())
+                conn.send(True)
+            except Exception as e:
+                print(f"Error reading activation request: {e}")
+            finally:
+                conn.close()
+            if event_driven:
+                wake()
+
+    def process_requests():
+        # Tk is only touched from its own thread
+        while True:
+            try:
+                requests.get_nowait()
+            except queue.Empty:
+                break
+            if widget.is_minimized:
+                widget.restore_widget()
+            widget.root.deiconify()
+            widget.root.lift()
+        if not event_driven:
+            widget.root.after(200, process_requests)
+
+    if event_driven:
+        widget.root.bind('<<Activate>>', lambda e: process_requests(), add='+')
+    threading.Thread(target=accept_loop, daemon=True).start()
+    if not event_driven:
+        widget.root.after(200, process_requests)
+    return listener
 
 def main():
     """Main application entry point"""
     print("🚀 Starting Smart Notes Widget...")
     
     # Check for single instance
-    if check_single_instance():
-        print("⚠️  Another instance is already running. Bringing it to front.")
+    lock_file = acquire_single_instance_lock()
+    if lock_file is None:
+        if check_single_instance():
+            print("⚠️  Another instance is already running. Bringing it to front.")
+        else:
+            print("⚠️  Another instance is already running but did not respond.")
         return
     
     try:
@@ -62,18 +153,11 @@ def main():
         print("📝 Initializing Smart Notes Widget...")
         widget = DesktopWidget()
         
-        # Set up auto-save in background thread
-        def auto_save_worker():
-            while True:
-                try:
-                    if hasattr(widget, 'save_notes'):
-                        widget.save_notes()
-                    time.sleep(30)  # Save every 30 seconds
-                except:
-                    break
+        # Later launches hand their arguments to this instance
+        start_activation_listener(widget)
         
-        auto_save_thread = threading.Thread(target=auto_save_worker, daemon=True)
-        auto_save_thread.start()
+        # Auto-save is scheduled by the widget on the Tk thread (see
+        # DesktopWidget.run); Tk widgets must not be touched from other threads
         
         print("✅ Smart Notes Widget is ready!")
         print("💡 Tips:")